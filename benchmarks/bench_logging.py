@@ -0,0 +1,92 @@
+"""Micro-benchmark for the logging pipeline's cost on the event loop.
+
+Times log calls on the calling thread with setup_logging()'s queue
+handler, against a JSON file handler writing synchronously on the same
+thread (what a plain logging setup does), and shows what the caller
+file/line lookup that setup_logging() turns off would add. Records are
+written to a temporary directory; the console handler is disabled.
+
+Run from the repository root:
+    python -m benchmarks.bench_logging [calls]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import config
+from utils.log import JSONFormatter, get_logger, setup_logging
+
+
+def per_call(logger, calls, level=logging.INFO, listener=None, burst=100):
+    """Average caller-side time per call, logging ``burst`` records at a time.
+
+    With a listener, each burst waits for the queue to drain untimed, as the
+    bot's loop does between commands; otherwise the writer thread competes
+    for the GIL and its work is counted against the caller.
+    """
+    fields = {"command": "weather", "guild_id": 1, "latency_ms": 12.5, "outcome": "ok"}
+    elapsed = 0.0
+    for offset in range(0, calls, burst):
+        start = time.perf_counter()
+        for i in range(offset, min(offset + burst, calls)):
+            logger.log(level, "/%s %s in %s ms", "weather", "ok", i, extra={"fields": fields})
+        elapsed += time.perf_counter() - start
+        while listener is not None and not listener.queue.empty():
+            time.sleep(0.001)
+    return elapsed / calls
+
+
+def flood(logger, calls):
+    """Per-call time with no pauses: the writer thread runs alongside the caller"""
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.info("/%s %s in %s ms", "weather", "ok", i)
+    return (time.perf_counter() - start) / calls
+
+
+def main(calls):
+    srcfile = logging._srcfile
+    with tempfile.TemporaryDirectory() as directory:
+        config.LogConfig.CONSOLE = False
+        config.LogConfig.FILE = os.path.join(directory, "bench.jsonl")
+        config.LogConfig.FILE_MAX_BYTES = 0  # no rotation, so every record can be counted
+        listener = setup_logging()
+        logger = get_logger("commands")
+
+        queued = per_call(logger, calls, listener=listener)
+        filtered = per_call(logger, calls, logging.DEBUG)
+        logging._srcfile = srcfile
+        with_lookup = per_call(logger, calls, listener=listener)
+        logging._srcfile = None
+        flooded = flood(logger, calls)
+
+        start = time.perf_counter()
+        listener.stop()
+        drain = time.perf_counter() - start
+        with open(config.LogConfig.FILE, encoding="utf-8") as file:
+            written = sum(1 for _ in file)
+
+        # Baseline: format and write on the calling thread
+        sync = logging.getLogger("bench.sync")
+        sync.propagate = False
+        sync.setLevel(logging.INFO)
+        handler = logging.FileHandler(os.path.join(directory, "sync.jsonl"), encoding="utf-8")
+        handler.setFormatter(JSONFormatter())
+        sync.addHandler(handler)
+        synchronous = per_call(sync, calls)
+        handler.close()
+
+    assert written == 3 * calls, written
+    print(f"{calls} calls per case")
+    print(f"  queued (setup_logging):      {queued * 1e6:.2f} us per call on the caller")
+    print(f"  ... with caller lookup on:   {with_lookup * 1e6:.2f} us per call")
+    print(f"  filtered out by level:       {filtered * 1e6:.2f} us per call")
+    print(f"  queued, sustained flood:     {flooded * 1e6:.2f} us per call (writer thread competing for the GIL)")
+    print(f"  synchronous JSON file write: {synchronous * 1e6:.2f} us per call")
+    print(f"  listener drained the backlog in {drain * 1000:.0f} ms; {written} records written")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,78 @@
+"""Memory benchmark for the per-channel no-repeat fact filters.
+
+Builds one RotatingBloomFilter per channel, the way the Fact cog does, and
+fills each with a random number of fact IDs (up to 2x the window). It then
+reports heap and serialized bytes per channel and checks the guarantees:
+- no fact delivered within the last ``window`` deliveries is ever
+  reported unseen (no repeats)
+- the rate of unseen facts wrongly skipped stays near 2x the error rate
+
+Run from the repository root:
+    python -m benchmarks.bench_seen_filter [channels]
+"""
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+import config
+from utils.bloom import RotatingBloomFilter
+
+
+def fact_id(rng) -> str:
+    # Same shape as uselessfacts IDs (32 hex characters)
+    return uuid.UUID(int=rng.getrandbits(128)).hex
+
+
+def main(channels):
+    window = config.FactConfig.NO_REPEAT_WINDOW
+    error_rate = config.FactConfig.SEEN_ERROR_RATE
+    rng = random.Random(42)
+
+    # Generate the IDs up front so only the filters are measured
+    deliveries = [[fact_id(rng) for _ in range(rng.randint(1, 2 * window))] for _ in range(channels)]
+
+    start = time.perf_counter()
+    filters = {}
+    for channel_id, ids in enumerate(deliveries):
+        seen = RotatingBloomFilter(window, error_rate)
+        for key in ids:
+            seen.add(key)
+        filters[channel_id] = seen
+    elapsed = time.perf_counter() - start
+    blobs = [seen.to_bytes() for seen in filters.values()]
+    serialized = sum(len(blob) for blob in blobs)
+
+    # Filters are fixed size, so restoring them (as the cog does on first use)
+    # measures the same heap as building them, without tracing every insert
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    restored = [RotatingBloomFilter.from_bytes(blob) for blob in blobs]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    heap = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    inserts = sum(len(ids) for ids in deliveries)
+    print(f"{channels} channels, window {window}, error rate {error_rate}")
+    print(f"  heap:       {heap / channels / 1024:.2f} KB per channel ({heap / 1024 / 1024:.1f} MB total)")
+    print(f"  serialized: {serialized / channels / 1024:.2f} KB per channel")
+    print(f"  inserts:    {inserts / elapsed:,.0f} per second")
+
+    # No false negatives: the last `window` deliveries are always remembered
+    for channel_id, ids in enumerate(deliveries):
+        seen = filters[channel_id]
+        assert all(key in seen for key in ids[-window:]), channel_id
+        assert all(key in restored[channel_id] for key in ids[-window:]), channel_id
+
+    # False positives: fresh IDs wrongly treated as already seen
+    probes = 200
+    false_positives = sum(
+        fact_id(rng) in seen for seen in filters.values() for _ in range(probes)
+    )
+    rate = false_positives / (probes * channels)
+    print(f"  no repeats within the window: OK; unseen facts skipped: {rate:.2%}")
+    assert rate < 3 * error_rate, rate
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
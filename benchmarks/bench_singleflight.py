@@ -0,0 +1,115 @@
+"""Stress benchmark for /weather request coalescing.
+
+Fires N concurrent identical weather lookups at the Weather cog against a
+slow fake Open-Meteo and checks that exactly one geocoding and one forecast
+request go upstream, and that an upstream error reaches every caller.
+
+Run from the repository root:
+    python -m benchmarks.bench_singleflight [callers]
+"""
+import asyncio
+import sys
+import time
+
+from cogs.weather import Weather, WeatherServiceError
+
+UPSTREAM_LATENCY = 0.2  # seconds
+
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status = status
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+
+class FakeRequest:
+    def __init__(self, session, url, params):
+        self.session = session
+        self.url = url
+        self.params = params
+
+    async def __aenter__(self):
+        await asyncio.sleep(UPSTREAM_LATENCY)
+        return self.session.respond(self.url, self.params)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Stands in for the bot's aiohttp session and counts upstream calls"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.geocode_calls = 0
+        self.forecast_calls = 0
+
+    def get(self, url, params=None):
+        return FakeRequest(self, url, params)
+
+    def respond(self, url, params):
+        if "geocoding" in url:
+            self.geocode_calls += 1
+            return FakeResponse(200, {"results": [{
+                "name": "Besançon", "country": "France", "admin1": "Bourgogne-Franche-Comté",
+                "latitude": 47.24878, "longitude": 6.01815,
+                "elevation": 250.0, "population": 128426,
+            }]})
+        self.forecast_calls += 1
+        if self.fail:
+            return FakeResponse(502, {})
+        return FakeResponse(200, {
+            "utc_offset_seconds": 3600,
+            "current": {"time": "2026-01-01T12:00", "temperature_2m": 4.2, "wind_speed_10m": 9.4,
+                        "wind_direction_10m": 200, "weather_code": 2},
+        })
+
+
+class FakeBot:
+    def __init__(self, session):
+        self.session = session
+
+
+async def lookup(cog, city):
+    location = await cog.geocode(city)
+    forecast, stale = await cog.fetch_forecast(location["latitude"], location["longitude"])
+    return forecast
+
+
+async def run(callers, fail=False):
+    session = FakeSession(fail=fail)
+    cog = Weather(FakeBot(session))
+
+    # Spelling variants normalize to the same key and join the same flight.
+    # The city is deliberately not in the bundled dataset, so it is geocoded upstream.
+    cities = ["Besançon", "besancon", "  BESANCON ", "Besançon "]
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(lookup(cog, cities[i % len(cities)]) for i in range(callers)),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - start
+    return session, cog, results, elapsed
+
+
+async def main(callers):
+    session, cog, results, elapsed = await run(callers)
+    assert session.geocode_calls == 1, session.geocode_calls
+    assert session.forecast_calls == 1, session.forecast_calls
+    assert all(r is results[0] for r in results)
+    print(f"{callers} concurrent callers -> {session.geocode_calls} geocode + "
+          f"{session.forecast_calls} forecast request(s) in {elapsed * 1000:.0f} ms")
+    print(f"  single-flight: {cog.flights.stats()}")
+
+    session, cog, results, elapsed = await run(callers, fail=True)
+    assert session.forecast_calls == 1, session.forecast_calls
+    assert all(isinstance(r, WeatherServiceError) for r in results)
+    print(f"{callers} concurrent callers on a failing upstream -> "
+          f"{session.forecast_calls} forecast request, {len(results)} callers got WeatherServiceError")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
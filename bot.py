@@ -3,7 +3,15 @@ from discord.ext import commands
 import os
 from dotenv import load_dotenv
 import asyncio
+import time
 import config
+from utils.http import create_session
+from utils.database import Database
+from utils.log import get_logger, setup_logging
+from utils.permissions import PermissionEngine
+
+log = get_logger("bot")
+command_log = get_logger("commands")
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +26,41 @@ intents.message_content = True
 intents.members = True
 intents.guilds = True
 
+class LoggedCommandTree(discord.app_commands.CommandTree):
+    """Command tree that records every slash command's latency and outcome"""
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started"] = time.perf_counter()
+        return True
+    
+    async def on_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        if isinstance(error, discord.app_commands.CommandOnCooldown):
+            log_command(interaction, "cooldown")
+        elif isinstance(error, discord.app_commands.CheckFailure):
+            log_command(interaction, "denied")
+        else:
+            log_command(interaction, "error", error)
+
+def log_command(interaction: discord.Interaction, outcome: str, error: Exception = None):
+    """Emit one structured record for a finished slash command (subject to LOG_COMMANDS/LOG_ERRORS)"""
+    if not (config.BotConfig.LOG_ERRORS if error is not None else config.BotConfig.LOG_COMMANDS):
+        return
+    started = interaction.extras.get("started")
+    latency_ms = round((time.perf_counter() - started) * 1000, 1) if started is not None else None
+    command = interaction.command.qualified_name if interaction.command else "unknown"
+    fields = {
+        "command": command,
+        "guild_id": interaction.guild_id,
+        "channel_id": interaction.channel_id,
+        "user_id": interaction.user.id,
+        "latency_ms": latency_ms,
+        "outcome": outcome,
+    }
+    if error is None:
+        command_log.info("/%s %s in %s ms", command, outcome, latency_ms, extra={"fields": fields})
+    else:
+        command_log.error("/%s failed: %s", command, error, exc_info=error, extra={"fields": fields})
+
 class Bot(commands.Bot):
     def __init__(self):
         # Pre-define activity to avoid NoneType errors during startup
@@ -28,34 +71,62 @@ class Bot(commands.Bot):
             command_prefix=config.BotConfig.PREFIX,
             intents=intents,
             help_command=None,
-            activity=initial_activity  # This sets status safely on login
+            activity=initial_activity,  # This sets status safely on login
+            tree_cls=LoggedCommandTree
         )
+        
+        # Shared HTTP client, created in setup_hook once the event loop is running
+        self.session = None
+        
+        # Shared SQLite database for persistent state (subscriptions, etc.)
+        self.db = Database(config.DatabaseConfig.PATH)
+        
+        # Who may use restricted commands; checked locally with no REST calls
+        self.permissions = PermissionEngine.from_config()
     
     async def setup_hook(self):
+        # Create the pooled HTTP client and open the database before any cog needs them
+        self.session = create_session()
+        await self.db.connect()
+        
         # Automatically load all cogs from the /cogs folder
         for filename in os.listdir('./cogs'):
             if filename.endswith('.py') and not filename.startswith('_'):
                 try:
                     await self.load_extension(f'cogs.{filename[:-3]}')
-                    print(f'{config.Icons.YES} Loaded cog: {filename}')
+                    log.info("Loaded cog: %s", filename)
                 except Exception as e:
-                    print(f'{config.Icons.NO} Failed to load cog {filename}: {e}')
+                    log.error("Failed to load cog %s: %s", filename, e)
         
         # Sync commands
         if GUILD_ID:
             guild = discord.Object(id=GUILD_ID)
             self.tree.copy_global_to(guild=guild)
             await self.tree.sync(guild=guild)
-            print(f"{config.Icons.INFO} Commands synced to guild ID: {GUILD_ID}")
+            log.info("Commands synced to guild ID: %s", GUILD_ID)
         else:
             await self.tree.sync()
-            print(f"{config.Icons.YES} Commands synced globally")
+            log.info("Commands synced globally")
+    
+    async def close(self):
+        # Unload cogs first, then close the shared resources they were using
+        await super().close()
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        await self.db.close()
     
     async def on_ready(self):
-        print(f'{config.Icons.YES} Logged in as {self.user.name} (ID: {self.user.id})')
-        print(f'{config.Icons.INFO} Invite URL: https://discord.com/api/oauth2/authorize?client_id={self.user.id}&permissions=8&scope=bot%20applications.commands')
-        print(f'{config.Icons.SHIELD} Allowed roles: {config.Roles.ALLOWED_ROLES}')
-        print('─' * 40)
+        log.info("Logged in as %s (ID: %s)", self.user.name, self.user.id)
+        log.info("Invite URL: https://discord.com/api/oauth2/authorize?client_id=%s&permissions=8&scope=bot%%20applications.commands", self.user.id)
+        log.info("Allowed roles: %s", config.Roles.ALLOWED_ROLES)
+    
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        log_command(interaction, "ok")
+    
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        # Drop the cached role set as soon as a member's roles change
+        if before.roles != after.roles:
+            self.permissions.forget(after.guild.id, after.id)
     
     @commands.Cog.listener()
     async def on_app_command_error(self, interaction: discord.Interaction, error):
@@ -70,7 +141,7 @@ class Bot(commands.Bot):
             await interaction.response.send_message(embed=embed, ephemeral=True)
         else:
             if config.BotConfig.LOG_ERRORS:
-                print(f"{config.Icons.NO} Error: {error}")
+                log.error("Error: %s", error)
             
             embed = discord.Embed(
                 title=f"{config.Icons.NO} Error",
@@ -86,49 +157,28 @@ class Bot(commands.Bot):
 # Role check decorator
 def has_allowed_role():
     async def predicate(interaction: discord.Interaction):
-        if interaction.user.id in config.Roles.ALLOWED_USERS:
+        if interaction.client.permissions.is_allowed(interaction):
             return True
         
-        if not config.Roles.ALLOWED_ROLES:
-            return True
-        
-        member = interaction.user
-        if not isinstance(member, discord.Member):
-            try:
-                member = await interaction.guild.fetch_member(member.id)
-            except:
-                return False
-        
-        for role_id in config.Roles.ALLOWED_ROLES:
-            if any(role.id == role_id for role in member.roles):
-                return True
-        
-        embed = discord.Embed(
-            title=f"{config.Icons.NO} Permission Denied",
-            description=config.Messages.NO_PERMISSION,
-            color=config.Colors.ERROR
-        )
-        embed.add_field(
-            name="Required Roles",
-            value="\n".join([f"<@&{role_id}>" for role_id in config.Roles.ALLOWED_ROLES]) or "Not configured",
-            inline=False
-        )
-        embed.set_footer(text=f"User ID: {interaction.user.id}")
-        
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=interaction.client.permissions.denied_embed(interaction), ephemeral=True)
         return False
     return discord.app_commands.check(predicate)
 
 bot = Bot()
 
 if __name__ == '__main__':
+    listener = setup_logging()
     if not TOKEN:
-        print(f"{config.Icons.NO} ERROR: DISCORD_BOT_TOKEN not found!")
+        log.critical("ERROR: DISCORD_BOT_TOKEN not found!")
+        listener.stop()
         exit(1)
     
     try:
         bot.run(TOKEN)
     except discord.LoginFailure:
-        print(f"{config.Icons.NO} ERROR: Invalid bot token!")
+        log.critical("ERROR: Invalid bot token!")
     except Exception as e:
-        print(f"{config.Icons.NO} ERROR: {e}")
\ No newline at end of file
+        log.critical("ERROR: %s", e)
+    finally:
+        # Flush queued records before exiting
+        listener.stop()
\ No newline at end of file
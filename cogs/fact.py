@@ -2,15 +2,81 @@ import discord
 
 from discord import app_commands
 
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import aiohttp
 
 import asyncio
 
+import json
+
+import time
+
 import config
 
-from datetime import datetime
+from collections import deque
+
+from datetime import datetime, timezone
+
+from utils.bloom import RotatingBloomFilter
+
+from utils.ratelimit import TokenBucket
+
+from utils.workers import fan_out
+
+from utils.log import get_logger
+
+log = get_logger("fact")
+
+# Per-channel filters of recently delivered fact IDs
+
+SEEN_SCHEMA = """
+
+CREATE TABLE IF NOT EXISTS fact_seen (
+
+    channel_id INTEGER PRIMARY KEY,
+
+    filter BLOB NOT NULL
+
+);
+
+"""
+
+# Fact of the day: one channel per guild, and the day's fact per language.
+
+# last_posted is written after each successful post, so a restart resumes
+
+# a broadcast where it stopped instead of posting again.
+
+DAILY_SCHEMA = """
+
+CREATE TABLE IF NOT EXISTS fact_daily_channels (
+
+    guild_id INTEGER PRIMARY KEY,
+
+    channel_id INTEGER NOT NULL,
+
+    language TEXT NOT NULL DEFAULT 'en',
+
+    last_posted TEXT
+
+);
+
+CREATE INDEX IF NOT EXISTS idx_fact_daily_channels_due ON fact_daily_channels (last_posted);
+
+CREATE TABLE IF NOT EXISTS fact_daily (
+
+    day TEXT NOT NULL,
+
+    language TEXT NOT NULL,
+
+    data TEXT NOT NULL,
+
+    PRIMARY KEY (day, language)
+
+);
+
+"""
 
 class Fact(commands.Cog):
 
@@ -18,89 +84,589 @@ class Fact(commands.Cog):
 
         self.bot = bot
 
-        self.fact_api = "https://uselessfacts.jsph.pl/api/v2/facts/random?language=en"
+        self.fact_api = "https://uselessfacts.jsph.pl/api/v2/facts/random"
+
+        self.daily_api = "https://uselessfacts.jsph.pl/api/v2/facts/today"
+
+        
+
+        # Prefetched facts per language, so /fact can answer without a round trip
+
+        self.buffers = {
+
+            language: deque(maxlen=config.FactConfig.BUFFER_SIZE)
+
+            for language in config.FactConfig.LANGUAGES
+
+        }
+
+        self._refills = {}  # language -> running refill task
+
+        # Bounds concurrent upstream requests across all refills
+
+        self.refill_slots = asyncio.Semaphore(config.FactConfig.REFILL_CONCURRENCY)
+
+        
+
+        # Fact IDs each channel has recently seen (loaded on first use, saved periodically)
+
+        self.seen = {}  # channel id -> RotatingBloomFilter
+
+        self._dirty = set()
+
+        
+
+        # Paces fact-of-the-day posts below Discord's global rate limit
+
+        self.daily_limiter = TokenBucket(config.FactConfig.DAILY_RATE)
 
     
 
-    @app_commands.command(name="fact", description="Get a random useless fact!")
+    async def cog_load(self):
 
-    @app_commands.checks.cooldown(1, 5)  # 5 second cooldown
+        await self.bot.db.executescript(SEEN_SCHEMA + DAILY_SCHEMA)
+
+        for language in self.buffers:
+
+            self.schedule_refill(language)
+
+        self.seen_flusher.start()
+
+        self.daily_broadcaster.start()
+
+    
 
-    async def fact(self, interaction: discord.Interaction):
+    async def cog_unload(self):
 
-        """Fetch and display a random useless fact"""
+        for task in self._refills.values():
+
+            task.cancel()
+
+        self.seen_flusher.cancel()
+
+        self.daily_broadcaster.cancel()
+
+        await self.flush_seen()
+
+    
+
+    async def get_seen(self, channel_id: int) -> RotatingBloomFilter:
+
+        """Returns the seen-fact filter for a channel, loading it from the database on first use"""
+
+        seen = self.seen.get(channel_id)
+
+        if seen is not None:
+
+            return seen
 
         
 
-        # Defer response while we fetch the fact
+        row = await self.bot.db.fetchone("SELECT filter FROM fact_seen WHERE channel_id = ?", (channel_id,))
 
-        await interaction.response.defer()
+        if row is not None:
+
+            try:
+
+                seen = RotatingBloomFilter.from_bytes(row[0])
+
+            except Exception:
+
+                seen = None
+
+        if seen is None or seen.window != config.FactConfig.NO_REPEAT_WINDOW:
+
+            # New channel, unreadable row or a changed window: start fresh
+
+            seen = RotatingBloomFilter(config.FactConfig.NO_REPEAT_WINDOW, config.FactConfig.SEEN_ERROR_RATE)
+
+        return self.seen.setdefault(channel_id, seen)
+
+    
+
+    def mark_seen(self, channel_id: int, data: dict):
+
+        self.seen[channel_id].add(data.get("id", ""))
+
+        self._dirty.add(channel_id)
+
+    
+
+    @tasks.loop(seconds=config.FactConfig.SEEN_FLUSH_INTERVAL)
+
+    async def seen_flusher(self):
+
+        try:
+
+            await self.flush_seen()
+
+        except Exception as e:
+
+            if config.BotConfig.LOG_ERRORS:
+
+                log.warning("Failed to save seen facts: %s", e)
+
+    
+
+    async def flush_seen(self):
+
+        """Write the filters of channels that received facts since the last flush"""
+
+        if not self._dirty:
+
+            return
+
+        rows = [(channel_id, self.seen[channel_id].to_bytes()) for channel_id in self._dirty]
+
+        self._dirty.clear()
+
+        await self.bot.db.executemany(
+
+            "INSERT INTO fact_seen (channel_id, filter) VALUES (?, ?) "
+
+            "ON CONFLICT (channel_id) DO UPDATE SET filter = excluded.filter",
+
+            rows
+
+        )
+
+    
+
+    async def fetch_fact(self, language: str):
+
+        """Fetch one random fact, or None if the API answers with an error status"""
+
+        async with self.bot.session.get(self.fact_api, params={"language": language}) as response:
+
+            if response.status != 200:
+
+                return None
+
+            return await response.json()
+
+    
+
+    def schedule_refill(self, language: str):
+
+        """Start refilling a buffer once it drops to the low-water mark"""
+
+        if len(self.buffers[language]) > config.FactConfig.LOW_WATER_MARK or language in self._refills:
+
+            return
+
+        task = asyncio.create_task(self._refill(language))
+
+        self._refills[language] = task
+
+        task.add_done_callback(lambda _: self._refills.pop(language, None))
+
+    
+
+    async def _refill(self, language: str):
+
+        buffer = self.buffers[language]
+
+        while len(buffer) < buffer.maxlen:
+
+            wanted = min(buffer.maxlen - len(buffer), config.FactConfig.REFILL_CONCURRENCY)
+
+            results = await asyncio.gather(*(self._fetch_for_buffer(language) for _ in range(wanted)), return_exceptions=True)
+
+            
+
+            buffered = {data.get("id") for data in buffer}
+
+            added = 0
+
+            for data in results:
+
+                if isinstance(data, dict) and data.get("text") and data.get("id") not in buffered:
+
+                    buffer.append(data)
+
+                    buffered.add(data.get("id"))
+
+                    added += 1
+
+            
+
+            if not added:
+
+                # Upstream is failing (or only repeating itself); the next /fact retries
+
+                errors = [result for result in results if isinstance(result, BaseException)]
+
+                if errors and config.BotConfig.LOG_ERRORS:
+
+                    log.warning("Fact buffer refill (%s) failed: %s", language, errors[0])
+
+                return
+
+    
+
+    async def _fetch_for_buffer(self, language: str):
+
+        async with self.refill_slots:
+
+            return await self.fetch_fact(language)
+
+    
+
+    def take_unseen(self, language: str, seen: RotatingBloomFilter):
+
+        """Remove and return the first buffered fact not in ``seen``, or None"""
+
+        buffer = self.buffers[language]
+
+        for i, data in enumerate(buffer):
+
+            if data.get("id") not in seen:
+
+                del buffer[i]
+
+                self.schedule_refill(language)
+
+                return data
+
+        return None
+
+    
+
+    async def fetch_unseen(self, language: str, seen: RotatingBloomFilter):
+
+        """Fetch live until a fact not in ``seen`` comes back; None if the API fails or keeps repeating"""
+
+        for _ in range(config.FactConfig.LIVE_ATTEMPTS):
+
+            data = await self.fetch_fact(language)
+
+            if data is None:
+
+                return None
+
+            if data.get("id") not in seen:
+
+                return data
+
+        return None
+
+    
+
+    async def get_daily_fact(self, day: str, language: str):
+
+        """The fact of the day for a language; fetched once, then served from the database"""
+
+        row = await self.bot.db.fetchone("SELECT data FROM fact_daily WHERE day = ? AND language = ?", (day, language))
+
+        if row is not None:
+
+            return json.loads(row[0])
+
+        
+
+        async with self.bot.session.get(self.daily_api, params={"language": language}) as response:
+
+            if response.status != 200:
+
+                return None
+
+            data = await response.json()
+
+        if not data.get("text"):
+
+            return None
 
         
 
+        await self.bot.db.execute(
+
+            "INSERT OR IGNORE INTO fact_daily (day, language, data) VALUES (?, ?, ?)",
+
+            (day, language, json.dumps(data))
+
+        )
+
+        return data
+
+    
+
+    @tasks.loop(seconds=config.FactConfig.DAILY_TICK)
+
+    async def daily_broadcaster(self):
+
+        """Post the fact of the day to every guild that hasn't had it yet"""
+
         try:
 
-            async with aiohttp.ClientSession() as session:
+            await self.broadcast_daily()
+
+        except Exception as e:
+
+            # Keep the loop alive; unposted guilds are retried next tick
+
+            if config.BotConfig.LOG_ERRORS:
+
+                log.error("Fact of the day broadcast error: %s", e)
+
+    
+
+    @daily_broadcaster.before_loop
+
+    async def before_daily_broadcaster(self):
+
+        await self.bot.wait_until_ready()
+
+    
+
+    async def broadcast_daily(self, now: datetime = None) -> int:
+
+        """Send today's fact to every due guild; returns the number of channels posted to"""
+
+        if now is None:
+
+            now = datetime.now(timezone.utc)
+
+        if now.hour < config.FactConfig.DAILY_HOUR:
+
+            return 0
+
+        today = now.date().isoformat()
+
+        
+
+        rows = await self.bot.db.fetchall(
+
+            "SELECT guild_id, channel_id, language FROM fact_daily_channels "
+
+            "WHERE last_posted IS NULL OR last_posted < ?",
+
+            (today,)
+
+        )
+
+        if not rows:
+
+            return 0
+
+        
+
+        # One upstream fetch per language, however many guilds are waiting
+
+        embeds = {}
+
+        for language in {row[2] for row in rows}:
+
+            try:
+
+                data = await self.get_daily_fact(today, language)
+
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+
+                data = None
+
+                if config.BotConfig.LOG_ERRORS:
+
+                    log.warning("Couldn't fetch the fact of the day (%s): %s", language, e)
+
+            if data is not None:
+
+                embeds[language] = self.build_fact_embed(data, title="Fact of the Day")
+
+        
+
+        async def post(row):
+
+            guild_id, channel_id, language = row
+
+            channel = self.bot.get_partial_messageable(channel_id, guild_id=guild_id)
+
+            try:
+
+                await channel.send(embed=embeds[language])
+
+            except (discord.Forbidden, discord.NotFound):
+
+                # Deleted or inaccessible channels are skipped for the day rather than retried every tick
+
+                await self.mark_daily_posted(guild_id, today)
+
+                raise
+
+            # Recorded right after the send, so a restart mid-broadcast never posts twice
+
+            await self.mark_daily_posted(guild_id, today)
+
+        
+
+        # Every post is its own channel's rate-limit bucket, so the global
+
+        # limit is what matters: bounded workers drawing from a token bucket.
+
+        # discord.py still waits out any 429 it receives.
+
+        started = time.perf_counter()
+
+        posted = 0
+
+        due = [row for row in rows if row[2] in embeds]
+
+        async for (_, channel_id, _), _, error in fan_out(
+
+            due, post, config.FactConfig.DAILY_WORKERS, self.daily_limiter
+
+        ):
+
+            if error is None:
+
+                posted += 1
+
+            elif config.BotConfig.LOG_ERRORS:
+
+                # Failures other than Forbidden/NotFound are retried next tick
+
+                log.warning("Failed to post the fact of the day in channel %s: %s", channel_id, error)
+
+        
+
+        if config.BotConfig.LOG_COMMANDS:
+
+            log.info("Fact of the day posted to %s/%s channels in %.1fs", posted, len(due), time.perf_counter() - started)
+
+        return posted
+
+    
+
+    async def mark_daily_posted(self, guild_id: int, day: str):
+
+        await self.bot.db.execute("UPDATE fact_daily_channels SET last_posted = ? WHERE guild_id = ?", (day, guild_id))
+
+    
+
+    def build_fact_embed(self, data: dict, title: str = "Random Useless Fact") -> discord.Embed:
+
+        """Render a fact from the API as an embed"""
+
+        fact_text = data.get('text', 'No fact found!')
+
+        fact_id = data.get('id', 'Unknown')
+
+        source = data.get('source', 'Unknown')
 
-                async with session.get(self.fact_api) as response:
+        permalink = data.get('permalink', '')
 
-                    if response.status == 200:
+        
+
+        # Create beautiful embed
+
+        embed = discord.Embed(
+
+            title=f"{config.Icons.INFO} {title}",
+
+            description=fact_text,
+
+            color=config.Colors.INFO
+
+        )
+
+        
+
+        # Add fields
+
+        embed.add_field(name="Source", value=f"[{source}]({permalink})" if permalink else source, inline=True)
+
+        embed.add_field(name="Fact ID", value=f"`{fact_id[:8]}`", inline=True)
+
+        
+
+        # Add fun footer
+
+        embed.set_footer(text="Did you know? • Powered by uselessfacts.jsph.pl")
+
+        embed.timestamp = datetime.utcnow()
+
+        return embed
+
+    
+
+    @app_commands.command(name="fact", description="Get a random useless fact!")
+
+    @app_commands.describe(language="Language of the fact")
+
+    @app_commands.choices(language=[
 
-                        data = await response.json()
+        app_commands.Choice(name="English", value="en"),
 
-                        fact_text = data.get('text', 'No fact found!')
+        app_commands.Choice(name="German", value="de"),
 
-                        fact_id = data.get('id', 'Unknown')
+    ])
 
-                        source = data.get('source', 'Unknown')
+    @app_commands.checks.cooldown(1, 5)  # 5 second cooldown
+
+    async def fact(self, interaction: discord.Interaction, language: str = "en"):
+
+        """Display a random useless fact"""
+
+        
+
+        # Facts are never repeated in a channel within NO_REPEAT_WINDOW deliveries
+
+        seen = await self.get_seen(interaction.channel_id)
+
+        
+
+        # Answer straight from the prefetched buffer when possible
+
+        data = self.take_unseen(language, seen)
+
+        if data is not None:
 
-                        permalink = data.get('permalink', '')
+            self.mark_seen(interaction.channel_id, data)
 
-                        
+            await interaction.response.send_message(embed=self.build_fact_embed(data))
 
-                        # Create beautiful embed
+            return
 
-                        embed = discord.Embed(
+        
 
-                            title=f"{config.Icons.INFO} Random Useless Fact",
+        # Nothing new buffered: defer and fetch live while the buffer refills
 
-                            description=fact_text,
+        await interaction.response.defer()
 
-                            color=config.Colors.INFO
+        
 
-                        )
+        try:
 
-                        
+            data = await self.fetch_unseen(language, seen)
 
-                        # Add fields
+            self.schedule_refill(language)
 
-                        embed.add_field(name="Source", value=f"[{source}]({permalink})" if permalink else source, inline=True)
+            if data is not None:
 
-                        embed.add_field(name="Fact ID", value=f"`{fact_id[:8]}`", inline=True)
+                self.mark_seen(interaction.channel_id, data)
 
-                        
+                await interaction.followup.send(embed=self.build_fact_embed(data))
 
-                        # Add fun footer
+            else:
 
-                        embed.set_footer(text="Did you know? • Powered by uselessfacts.jsph.pl")
+                await interaction.followup.send(
 
-                        embed.timestamp = datetime.utcnow()
+                    f"{config.Icons.NO} Failed to fetch a new fact. Please try again later.",
 
-                        
+                    ephemeral=True
 
-                        await interaction.followup.send(embed=embed)
+                )
 
-                    else:
+        
 
-                        await interaction.followup.send(
+        except asyncio.TimeoutError:
 
-                            f"{config.Icons.NO} Failed to fetch a fact. Please try again later.",
+            await interaction.followup.send(
 
-                            ephemeral=True
+                f"{config.Icons.NO} The fact API took too long to respond. Please try again later.",
 
-                        )
+                ephemeral=True
 
-                        
+            )
 
         except aiohttp.ClientError:
 
@@ -116,7 +682,7 @@ class Fact(commands.Cog):
 
             if config.BotConfig.LOG_ERRORS:
 
-                print(f"{config.Icons.NO} Fact command error: {e}")
+                log.error("Fact command error: %s", e)
 
             await interaction.followup.send(
 
@@ -126,6 +692,96 @@ class Fact(commands.Cog):
 
             )
 
+    @app_commands.command(name="fact-daily", description="Post the fact of the day in a channel every day")
+
+    @app_commands.describe(channel="Channel to post in", language="Language of the fact")
+
+    @app_commands.choices(language=[
+
+        app_commands.Choice(name="English", value="en"),
+
+        app_commands.Choice(name="German", value="de"),
+
+    ])
+
+    @app_commands.guild_only()
+
+    @app_commands.default_permissions(manage_guild=True)
+
+    async def fact_daily(self, interaction: discord.Interaction, channel: discord.TextChannel, language: str = "en"):
+
+        """Set this server's fact-of-the-day channel"""
+
+        # If today's broadcast has already started, the first post goes out tomorrow
+
+        now = datetime.now(timezone.utc)
+
+        last_posted = now.date().isoformat() if now.hour >= config.FactConfig.DAILY_HOUR else None
+
+        
+
+        await self.bot.db.execute(
+
+            "INSERT INTO fact_daily_channels (guild_id, channel_id, language, last_posted) VALUES (?, ?, ?, ?) "
+
+            "ON CONFLICT (guild_id) DO UPDATE SET channel_id = excluded.channel_id, language = excluded.language",
+
+            (interaction.guild_id, channel.id, language, last_posted)
+
+        )
+
+        
+
+        embed = discord.Embed(
+
+            title=f"{config.Icons.YES} Fact of the Day Enabled",
+
+            description=f"The fact of the day will be posted in {channel.mention} at **{config.FactConfig.DAILY_HOUR:02d}:00 UTC**.",
+
+            color=config.Colors.SUCCESS
+
+        )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    
+
+    @app_commands.command(name="fact-daily-stop", description="Stop posting the fact of the day")
+
+    @app_commands.guild_only()
+
+    @app_commands.default_permissions(manage_guild=True)
+
+    async def fact_daily_stop(self, interaction: discord.Interaction):
+
+        """Remove this server's fact-of-the-day channel"""
+
+        removed = await self.bot.db.execute("DELETE FROM fact_daily_channels WHERE guild_id = ?", (interaction.guild_id,))
+
+        
+
+        if not removed:
+
+            await interaction.response.send_message(
+
+                f"{config.Icons.NO} This server doesn't have a fact of the day channel.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        await interaction.response.send_message(
+
+            f"{config.Icons.YES} The fact of the day will no longer be posted.",
+
+            ephemeral=True
+
+        )
+
 async def setup(bot):
 
-    await bot.add_cog(Fact(bot))
+    await bot.add_cog(Fact(bot))
\ No newline at end of file
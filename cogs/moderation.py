@@ -1,40 +1,78 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
-from datetime import timedelta
+import io
+import re
+from datetime import datetime, timedelta, timezone
 import time
 import config
+from utils.cases import CaseJournal
+from utils.log import get_logger
+from utils.message_index import RecentMessageIndex
+from utils.pattern import PatternTimeout
+from utils.purge import Purge, PurgeFilter
+from utils.workers import fan_out
+
+log = get_logger("moderation")
+
+# Discord IDs (snowflakes) in pasted text: bare, in mentions, comma or line separated
+SNOWFLAKE = re.compile(r"\b\d{17,20}\b")
 
 class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self._cd = commands.CooldownMapping.from_cooldown(1, config.BotConfig.COMMAND_COOLDOWN, commands.BucketType.user)
-    
-    # Role check function using config
-    async def check_role(self, interaction: discord.Interaction):
-        # Check allowed users first
-        if interaction.user.id in config.Roles.ALLOWED_USERS:
-            return True
         
-        # If no roles are specified, allow all
-        if not config.Roles.ALLOWED_ROLES:
-            return True
+        # Bans seen through gateway events: guild id -> {user id: user name}.
+        # Bans from before startup aren't in it; those are looked up with fetch_ban.
+        self.ban_index = {}
         
-        # Check if user has any of the allowed roles
-        member = interaction.user
-        if isinstance(member, discord.User):
-            try:
-                member = await interaction.guild.fetch_member(member.id)
-            except:
-                return False
+        # Recent message IDs per (guild, user), so /purge-user never reads channel history
+        self.message_index = RecentMessageIndex(
+            config.CommandDefaults.PURGE_USER_PER_USER,
+            config.CommandDefaults.PURGE_USER_MAX_MESSAGES
+        )
         
-        # Check for allowed roles
-        for role_id in config.Roles.ALLOWED_ROLES:
-            role = discord.utils.get(member.roles, id=role_id)
-            if role is not None:
-                return True
+        # Every moderation action becomes a case; written to the database in batches
+        self.cases = CaseJournal(bot.db)
+    
+    async def cog_load(self):
+        await self.cases.start()
+        self.case_writer.start()
+    
+    async def cog_unload(self):
+        self.case_writer.cancel()
+        await self.cases.flush()
+    
+    @tasks.loop(seconds=config.CommandDefaults.CASE_FLUSH_INTERVAL)
+    async def case_writer(self):
+        try:
+            await self.cases.flush()
+        except Exception as e:
+            # Unwritten cases stay queued for the next flush
+            if config.BotConfig.LOG_ERRORS:
+                log.warning("Failed to save moderation cases: %s", e)
+    
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is not None and message.author.id != self.bot.user.id:
+            self.message_index.add(message.guild.id, message.author.id, message.channel.id, message.id)
+    
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user):
+        self.ban_index.setdefault(guild.id, {})[user.id] = user.name
+    
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        self.ban_index.get(guild.id, {}).pop(user.id, None)
+    
+    # Role check function using the bot's permission engine (no network I/O)
+    async def check_role(self, interaction: discord.Interaction):
+        if self.bot.permissions.is_allowed(interaction):
+            return True
         
+        await interaction.response.send_message(embed=self.bot.permissions.denied_embed(interaction), ephemeral=True)
         return False
     
     # Create embed template
@@ -49,6 +87,53 @@ class Moderation(commands.Cog):
         )
         return embed
     
+    # Send a response, or a followup once the interaction has been deferred.
+    # The first followup after a public defer replaces the "thinking" message and
+    # stays public, so for a private reply that placeholder is deleted first.
+    async def _respond(self, interaction: discord.Interaction, embed, ephemeral=False):
+        if interaction.response.is_done():
+            if ephemeral:
+                try:
+                    await interaction.delete_original_response()
+                except discord.HTTPException:
+                    pass
+            await interaction.followup.send(embed=embed, ephemeral=ephemeral)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=ephemeral)
+    
+    # Update a progress followup; False once it can't be edited any more.
+    # Followups are edited through the interaction token, which expires after
+    # 15 minutes, so long runs must keep going without progress updates.
+    async def _edit_progress(self, message, embed):
+        try:
+            await message.edit(embed=embed)
+            return True
+        except discord.HTTPException as e:
+            log.warning("Stopped progress updates: %s", e)
+            return False
+    
+    # Replace a progress followup with the final report. Once the interaction token
+    # has expired, post it in the channel instead, or DM it to the moderator if the
+    # followup was private. True if the followup was edited.
+    async def _send_report(self, interaction: discord.Interaction, message, embed, files=None, private=False):
+        try:
+            await message.edit(embed=embed, attachments=files or [])
+            return True
+        except discord.HTTPException:
+            pass
+        for file in files or []:
+            file.reset()
+        try:
+            destination = interaction.user if private else interaction.channel
+            await destination.send(embed=embed, files=files or [])
+        except discord.HTTPException as e:
+            log.warning("Could not deliver report for /%s: %s", interaction.command.name, e)
+        return False
+    
+    # Record a moderation case for this interaction and return its number
+    def record_case(self, interaction: discord.Interaction, action, target_id, reason, details=None):
+        return self.cases.record(interaction.guild.id, action, target_id, interaction.user.id, reason, details)
+    
     # Add footer to embed
     def add_embed_footer(self, embed, member, moderator):
         embed.set_footer(text=f"User ID: {member.id} | Moderator: {moderator.name}")
@@ -137,13 +222,14 @@ class Moderation(commands.Cog):
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
             embed.add_field(name="Member", value=member.mention, inline=True)
+            embed.add_field(name="Case", value=f"#{self.record_case(interaction, 'kick', member.id, reason)}", inline=True)
             embed = self.add_embed_footer(embed, member, interaction.user)
             
             await interaction.response.send_message(embed=embed)
             
             # Log the action
             if config.BotConfig.LOG_COMMANDS:
-                print(f"{config.Icons.KICK} {interaction.user} kicked {member} for: {reason}")
+                log.info("%s kicked %s for: %s", interaction.user, member, reason)
             
         except discord.Forbidden:
             embed = self.create_embed(
@@ -252,13 +338,14 @@ class Moderation(commands.Cog):
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Messages Deleted", value=f"{delete_message_days} days", inline=True)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
+            embed.add_field(name="Case", value=f"#{self.record_case(interaction, 'ban', member.id, reason)}", inline=True)
             embed = self.add_embed_footer(embed, member, interaction.user)
             
             await interaction.response.send_message(embed=embed)
             
             # Log the action
             if config.BotConfig.LOG_COMMANDS:
-                print(f"{config.Icons.BAN} {interaction.user} banned {member} for: {reason}")
+                log.info("%s banned %s for: %s", interaction.user, member, reason)
             
         except discord.Forbidden:
             embed = self.create_embed(
@@ -318,51 +405,60 @@ class Moderation(commands.Cog):
         if not reason:
             reason = config.CommandDefaults.DEFAULT_REASON
         
+        # Everything below talks to Discord, so acknowledge the interaction first;
+        # _respond keeps the not-banned and error replies private after the defer
+        await interaction.response.defer(thinking=True)
+        
         # Try to unban the user
         try:
-            user = await self.bot.fetch_user(user_id_int)
+            # Known bans come from the event-maintained index; anything else is one fetch_ban
+            banned = self.ban_index.get(interaction.guild.id, {})
+            user_name = banned.get(user_id_int)
+            if user_name is None:
+                try:
+                    ban_entry = await interaction.guild.fetch_ban(discord.Object(id=user_id_int))
+                except discord.NotFound:
+                    embed = self.create_embed(
+                        "Not Banned",
+                        f"User `{user_id_int}` is not banned.",
+                        config.Colors.WARNING,
+                        config.Icons.WARNING
+                    )
+                    await self._respond(interaction, embed, ephemeral=True)
+                    return
+                user_name = ban_entry.user.name
             
-            # Check if user is banned
-            banned_users = [ban_entry async for ban_entry in interaction.guild.bans()]
-            banned_ids = [ban.user.id for ban in banned_users]
-            
-            if user_id_int not in banned_ids:
-                embed = self.create_embed(
-                    "Not Banned",
-                    f"User **{user.name}** is not banned.",
-                    config.Colors.WARNING,
-                    config.Icons.WARNING
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                return
-            
-            await interaction.guild.unban(user, reason=f"{interaction.user.name}: {reason}")
+            await interaction.guild.unban(discord.Object(id=user_id_int), reason=f"{interaction.user.name}: {reason}")
+            banned.pop(user_id_int, None)
             
             embed = self.create_embed(
                 "User Unbanned",
-                f"**{user.name}** has been unbanned from the server.",
+                f"**{user_name}** has been unbanned from the server.",
                 config.Colors.SUCCESS,
                 config.Icons.YES
             )
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
-            embed.set_footer(text=f"User ID: {user.id}")
+            embed.add_field(name="Case", value=f"#{self.record_case(interaction, 'unban', user_id_int, reason)}", inline=True)
+            embed.set_footer(text=f"User ID: {user_id_int}")
             embed.timestamp = discord.utils.utcnow()
             
-            await interaction.response.send_message(embed=embed)
+            await self._respond(interaction, embed)
             
             # Log the action
             if config.BotConfig.LOG_COMMANDS:
-                print(f"{config.Icons.YES} {interaction.user} unbanned {user} for: {reason}")
+                log.info("%s unbanned %s (%s) for: %s", interaction.user, user_name, user_id_int, reason)
             
         except discord.NotFound:
+            # The index was stale: the ban was lifted while we weren't watching
+            self.ban_index.get(interaction.guild.id, {}).pop(user_id_int, None)
             embed = self.create_embed(
-                "User Not Found",
-                config.Messages.USER_NOT_FOUND,
-                config.Colors.ERROR,
-                config.Icons.NO
+                "Not Banned",
+                f"User `{user_id_int}` is not banned.",
+                config.Colors.WARNING,
+                config.Icons.WARNING
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await self._respond(interaction, embed, ephemeral=True)
         except discord.Forbidden:
             embed = self.create_embed(
                 "Permission Error",
@@ -370,7 +466,7 @@ class Moderation(commands.Cog):
                 config.Colors.ERROR,
                 config.Icons.NO
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await self._respond(interaction, embed, ephemeral=True)
         except Exception as e:
             embed = self.create_embed(
                 "Error",
@@ -378,7 +474,7 @@ class Moderation(commands.Cog):
                 config.Colors.ERROR,
                 config.Icons.NO
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await self._respond(interaction, embed, ephemeral=True)
     
     # Timeout command
     @app_commands.command(name="timeout", description="Timeout a member")
@@ -471,13 +567,14 @@ class Moderation(commands.Cog):
             embed.add_field(name="Until", value=f"<t:{int((discord.utils.utcnow() + duration).timestamp())}:R>", inline=True)
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
+            embed.add_field(name="Case", value=f"#{self.record_case(interaction, 'timeout', member.id, reason, f'{minutes} minutes')}", inline=True)
             embed = self.add_embed_footer(embed, member, interaction.user)
             
             await interaction.response.send_message(embed=embed)
             
             # Log the action
             if config.BotConfig.LOG_COMMANDS:
-                print(f"{config.Icons.TIMEOUT} {interaction.user} timed out {member} for {minutes} minutes: {reason}")
+                log.info("%s timed out %s for %s minutes: %s", interaction.user, member, minutes, reason)
             
         except discord.Forbidden:
             embed = self.create_embed(
@@ -549,13 +646,14 @@ class Moderation(commands.Cog):
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
             embed.add_field(name="Member", value=member.mention, inline=True)
+            embed.add_field(name="Case", value=f"#{self.record_case(interaction, 'untimeout', member.id, reason)}", inline=True)
             embed = self.add_embed_footer(embed, member, interaction.user)
             
             await interaction.response.send_message(embed=embed)
             
             # Log the action
             if config.BotConfig.LOG_COMMANDS:
-                print(f"{config.Icons.YES} {interaction.user} removed timeout from {member}: {reason}")
+                log.info("%s removed timeout from %s: %s", interaction.user, member, reason)
             
         except discord.Forbidden:
             embed = self.create_embed(
@@ -578,10 +676,20 @@ class Moderation(commands.Cog):
     @app_commands.command(name="clear", description="Clear a number of messages")
     @app_commands.describe(
         amount="Number of messages to clear",
-        member="Only clear messages from this member (optional)"
+        member="Only clear messages from this member (optional)",
+        bots="Only clear messages sent by bots",
+        matching="Only clear messages matching this regular expression (case-insensitive)",
+        attachments="Only clear messages with attachments",
+        links="Only clear messages containing links",
+        before="Only clear messages sent before this date (YYYY-MM-DD, UTC)",
+        after="Only clear messages sent after this date (YYYY-MM-DD, UTC)"
     )
     @app_commands.checks.cooldown(1, config.BotConfig.CLEAR_COOLDOWN)
-    async def clear(self, interaction: discord.Interaction, amount: int, member: discord.Member = None):
+    async def clear(self, interaction: discord.Interaction, amount: int, member: discord.Member = None,
+                    bots: bool = False,
+                    matching: app_commands.Range[str, 1, config.CommandDefaults.CLEAR_PATTERN_MAX_LENGTH] = None,
+                    attachments: bool = False, links: bool = False,
+                    before: str = None, after: str = None):
         """Clear messages from a channel"""
         # Check permissions
         if not await self.check_role(interaction):
@@ -609,18 +717,66 @@ class Moderation(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
+        # Validate filters
+        try:
+            before_date = datetime.strptime(before, "%Y-%m-%d").replace(tzinfo=timezone.utc) if before else None
+            after_date = datetime.strptime(after, "%Y-%m-%d").replace(tzinfo=timezone.utc) if after else None
+            check = PurgeFilter(
+                member.id if member else None, bots, matching, attachments, links,
+                pattern_timeout=config.CommandDefaults.CLEAR_PATTERN_TIMEOUT
+            )
+        except ValueError:
+            embed = self.create_embed(
+                "Invalid Filter",
+                "Dates must look like 2024-05-31.",
+                config.Colors.ERROR,
+                config.Icons.NO
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        except re.error as e:
+            embed = self.create_embed(
+                "Invalid Filter",
+                f"Invalid regular expression: {e}",
+                config.Colors.ERROR,
+                config.Icons.NO
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
         # Clear messages
+        await interaction.response.defer(ephemeral=True)
+        
+        progress = self.create_embed(
+            "Clearing Messages",
+            f"Clearing up to **{amount}** messages...",
+            config.Colors.INFO,
+            config.Icons.CLEAR
+        )
+        message = await interaction.followup.send(embed=progress, ephemeral=True, wait=True)
+        
+        reporting = True
+        
+        async def report(purge):
+            nonlocal reporting
+            if reporting:
+                progress.description = f"Cleared **{purge.deleted}** of up to **{amount}** messages ({purge.scanned} scanned)..."
+                reporting = await self._edit_progress(message, progress)
+        
+        # Walks history lazily: bulk deletes for recent messages, throttled single deletes past 14 days
+        purge = Purge(
+            interaction.channel, check, amount,
+            scan_limit=config.CommandDefaults.CLEAR_SCAN_MAX,
+            before=before_date, after=after_date,
+            old_rate=config.CommandDefaults.CLEAR_OLD_DELETE_RATE
+        )
+        
         try:
-            await interaction.response.defer(ephemeral=True)
-            
-            def check(msg):
-                return member is None or msg.author.id == member.id
-            
-            deleted = await interaction.channel.purge(limit=amount, check=check if member else None, bulk=True)
+            await purge.run(report, config.CommandDefaults.CLEAR_PROGRESS_INTERVAL)
             
             embed = self.create_embed(
                 "Messages Cleared",
-                f"Cleared **{len(deleted)}** messages.",
+                f"Cleared **{purge.deleted}** messages.",
                 config.Colors.SUCCESS,
                 config.Icons.CLEAR
             )
@@ -628,18 +784,30 @@ class Moderation(commands.Cog):
                 embed.add_field(name="Filtered By", value=member.mention, inline=True)
             embed.add_field(name="Channel", value=interaction.channel.mention, inline=True)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
+            embed.add_field(name="Scanned", value=str(purge.scanned), inline=True)
+            if purge.failed:
+                embed.add_field(name="Failed", value=str(purge.failed), inline=True)
+            case_id = self.record_case(
+                interaction, "clear", member.id if member else None, None,
+                f"{purge.deleted} messages in #{interaction.channel}"
+            )
+            embed.add_field(name="Case", value=f"#{case_id}", inline=True)
             embed.set_footer(text=f"Cleared at")
             embed.timestamp = discord.utils.utcnow()
             
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            edited = await self._send_report(interaction, message, embed, private=True)
             
             # Log the action
             if config.BotConfig.LOG_COMMANDS:
-                print(f"{config.Icons.CLEAR} {interaction.user} cleared {len(deleted)} messages in #{interaction.channel}")
+                log.info("%s cleared %s messages in #%s", interaction.user, purge.deleted, interaction.channel)
             
             # Delete the success message after 5 seconds
-            await asyncio.sleep(5)
-            await interaction.delete_original_response()
+            if edited:
+                await asyncio.sleep(5)
+                try:
+                    await interaction.delete_original_response()
+                except discord.HTTPException:
+                    pass
             
         except discord.Forbidden:
             embed = self.create_embed(
@@ -648,15 +816,473 @@ class Moderation(commands.Cog):
                 config.Colors.ERROR,
                 config.Icons.NO
             )
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await self._send_report(interaction, message, embed, private=True)
+        except PatternTimeout:
+            embed = self.create_embed(
+                "Pattern Too Slow",
+                f"Stopped after clearing {purge.deleted} messages: the `matching` pattern took too long. Try a simpler one.",
+                config.Colors.ERROR,
+                config.Icons.NO
+            )
+            await self._send_report(interaction, message, embed, private=True)
         except Exception as e:
             embed = self.create_embed(
                 "Error",
-                f"An error occurred: {str(e)}",
+                f"An error occurred after clearing {purge.deleted} messages: {str(e)}",
                 config.Colors.ERROR,
                 config.Icons.NO
             )
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await self._send_report(interaction, message, embed, private=True)
+    
+    # Purge a user's recent messages across all channels
+    @app_commands.command(name="purge-user", description="Delete a user's recent messages in every channel")
+    @app_commands.describe(
+        member="The user whose messages to delete",
+        minutes="How many minutes back to delete"
+    )
+    @app_commands.checks.cooldown(1, config.BotConfig.CLEAR_COOLDOWN)
+    async def purge_user(self, interaction: discord.Interaction, member: discord.User,
+                         minutes: app_commands.Range[int, 1, config.CommandDefaults.PURGE_USER_MAX_MINUTES]):
+        """Delete a user's recent messages everywhere, using the recent-message index"""
+        if not await self.check_role(interaction):
+            return
+        
+        if not interaction.guild.me.guild_permissions.manage_messages:
+            embed = self.create_embed(
+                "Permission Error",
+                config.Messages.NO_BOT_PERMISSION,
+                config.Colors.ERROR,
+                config.Icons.NO
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        # Message IDs are snowflakes, so "newer than the cutoff" is a plain comparison
+        cutoff = discord.utils.time_snowflake(discord.utils.utcnow() - timedelta(minutes=minutes))
+        # Messages leave the index only once they are gone, so a failed delete can be retried
+        by_channel = self.message_index.peek(interaction.guild.id, member.id, cutoff)
+        
+        async def purge_channel(item):
+            channel_id, message_ids = item
+            channel = interaction.guild.get_channel_or_thread(channel_id)
+            if channel is None:
+                return 0
+            deleted = 0
+            # One bulk delete per 100 messages in each channel
+            for start in range(0, len(message_ids), 100):
+                chunk = message_ids[start:start + 100]
+                try:
+                    await channel.delete_messages([discord.Object(id=message_id) for message_id in chunk])
+                except discord.NotFound:
+                    # A message in the batch was already deleted; fall back to one at a time
+                    for message_id in chunk:
+                        try:
+                            await channel.get_partial_message(message_id).delete()
+                        except discord.NotFound:
+                            pass
+                self.message_index.discard(interaction.guild.id, member.id, chunk)
+                deleted += len(chunk)
+            return deleted
+        
+        deleted = 0
+        channels = 0
+        failed = []
+        async for (channel_id, _), count, error in fan_out(
+            by_channel.items(), purge_channel, config.CommandDefaults.PURGE_USER_WORKERS
+        ):
+            if error is None:
+                deleted += count
+                channels += bool(count)
+            else:
+                failed.append(f"<#{channel_id}>")
+        
+        embed = self.create_embed(
+            "Messages Purged",
+            f"Deleted **{deleted}** messages from {member.mention} in **{channels}** channels.",
+            config.Colors.SUCCESS if not failed else config.Colors.WARNING,
+            config.Icons.CLEAR
+        )
+        embed.add_field(name="Time Window", value=f"Last {minutes} minutes", inline=True)
+        embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
+        case_id = self.record_case(
+            interaction, "purge", member.id, None,
+            f"{deleted} messages in {channels} channels from the last {minutes} minutes"
+        )
+        embed.add_field(name="Case", value=f"#{case_id}", inline=True)
+        if failed:
+            embed.add_field(name="Failed Channels", value=", ".join(failed)[:1024], inline=False)
+        embed.set_footer(text=f"User ID: {member.id}")
+        embed.timestamp = discord.utils.utcnow()
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
+        
+        # Log the action
+        if config.BotConfig.LOG_COMMANDS:
+            log.info("%s purged %s messages from %s in %s channels", interaction.user, deleted, member, channels)
+    
+    # Icon for each case action
+    CASE_ICONS = {
+        "kick": config.Icons.KICK,
+        "ban": config.Icons.BAN,
+        "unban": config.Icons.YES,
+        "timeout": config.Icons.TIMEOUT,
+        "untimeout": config.Icons.YES,
+        "clear": config.Icons.CLEAR,
+        "purge": config.Icons.CLEAR,
+    }
+    
+    # One line per case for /modlog
+    def format_case(self, case):
+        icon = self.CASE_ICONS.get(case["action"], config.Icons.INFO)
+        target = f" <@{case['target_id']}>" if case["target_id"] else ""
+        line = f"`#{case['id']}` {icon} **{case['action']}**{target} by <@{case['moderator_id']}> <t:{case['created_at']}:R>"
+        if case["reason"]:
+            line += f"\n└ {case['reason'][:100]}"
+        return line
+    
+    # Look up a single case
+    @app_commands.command(name="case", description="Show a moderation case")
+    @app_commands.describe(case_id="The case number")
+    async def case(self, interaction: discord.Interaction, case_id: int):
+        """Show one moderation case"""
+        if not await self.check_role(interaction):
+            return
+        
+        case = await self.cases.get(interaction.guild.id, case_id)
+        if case is None:
+            embed = self.create_embed(
+                "Case Not Found",
+                f"There is no case #{case_id} in this server.",
+                config.Colors.WARNING,
+                config.Icons.WARNING
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        embed = self.create_embed(
+            f"Case #{case['id']}: {case['action'].title()}",
+            None,
+            config.Colors.INFO,
+            self.CASE_ICONS.get(case["action"], config.Icons.INFO)
+        )
+        if case["target_id"]:
+            embed.add_field(name="User", value=f"<@{case['target_id']}> (`{case['target_id']}`)", inline=True)
+        embed.add_field(name="Moderator", value=f"<@{case['moderator_id']}>", inline=True)
+        embed.add_field(name="When", value=f"<t:{case['created_at']}:F>", inline=True)
+        if case["reason"]:
+            embed.add_field(name="Reason", value=case["reason"][:1024], inline=False)
+        if case["details"]:
+            embed.add_field(name="Details", value=case["details"][:1024], inline=False)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    # List a member's cases
+    @app_commands.command(name="modlog", description="List moderation cases for a user")
+    @app_commands.describe(
+        member="The user to look up",
+        as_moderator="List the actions this user took as a moderator instead"
+    )
+    async def modlog(self, interaction: discord.Interaction, member: discord.User, as_moderator: bool = False):
+        """List the most recent cases against (or by) a user"""
+        if not await self.check_role(interaction):
+            return
+        
+        total, cases = await self.cases.history(
+            interaction.guild.id, member.id, by_moderator=as_moderator, limit=config.CommandDefaults.MODLOG_LIMIT
+        )
+        
+        title = f"Actions by {member.name}" if as_moderator else f"Cases for {member.name}"
+        if not cases:
+            description = "No cases found."
+        else:
+            description = "\n".join(self.format_case(case) for case in cases)[:4096]
+        
+        embed = self.create_embed(title, description, config.Colors.INFO, config.Icons.SHIELD)
+        if total > len(cases):
+            embed.set_footer(text=f"Showing the latest {len(cases)} of {total} cases")
+        else:
+            embed.set_footer(text=f"{total} cases")
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    # Read the target IDs from the text option and/or an attached file
+    async def _collect_targets(self, ids, file):
+        text = ids or ""
+        if file is not None:
+            if file.size > config.CommandDefaults.MASS_FILE_MAX_BYTES:
+                return None, f"The attached file is too large (max {config.CommandDefaults.MASS_FILE_MAX_BYTES // 1024} KB)."
+            try:
+                text += "\n" + (await file.read()).decode("utf-8", errors="ignore")
+            except discord.HTTPException:
+                return None, "Couldn't download the attached file. Please try again."
+        
+        targets = list(dict.fromkeys(int(match) for match in SNOWFLAKE.findall(text)))
+        if not targets:
+            return None, "No user IDs found. Paste IDs separated by spaces, commas or new lines, or attach a text file."
+        if len(targets) > config.CommandDefaults.MASS_MAX_TARGETS:
+            return None, f"Too many IDs ({len(targets)}). The limit is {config.CommandDefaults.MASS_MAX_TARGETS} per command."
+        return targets, None
+    
+    # Reason a target must be skipped, or None if the moderator may act on it
+    def _mass_skip_reason(self, interaction: discord.Interaction, user_id: int, member, require_member: bool):
+        if user_id == interaction.user.id:
+            return config.Messages.NO_SELF_ACTION
+        if user_id == self.bot.user.id:
+            return config.Messages.NO_BOT_ACTION
+        if member is None:
+            return config.Messages.MEMBER_NOT_FOUND if require_member else None
+        if member.id == interaction.guild.owner_id:
+            return config.Messages.HIERARCHY_ERROR
+        if member.top_role >= interaction.user.top_role and interaction.user != interaction.guild.owner:
+            return config.Messages.HIERARCHY_ERROR
+        if member.top_role >= interaction.guild.me.top_role:
+            return config.Messages.HIERARCHY_ERROR
+        return None
+    
+    # Ban in chunks of MASS_BAN_CHUNK; yields (user id, error or None)
+    async def _bulk_ban(self, guild: discord.Guild, user_ids, reason, delete_message_days):
+        chunk_size = config.CommandDefaults.MASS_BAN_CHUNK
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            try:
+                result = await guild.bulk_ban(
+                    [discord.Object(id=user_id) for user_id in chunk],
+                    reason=reason,
+                    delete_message_seconds=delete_message_days * 86400
+                )
+            except discord.HTTPException as e:
+                # Discord rejects the whole chunk when none of it could be banned
+                for user_id in chunk:
+                    yield user_id, e.text or str(e)
+                continue
+            
+            banned = {user.id for user in result.banned}
+            for user_id in chunk:
+                yield user_id, None if user_id in banned else "Could not be banned"
+    
+    # Split targets into skipped IDs and a worker-pool run of ``action`` over the rest
+    def _mass_members(self, interaction: discord.Interaction, targets, action):
+        skipped = {}
+        members = []
+        for user_id in targets:
+            member = interaction.guild.get_member(user_id)
+            skip = self._mass_skip_reason(interaction, user_id, member, require_member=True)
+            if skip:
+                skipped[user_id] = skip
+            else:
+                members.append(member)
+        
+        async def results():
+            # Kicks and timeouts share one per-guild rate-limit bucket; discord.py
+            # reads its headers and waits, so a few workers keep it saturated
+            async for member, _, error in fan_out(members, action, config.CommandDefaults.MASS_WORKERS):
+                if isinstance(error, discord.HTTPException):
+                    error = error.text or str(error)
+                yield member.id, None if error is None else str(error)
+        
+        return skipped, results()
+    
+    # Run a mass action, editing one followup with live progress, then report per-ID failures.
+    # Every target the action succeeded on gets a case, even if the run is cut short.
+    async def _run_mass_action(self, interaction: discord.Interaction, title, verb, icon, color,
+                               total, skipped, results, reason, action, details):
+        failures = dict(skipped)  # user id -> reason
+        succeeded = []
+        progress = self.create_embed(title, f"{verb} **{total}** users...", config.Colors.INFO, icon)
+        message = await interaction.followup.send(embed=progress, wait=True)
+        
+        reporting = True
+        last_update = time.monotonic()
+        try:
+            async for user_id, error in results:
+                if error is None:
+                    succeeded.append(user_id)
+                else:
+                    failures[user_id] = error
+                
+                now = time.monotonic()
+                if reporting and now - last_update >= config.CommandDefaults.MASS_PROGRESS_INTERVAL:
+                    last_update = now
+                    progress.description = f"{verb} users... **{len(succeeded) + len(failures)}/{total}** processed, {len(failures)} failed."
+                    reporting = await self._edit_progress(message, progress)
+        finally:
+            self._record_mass_cases(interaction, action, succeeded, reason, details)
+        
+        done = len(succeeded)
+        embed = self.create_embed(
+            f"{title} Complete",
+            f"**{done}** of **{total}** users processed successfully.",
+            config.Colors.SUCCESS if not failures else color,
+            icon
+        )
+        embed.add_field(name="Reason", value=reason, inline=False)
+        embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
+        embed.add_field(name="Failed", value=str(len(failures)), inline=True)
+        
+        attachments = []
+        if failures:
+            lines = [f"{user_id}: {error}" for user_id, error in failures.items()]
+            shown = "\n".join(f"`{line}`" for line in lines[:10])
+            if len(lines) > 10:
+                shown += f"\n...and {len(lines) - 10} more (see attached file)"
+                attachments.append(discord.File(io.BytesIO("\n".join(lines).encode()), filename="failures.txt"))
+            embed.add_field(name="Failures", value=shown[:1024], inline=False)
+        embed.set_footer(text=f"Moderator: {interaction.user.name}")
+        embed.timestamp = discord.utils.utcnow()
+        
+        await self._send_report(interaction, message, embed, attachments)
+        return done, failures
+    
+    # One case per target a mass action succeeded on
+    def _record_mass_cases(self, interaction: discord.Interaction, action, user_ids, reason, details):
+        for user_id in user_ids:
+            self.record_case(interaction, action, user_id, reason, details)
+    
+    # Refuse a mass action (bad input or missing bot permission), privately even after deferring
+    async def _reject(self, interaction: discord.Interaction, title, description):
+        embed = self.create_embed(title, description, config.Colors.ERROR, config.Icons.NO)
+        await self._respond(interaction, embed, ephemeral=True)
+    
+    # Mass ban command
+    @app_commands.command(name="massban", description="Ban many users at once by ID")
+    @app_commands.describe(
+        ids="User IDs or mentions, separated by spaces, commas or new lines",
+        file="Text file with one user ID per line",
+        reason="Reason for banning",
+        delete_message_days="Number of days of messages to delete (0-7)"
+    )
+    @app_commands.checks.cooldown(1, config.BotConfig.COMMAND_COOLDOWN)
+    async def massban(self, interaction: discord.Interaction, ids: str = None, file: discord.Attachment = None,
+                      reason: str = None, delete_message_days: app_commands.Range[int, 0, 7] = config.CommandDefaults.BAN_DELETE_DAYS_DEFAULT):
+        """Ban a list of users (members or not) with bulk ban requests"""
+        if not await self.check_role(interaction):
+            return
+        
+        if not interaction.guild.me.guild_permissions.ban_members:
+            await self._reject(interaction, "Permission Error", config.Messages.NO_BOT_PERMISSION)
+            return
+        
+        # Reading an attached file is a download, so acknowledge the interaction first
+        await interaction.response.defer(thinking=True)
+        
+        targets, error = await self._collect_targets(ids, file)
+        if error:
+            await self._reject(interaction, "Invalid Input", error)
+            return
+        
+        if not reason:
+            reason = config.CommandDefaults.BAN_REASON
+        
+        skipped = {}
+        allowed = []
+        for user_id in targets:
+            skip = self._mass_skip_reason(interaction, user_id, interaction.guild.get_member(user_id), require_member=False)
+            if skip:
+                skipped[user_id] = skip
+            else:
+                allowed.append(user_id)
+        
+        results = self._bulk_ban(interaction.guild, allowed, f"{interaction.user.name}: {reason}", delete_message_days)
+        done, failures = await self._run_mass_action(
+            interaction, "Mass Ban", "Banning", config.Icons.BAN, config.Colors.DANGER,
+            len(targets), skipped, results, reason, "ban", "mass ban"
+        )
+        
+        if config.BotConfig.LOG_COMMANDS:
+            log.info("%s mass banned %s users (%s failed) for: %s", interaction.user, done, len(failures), reason)
+    
+    # Mass kick command
+    @app_commands.command(name="masskick", description="Kick many members at once by ID")
+    @app_commands.describe(
+        ids="User IDs or mentions, separated by spaces, commas or new lines",
+        file="Text file with one user ID per line",
+        reason="Reason for kicking"
+    )
+    @app_commands.checks.cooldown(1, config.BotConfig.COMMAND_COOLDOWN)
+    async def masskick(self, interaction: discord.Interaction, ids: str = None, file: discord.Attachment = None,
+                       reason: str = None):
+        """Kick a list of members through a bounded worker pool"""
+        if not await self.check_role(interaction):
+            return
+        
+        if not interaction.guild.me.guild_permissions.kick_members:
+            await self._reject(interaction, "Permission Error", config.Messages.NO_BOT_PERMISSION)
+            return
+        
+        await interaction.response.defer(thinking=True)
+        
+        targets, error = await self._collect_targets(ids, file)
+        if error:
+            await self._reject(interaction, "Invalid Input", error)
+            return
+        
+        if not reason:
+            reason = config.CommandDefaults.KICK_REASON
+        audit_reason = f"{interaction.user.name}: {reason}"
+        
+        async def kick(member):
+            await member.kick(reason=audit_reason)
+        
+        done, failures = await self._run_mass_action(
+            interaction, "Mass Kick", "Kicking", config.Icons.KICK, config.Colors.WARNING,
+            len(targets), *self._mass_members(interaction, targets, kick), reason, "kick", "mass kick"
+        )
+        
+        if config.BotConfig.LOG_COMMANDS:
+            log.info("%s mass kicked %s members (%s failed) for: %s", interaction.user, done, len(failures), reason)
+    
+    # Mass timeout command
+    @app_commands.command(name="masstimeout", description="Timeout many members at once by ID")
+    @app_commands.describe(
+        ids="User IDs or mentions, separated by spaces, commas or new lines",
+        file="Text file with one user ID per line",
+        minutes="Duration in minutes",
+        reason="Reason for timeout"
+    )
+    @app_commands.checks.cooldown(1, config.BotConfig.COMMAND_COOLDOWN)
+    async def masstimeout(self, interaction: discord.Interaction, minutes: int, ids: str = None,
+                          file: discord.Attachment = None, reason: str = None):
+        """Timeout a list of members through a bounded worker pool"""
+        if not await self.check_role(interaction):
+            return
+        
+        if not interaction.guild.me.guild_permissions.moderate_members:
+            await self._reject(interaction, "Permission Error", config.Messages.NO_BOT_PERMISSION)
+            return
+        
+        if minutes < config.CommandDefaults.TIMEOUT_MIN or minutes > config.CommandDefaults.TIMEOUT_MAX:
+            await self._reject(
+                interaction,
+                "Invalid Duration",
+                f"Timeout duration must be between {config.CommandDefaults.TIMEOUT_MIN} and {config.CommandDefaults.TIMEOUT_MAX} minutes."
+            )
+            return
+        
+        await interaction.response.defer(thinking=True)
+        
+        targets, error = await self._collect_targets(ids, file)
+        if error:
+            await self._reject(interaction, "Invalid Input", error)
+            return
+        
+        if not reason:
+            reason = config.CommandDefaults.TIMEOUT_REASON
+        audit_reason = f"{interaction.user.name}: {reason}"
+        duration = timedelta(minutes=minutes)
+        
+        async def timeout(member):
+            await member.timeout(duration, reason=audit_reason)
+        
+        done, failures = await self._run_mass_action(
+            interaction, "Mass Timeout", "Timing out", config.Icons.TIMEOUT, config.Colors.WARNING,
+            len(targets), *self._mass_members(interaction, targets, timeout), reason,
+            "timeout", f"mass timeout, {minutes} minutes"
+        )
+        
+        if config.BotConfig.LOG_COMMANDS:
+            log.info("%s mass timed out %s members for %s minutes (%s failed): %s", interaction.user, done, minutes, len(failures), reason)
 
 async def setup(bot):
     await bot.add_cog(Moderation(bot))
\ No newline at end of file
@@ -2,15 +2,155 @@ import discord
 
 from discord import app_commands
 
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import aiohttp
 
 import asyncio
 
+import io
+
+import math
+
+import multiprocessing
+
+import os
+
+import time
+
 import config
 
-from datetime import datetime
+from collections import defaultdict
+
+from concurrent.futures import ProcessPoolExecutor
+
+from datetime import datetime, timedelta, timezone
+
+from utils.cache import TTLCache, MISSING
+
+from utils.singleflight import SingleFlight
+
+from utils.breaker import CircuitBreaker, CircuitOpenError
+
+from utils.cities import CityIndex, normalize_name
+
+from utils.alerts import WatchTable, condition_class, CALM
+
+from utils.climate import ClimateSeries, day_statistics, ARCHIVE_VARIABLES
+
+from utils.charts import render_forecast_chart
+
+from utils.solar import sun_times, is_daytime
+
+from utils.log import get_logger
+
+from utils.openmeteo import (
+
+    snap_to_grid, seconds_until_next_update, celsius_to_fahrenheit, mm_to_inches, WeatherSnapshot, AirQualitySnapshot, DailyForecast,
+
+    CURRENT_VARIABLES, DAILY_VARIABLES, AIR_QUALITY_VARIABLES, DIGEST_VARIABLES
+
+)
+
+log = get_logger("weather")
+
+# Fields kept from a geocoding result; the rest of the payload is dropped before caching
+
+GEOCODE_FIELDS = ("name", "country", "admin1", "latitude", "longitude", "elevation", "population")
+
+# Daily digest subscriptions; last_posted is the UTC date of the last digest sent
+
+SUBSCRIPTIONS_SCHEMA = """
+
+CREATE TABLE IF NOT EXISTS weather_subscriptions (
+
+    id INTEGER PRIMARY KEY,
+
+    guild_id INTEGER NOT NULL,
+
+    channel_id INTEGER NOT NULL,
+
+    city TEXT NOT NULL,
+
+    latitude REAL NOT NULL,
+
+    longitude REAL NOT NULL,
+
+    post_hour INTEGER NOT NULL,
+
+    units TEXT NOT NULL DEFAULT 'celsius',
+
+    last_posted TEXT,
+
+    UNIQUE (channel_id, city)
+
+);
+
+CREATE INDEX IF NOT EXISTS idx_weather_subscriptions_due ON weather_subscriptions (last_posted, post_hour);
+
+"""
+
+# Severe-weather alert subscriptions; condition is the last condition class seen
+
+ALERTS_SCHEMA = """
+
+CREATE TABLE IF NOT EXISTS weather_alerts (
+
+    id INTEGER PRIMARY KEY,
+
+    guild_id INTEGER NOT NULL,
+
+    channel_id INTEGER NOT NULL,
+
+    city TEXT NOT NULL,
+
+    latitude REAL NOT NULL,
+
+    longitude REAL NOT NULL,
+
+    condition INTEGER NOT NULL DEFAULT 0,
+
+    UNIQUE (channel_id, city)
+
+);
+
+"""
+
+def na(value):
+
+    """Render missing values as N/A"""
+
+    return "N/A" if value is None else value
+
+def local_time(timestamp: float, utc_offset: int) -> str:
+
+    """Format a Unix timestamp as HH:MM in a location's local time (N/A for NaN)"""
+
+    if math.isnan(timestamp):
+
+        return "N/A"
+
+    return datetime.fromtimestamp(timestamp + utc_offset, timezone.utc).strftime("%H:%M")
+
+def format_day_length(seconds: float) -> str:
+
+    minutes = round(seconds / 60)
+
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+def location_label(location: dict) -> str:
+
+    """Display name for a geocoded location, e.g. "Paris, Île-de-France, France" """
+
+    name = location.get("name", "Unknown")
+
+    state = location.get("admin1", "")
+
+    return ", ".join(part for part in (name, state if state != name else "", location.get("country", "")) if part)
+
+class WeatherServiceError(Exception):
+
+    """Raised when an Open-Meteo API answers with an error status"""
 
 class Weather(commands.Cog):
 
@@ -22,6 +162,190 @@ class Weather(commands.Cog):
 
         self.weather_api = "https://api.open-meteo.com/v1/forecast"
 
+        self.air_quality_api = "https://air-quality-api.open-meteo.com/v1/air-quality"
+
+        self.archive_api = "https://archive-api.open-meteo.com/v1/archive"
+
+        
+
+        # Geocoding results keyed by normalized query (None = city not found)
+
+        self.geo_cache = TTLCache(
+
+            maxsize=config.WeatherConfig.GEOCODE_CACHE_SIZE,
+
+            ttl=config.WeatherConfig.GEOCODE_CACHE_TTL
+
+        )
+
+        
+
+        # Metric forecasts keyed by grid-snapped coordinates, shared by all units
+
+        # Expired entries are kept for STALE_TTL so they can be served while refreshing
+
+        self.forecast_cache = TTLCache(
+
+            maxsize=config.WeatherConfig.FORECAST_CACHE_SIZE,
+
+            ttl=config.WeatherConfig.FORECAST_UPDATE_INTERVAL,
+
+            stale_ttl=config.WeatherConfig.STALE_TTL
+
+        )
+
+        
+
+        # Air quality and UV keyed by grid cell (supplementary, best effort)
+
+        self.air_quality_cache = TTLCache(
+
+            maxsize=config.WeatherConfig.FORECAST_CACHE_SIZE,
+
+            ttl=config.WeatherConfig.AIR_QUALITY_UPDATE_INTERVAL
+
+        )
+
+        
+
+        # Climate series keyed by archive grid cell; the full record lives on disk
+
+        self.climate_cache = TTLCache(
+
+            maxsize=config.WeatherConfig.CLIMATE_MEMORY_CACHE_SIZE,
+
+            ttl=24 * 3600
+
+        )
+
+        
+
+        # Rendered chart PNGs keyed by (grid cell, forecast run, units, span)
+
+        self.chart_cache = TTLCache(
+
+            maxsize=config.WeatherConfig.CHART_CACHE_SIZE,
+
+            ttl=config.WeatherConfig.CHART_RUN_INTERVAL
+
+        )
+
+        # Charts render in worker processes (started on first use); the semaphore bounds
+
+        # how many renders may be queued or running before new ones are skipped
+
+        self.chart_executor = None
+
+        self.chart_slots = asyncio.Semaphore(config.WeatherConfig.CHART_QUEUE_SIZE)
+
+        self.charts_skipped = 0
+
+        
+
+        # In-flight upstream requests, so identical concurrent lookups are coalesced
+
+        self.flights = SingleFlight()
+
+        
+
+        # Circuit breakers stop calling Open-Meteo after repeated failures
+
+        self.geocode_breaker = CircuitBreaker(
+
+            "geocoding",
+
+            failure_threshold=config.WeatherConfig.BREAKER_FAILURE_THRESHOLD,
+
+            reset_timeout=config.WeatherConfig.BREAKER_RESET_TIMEOUT,
+
+            half_open_max_calls=config.WeatherConfig.BREAKER_HALF_OPEN_PROBES
+
+        )
+
+        self.forecast_breaker = CircuitBreaker(
+
+            "forecast",
+
+            failure_threshold=config.WeatherConfig.BREAKER_FAILURE_THRESHOLD,
+
+            reset_timeout=config.WeatherConfig.BREAKER_RESET_TIMEOUT,
+
+            half_open_max_calls=config.WeatherConfig.BREAKER_HALF_OPEN_PROBES
+
+        )
+
+        self.air_quality_breaker = CircuitBreaker(
+
+            "air quality",
+
+            failure_threshold=config.WeatherConfig.BREAKER_FAILURE_THRESHOLD,
+
+            reset_timeout=config.WeatherConfig.BREAKER_RESET_TIMEOUT,
+
+            half_open_max_calls=config.WeatherConfig.BREAKER_HALF_OPEN_PROBES
+
+        )
+
+        self.archive_breaker = CircuitBreaker(
+
+            "archive",
+
+            failure_threshold=config.WeatherConfig.BREAKER_FAILURE_THRESHOLD,
+
+            reset_timeout=config.WeatherConfig.BREAKER_RESET_TIMEOUT,
+
+            half_open_max_calls=config.WeatherConfig.BREAKER_HALF_OPEN_PROBES
+
+        )
+
+        # The alert watcher's own, so failed background polls can't open the
+
+        # forecast breaker that /weather, /weather-compare and charts go through
+
+        self.alert_breaker = CircuitBreaker(
+
+            "alerts",
+
+            failure_threshold=config.WeatherConfig.BREAKER_FAILURE_THRESHOLD,
+
+            reset_timeout=config.WeatherConfig.BREAKER_RESET_TIMEOUT,
+
+            half_open_max_calls=config.WeatherConfig.BREAKER_HALF_OPEN_PROBES
+
+        )
+
+        
+
+        # Stale forecasts served while a background refresh runs
+
+        self.stale_serves = 0
+
+        self._refresh_tasks = set()
+
+        
+
+        # Offline city index for autocomplete and local geocoding (mapped on first use)
+
+        self.city_index = CityIndex(config.WeatherConfig.CITY_DATA_PATH)
+
+        
+
+        # Severe-weather watcher: per-cell state and the channels watching each cell
+
+        self.watch_table = WatchTable(
+
+            min_interval=config.WeatherConfig.ALERT_MIN_INTERVAL,
+
+            max_interval=config.WeatherConfig.ALERT_MAX_INTERVAL
+
+        )
+
+        self.alert_watchers = defaultdict(dict)  # grid key -> {subscription id: (channel id, city)}
+
+        self.alert_polls = 0
+
+        self.alerts_sent = 0
+
     
 
     # WMO Weather interpretation codes (WW)
@@ -94,575 +418,2987 @@ class Weather(commands.Cog):
 
     
 
-    @app_commands.command(name="weather", description="Get current weather for any city worldwide!")
+    # US AQI categories
 
-    @app_commands.describe(
+    def get_aqi_description(self, aqi: float) -> str:
 
-        city="City name (e.g., London, Tokyo, New York)",
+        """Returns the category name for a US AQI value"""
 
-        units="Temperature units (Celsius or Fahrenheit)"
+        for limit, description in ((50, "Good"), (100, "Moderate"), (150, "Unhealthy for sensitive groups"),
 
-    )
+                                   (200, "Unhealthy"), (300, "Very unhealthy")):
 
-    @app_commands.choices(units=[
+            if aqi <= limit:
 
-        app_commands.Choice(name="Celsius (°C)", value="celsius"),
+                return description
 
-        app_commands.Choice(name="Fahrenheit (°F)", value="fahrenheit"),
+        return "Hazardous"
 
-    ])
+    
 
-    @app_commands.checks.cooldown(1, 10)  # 10 second cooldown
+    # WHO UV index categories
 
-    async def weather(self, interaction: discord.Interaction, city: str, units: str = "celsius"):
+    def get_uv_description(self, uv_index: float) -> str:
 
-        """Fetch and display current weather for a city"""
+        """Returns the exposure category for a UV index value"""
+
+        for limit, description in ((2, "Low"), (5, "Moderate"), (7, "High"), (10, "Very high")):
+
+            if round(uv_index) <= limit:
+
+                return description
+
+        return "Extreme"
+
+    
+
+    async def geocode(self, city: str):
+
+        """Returns the best geocoding match for a city, or None if it doesn't exist"""
+
+        key = normalize_name(city)
 
         
 
-        # Defer response while we fetch data
+        # Cities in the bundled dataset resolve locally without any request
 
-        await interaction.response.defer()
+        local_city = self.lookup_local(city)
+
+        if local_city is not None:
+
+            return local_city.to_location()
 
         
 
-        async with aiohttp.ClientSession() as session:
+        # Cache hit skips the geocoding round trip entirely
 
-            try:
+        location = self.geo_cache.get(key)
 
-                # STEP 1: Geocode city name to coordinates
+        if location is not MISSING:
 
-                geo_params = {
+            return location
 
-                    "name": city,
+        
 
-                    "count": 1,
+        # Concurrent lookups for the same city share one request
 
-                    "language": "en",
+        return await self.flights.do(("geocode", key), self.geocode_breaker.call, self._geocode_upstream, city, key)
 
-                    "format": "json"
+    
 
-                }
+    def lookup_local(self, city: str):
 
-                
+        """Resolve a city from the offline index, or None if it isn't bundled"""
 
-                async with session.get(self.geocoding_api, params=geo_params) as geo_response:
+        try:
 
-                    if geo_response.status != 200:
+            return self.city_index.lookup(city)
 
-                        await interaction.followup.send(
+        except (OSError, ValueError):
 
-                            f"{config.Icons.NO} Geocoding service error. Please try again.",
+            # Dataset missing or corrupt; use the geocoding API instead
 
-                            ephemeral=True
+            return None
 
-                        )
+    
 
-                        return
+    async def _geocode_upstream(self, city: str, key: str):
 
-                    
+        # Autocomplete values look like "Paris, Texas, United States": search by
 
-                    geo_data = await geo_response.json()
+        # name and use the rest to pick the right match among the results
 
-                    
+        name, *qualifiers = [part.strip() for part in city.split(",")]
 
-                    if not geo_data.get("results"):
+        qualifiers = [normalize_name(part) for part in qualifiers if part]
 
-                        await interaction.followup.send(
+        
 
-                            f"{config.Icons.NO} City '{city}' not found. Please check the spelling and try again.",
+        geo_params = {
 
-                            ephemeral=True
+            "name": name,
 
-                        )
+            "count": 10 if qualifiers else 1,
 
-                        return
+            "language": "en",
 
-                    
+            "format": "json"
 
-                    # Get the first (best) match
+        }
 
-                    location = geo_data["results"][0]
+        
 
-                    city_name = location.get("name", city)
+        async with self.bot.session.get(self.geocoding_api, params=geo_params) as geo_response:
 
-                    country = location.get("country", "Unknown")
+            if geo_response.status != 200:
 
-                    state = location.get("admin1", "")
+                raise WeatherServiceError("Geocoding service error. Please try again.")
 
-                    latitude = location["latitude"]
+            
 
-                    longitude = location["longitude"]
+            geo_data = await geo_response.json()
 
-                    elevation = location.get("elevation", 0)
+        
 
-                    population = location.get("population", "Unknown")
+        results = geo_data.get("results")
 
-                    
+        if not results:
 
-                    # Format location display
+            # Negative cache so repeated typos don't hit the API either
 
-                    location_display = city_name
+            self.geo_cache.set(key, None, ttl=config.WeatherConfig.GEOCODE_NEGATIVE_TTL)
 
-                    if state:
+            return None
 
-                        location_display += f", {state}"
+        
 
-                    location_display += f", {country}"
+        # Get the best match, preferring one in the requested region/country
 
-                
+        result = results[0]
 
-                # STEP 2: Fetch current weather data
+        for candidate in results:
 
-                weather_params = {
+            regions = {normalize_name(candidate.get(field) or "") for field in ("admin1", "country", "country_code")}
 
-                    "latitude": latitude,
+            if all(part in regions for part in qualifiers):
 
-                    "longitude": longitude,
+                result = candidate
 
-                    "current_weather": "true",
+                break
 
-                    "timezone": "auto",
+        
 
-                    "hourly": "relative_humidity_2m,apparent_temperature,pressure_msl,visibility,cloudcover",
+        location = {field: result[field] for field in GEOCODE_FIELDS if field in result}
 
-                    "daily": "temperature_2m_max,temperature_2m_min,sunrise,sunset",
+        self.geo_cache.set(key, location)
 
-                    "forecast_days": 1
+        return location
 
-                }
+    
 
-                
+    async def fetch_forecast(self, latitude: float, longitude: float) -> tuple:
 
-                # Add unit parameters
+        """Returns (snapshot, is_stale) with current conditions in metric units for the grid cell containing a point"""
 
-                if units == "fahrenheit":
+        grid_key = snap_to_grid(latitude, longitude, config.WeatherConfig.GRID_RESOLUTION)
 
-                    weather_params["temperature_unit"] = "fahrenheit"
+        
 
-                    weather_params["windspeed_unit"] = "mph"
+        forecast = self.forecast_cache.get(grid_key)
 
-                    temp_unit = "°F"
+        if forecast is not MISSING:
 
-                    wind_unit = "mph"
+            return forecast, False
 
-                else:
+        
 
-                    weather_params["temperature_unit"] = "celsius"
+        # Serve the last good forecast immediately and refresh it in the background
 
-                    weather_params["windspeed_unit"] = "kmh"
+        forecast = self.forecast_cache.get_stale(grid_key)
 
-                    temp_unit = "°C"
+        if forecast is not MISSING:
 
-                    wind_unit = "km/h"
+            self.stale_serves += 1
 
-                
+            self.refresh_forecast(grid_key)
 
-                async with session.get(self.weather_api, params=weather_params) as weather_response:
+            return forecast, True
 
-                    if weather_response.status != 200:
+        
 
-                        await interaction.followup.send(
+        # Nothing cached: wait for upstream (concurrent lookups share one request)
 
-                            f"{config.Icons.NO} Weather service error. Please try again.",
+        forecast = await self._request_forecast(grid_key)
 
-                            ephemeral=True
+        return forecast, False
 
-                        )
+    
 
-                        return
+    async def _request_forecast(self, grid_key: tuple) -> WeatherSnapshot:
 
-                    
+        return await self.flights.do(("forecast", grid_key), self.forecast_breaker.call, self._fetch_forecast_upstream, grid_key)
 
-                    weather_data = await weather_response.json()
+    
 
-                    
+    def refresh_forecast(self, grid_key: tuple):
 
-                    # Extract current weather
+        """Refresh a cached forecast without making anyone wait for it"""
 
-                    current = weather_data.get("current_weather", {})
+        task = asyncio.create_task(self._refresh_forecast(grid_key))
 
-                    temperature = current.get("temperature", "N/A")
+        self._refresh_tasks.add(task)
 
-                    windspeed = current.get("windspeed", "N/A")
+        task.add_done_callback(self._refresh_tasks.discard)
 
-                    winddirection = current.get("winddirection", "N/A")
+    
 
-                    weathercode = current.get("weathercode", 0)
+    async def _refresh_forecast(self, grid_key: tuple):
 
-                    is_day = current.get("is_day", 1)
+        try:
 
-                    update_time = current.get("time", datetime.utcnow().isoformat())
+            await self._request_forecast(grid_key)
 
-                    
+        except CircuitOpenError:
 
-                    # Get weather description and emoji
+            # Upstream is known to be down; keep serving the stale copy
 
-                    weather_desc, weather_emoji = self.get_weather_description(weathercode)
+            pass
 
-                    
+        except Exception as e:
 
-                    # Extract hourly data
+            if config.BotConfig.LOG_ERRORS:
 
-                    hourly = weather_data.get("hourly", {})
+                log.warning("Forecast refresh failed for %s: %s", grid_key, e)
 
-                    humidity = hourly.get("relative_humidity_2m", [0])[0] if hourly.get("relative_humidity_2m") else "N/A"
+    
 
-                    feels_like = hourly.get("apparent_temperature", [temperature])[0] if hourly.get("apparent_temperature") else temperature
+    async def cog_load(self):
 
-                    pressure = hourly.get("pressure_msl", [0])[0] if hourly.get("pressure_msl") else "N/A"
+        await self.bot.db.executescript(SUBSCRIPTIONS_SCHEMA + ALERTS_SCHEMA)
 
-                    visibility = hourly.get("visibility", [0])[0] if hourly.get("visibility") else "N/A"
+        
 
-                    cloudcover = hourly.get("cloudcover", [0])[0] if hourly.get("cloudcover") else "N/A"
+        # Resume watching every subscribed location from its last known condition
 
-                    
+        now = time.monotonic()
 
-                    # Extract daily data
+        rows = await self.bot.db.fetchall("SELECT id, channel_id, city, latitude, longitude, condition FROM weather_alerts")
 
-                    daily = weather_data.get("daily", {})
+        for row_id, channel_id, city, latitude, longitude, condition in rows:
 
-                    temp_max = daily.get("temperature_2m_max", [0])[0] if daily.get("temperature_2m_max") else "N/A"
+            self.add_alert_watcher(row_id, channel_id, city, latitude, longitude, condition, now)
 
-                    temp_min = daily.get("temperature_2m_min", [0])[0] if daily.get("temperature_2m_min") else "N/A"
+        
 
-                    sunrise = daily.get("sunrise", [""])[0] if daily.get("sunrise") else "N/A"
+        self.digest_scheduler.start()
 
-                    sunset = daily.get("sunset", [""])[0] if daily.get("sunset") else "N/A"
+        self.alert_watcher.start()
 
-                    
+    
 
-                    # Format times
+    def cog_unload(self):
 
-                    try:
+        self.digest_scheduler.cancel()
 
-                        if sunrise != "N/A":
+        self.alert_watcher.cancel()
 
-                            sunrise_time = datetime.fromisoformat(sunrise.replace("Z", "+00:00")).strftime("%H:%M")
+        if self.chart_executor is not None:
 
-                        else:
+            self.chart_executor.shutdown(wait=False, cancel_futures=True)
 
-                            sunrise_time = "N/A"
+        for task in self._refresh_tasks:
 
-                        if sunset != "N/A":
+            task.cancel()
 
-                            sunset_time = datetime.fromisoformat(sunset.replace("Z", "+00:00")).strftime("%H:%M")
+    
 
-                        else:
+    async def fetch_forecasts(self, coordinates: list) -> list:
 
-                            sunset_time = "N/A"
+        """Returns (snapshot, is_stale) for each (latitude, longitude), with one request for all cache misses"""
 
-                        update_time_formatted = datetime.fromisoformat(update_time.replace("Z", "+00:00")).strftime("%H:%M")
+        grid_keys = [snap_to_grid(lat, lon, config.WeatherConfig.GRID_RESOLUTION) for lat, lon in coordinates]
 
-                    except:
+        
 
-                        sunrise_time = sunrise
+        results = {}
 
-                        sunset_time = sunset
+        missing = []
 
-                        update_time_formatted = update_time
+        for grid_key in dict.fromkeys(grid_keys):
 
-                    
+            snapshot = self.forecast_cache.get(grid_key)
 
-                    # Create wind direction arrow
+            if snapshot is not MISSING:
 
-                    wind_arrows = ["↓", "↙", "←", "↖", "↑", "↗", "→", "↘"]
+                results[grid_key] = (snapshot, False)
 
-                    if isinstance(winddirection, (int, float)):
+            else:
 
-                        wind_index = round(winddirection / 45) % 8
+                missing.append(grid_key)
 
-                        wind_arrow = wind_arrows[wind_index]
+        
 
-                    else:
+        if missing:
 
-                        wind_arrow = "→"
+            try:
 
-                    
+                snapshots = await self.forecast_breaker.call(self._fetch_forecast_batch, missing)
 
-                    # Convert visibility to km
+                results.update((grid_key, (snapshot, False)) for grid_key, snapshot in zip(missing, snapshots))
 
-                    if isinstance(visibility, (int, float)):
+            except Exception:
 
-                        visibility_km = visibility / 1000
+                # Fall back to stale copies; fail if any location has none
 
-                        visibility_display = f"{visibility_km:.1f} km"
+                for grid_key in missing:
 
-                    else:
+                    snapshot = self.forecast_cache.get_stale(grid_key)
 
-                        visibility_display = "N/A"
+                    if snapshot is MISSING:
 
-                    
+                        raise
 
-                    # Convert pressure to hPa (already in hPa)
+                    self.stale_serves += 1
 
-                    pressure_display = f"{pressure} hPa" if pressure != "N/A" else "N/A"
+                    results[grid_key] = (snapshot, True)
 
-                    
+        
 
-                    # Format population with commas
+        return [results[grid_key] for grid_key in grid_keys]
 
-                    if population != "Unknown" and isinstance(population, int):
+    
 
-                        population_display = f"{population:,}"
+    async def _fetch_forecast_upstream(self, grid_key: tuple) -> WeatherSnapshot:
 
-                    else:
+        snapshots = await self._fetch_forecast_batch([grid_key])
 
-                        population_display = "Unknown"
+        return snapshots[0]
 
-                    
+    
 
-                    # --- CREATE BEAUTIFUL EMBED ---
+    async def _fetch_forecast_batch(self, grid_keys: list) -> list:
 
-                    embed = discord.Embed(
+        """Fetch current conditions for several grid cells in a single request and cache each one"""
 
-                        title=f"{weather_emoji} Current Weather in {location_display}",
+        # Only the current hour and today's range, always in metric;
 
-                        color=config.Colors.INFO,
+        # imperial is derived locally so both units share one entry
 
-                        url=f"https://open-meteo.com/?lat={latitude}&lon={longitude}&timezone=auto"
+        weather_params = {
 
-                    )
+            "latitude": ",".join(str(grid_key[0]) for grid_key in grid_keys),
 
-                    
+            "longitude": ",".join(str(grid_key[1]) for grid_key in grid_keys),
 
-                    # Main temperature field
+            "current": ",".join(CURRENT_VARIABLES),
 
-                    embed.add_field(
+            "daily": ",".join(DAILY_VARIABLES),
 
-                        name="🌡️ Temperature",
+            "timezone": "auto",
 
-                        value=f"**{temperature}{temp_unit}**\nFeels like: {feels_like}{temp_unit}",
+            "forecast_days": 1,
 
-                        inline=True
+            "temperature_unit": "celsius",
 
-                    )
+            "wind_speed_unit": "kmh"
 
-                    
+        }
 
-                    # Weather condition
+        
 
-                    embed.add_field(
+        async with self.bot.session.get(self.weather_api, params=weather_params) as weather_response:
 
-                        name="☁️ Condition",
+            if weather_response.status != 200:
 
-                        value=f"**{weather_desc}**\nCloud cover: {cloudcover}%",
+                raise WeatherServiceError("Weather service error. Please try again.")
 
-                        inline=True
+            
 
-                    )
+            weather_data = await weather_response.json()
 
-                    
+        
 
-                    # Humidity
+        # One location comes back as an object, several as a list in request order
 
-                    embed.add_field(
+        if isinstance(weather_data, dict):
 
-                        name="💧 Humidity",
+            weather_data = [weather_data]
 
-                        value=f"**{humidity}%**",
+        
 
-                        inline=True
+        # Valid until Open-Meteo's next data refresh
 
-                    )
+        ttl = seconds_until_next_update(config.WeatherConfig.FORECAST_UPDATE_INTERVAL)
 
-                    
+        snapshots = []
 
-                    # Wind
+        for grid_key, data in zip(grid_keys, weather_data):
 
-                    embed.add_field(
+            snapshot = WeatherSnapshot.from_response(data)
 
-                        name="💨 Wind",
+            self.forecast_cache.set(grid_key, snapshot, ttl=ttl)
 
-                        value=f"**{windspeed} {wind_unit}**\nDirection: {winddirection}° {wind_arrow}",
+            snapshots.append(snapshot)
 
-                        inline=True
+        return snapshots
 
-                    )
+    
 
-                    
+    async def fetch_air_quality(self, latitude: float, longitude: float) -> AirQualitySnapshot:
 
-                    # Pressure & Visibility
+        """Returns current air quality and UV index for the grid cell containing a point"""
 
-                    embed.add_field(
+        grid_key = snap_to_grid(latitude, longitude, config.WeatherConfig.GRID_RESOLUTION)
 
-                        name="📊 Pressure",
+        
 
-                        value=f"**{pressure_display}**",
+        air_quality = self.air_quality_cache.get(grid_key)
 
-                        inline=True
+        if air_quality is not MISSING:
 
-                    )
+            return air_quality
 
-                    
+        
 
-                    embed.add_field(
+        return await self.flights.do(("air_quality", grid_key), self.air_quality_breaker.call, self._fetch_air_quality_upstream, grid_key)
 
-                        name="👁️ Visibility",
+    
 
-                        value=f"**{visibility_display}**",
+    async def _fetch_air_quality_upstream(self, grid_key: tuple) -> AirQualitySnapshot:
 
-                        inline=True
+        air_params = {
 
-                    )
+            "latitude": grid_key[0],
 
-                    
+            "longitude": grid_key[1],
 
-                    # Daily min/max
+            "current": ",".join(AIR_QUALITY_VARIABLES),
 
-                    embed.add_field(
+            "timezone": "auto"
 
-                        name="📈 Daily Range",
+        }
 
-                        value=f"Max: **{temp_max}{temp_unit}**\nMin: **{temp_min}{temp_unit}**",
+        
 
-                        inline=True
+        async with self.bot.session.get(self.air_quality_api, params=air_params) as air_response:
 
-                    )
+            if air_response.status != 200:
 
-                    
+                raise WeatherServiceError("Air quality service error.")
 
-                    # Sunrise/Sunset
+            
 
-                    embed.add_field(
+            air_data = await air_response.json()
 
-                        name="🌅 Sunrise",
+        
 
-                        value=f"**{sunrise_time}**",
+        air_quality = AirQualitySnapshot.from_response(air_data)
 
-                        inline=True
+        ttl = seconds_until_next_update(config.WeatherConfig.AIR_QUALITY_UPDATE_INTERVAL)
 
-                    )
+        self.air_quality_cache.set(grid_key, air_quality, ttl=ttl)
 
-                    
+        return air_quality
 
-                    embed.add_field(
+    
 
-                        name="🌇 Sunset",
+    async def fetch_daily_forecasts(self, coordinates: list) -> dict:
 
-                        value=f"**{sunset_time}**",
+        """Returns today's forecast for each distinct grid cell among the (latitude, longitude) pairs.
 
-                        inline=True
 
-                    )
 
-                    
+        Locations are deduplicated by grid cell and fetched DIGEST_BATCH_SIZE at a
 
-                    # Location info
+        time. Cells whose batch failed are left out of the result.
 
-                    location_info = f"📍 Coordinates: `{latitude:.4f}, {longitude:.4f}`\n"
+        """
 
-                    location_info += f"🏔️ Elevation: `{elevation}m`\n"
+        grid_keys = list(dict.fromkeys(
 
-                    if population_display != "Unknown":
+            snap_to_grid(lat, lon, config.WeatherConfig.GRID_RESOLUTION) for lat, lon in coordinates
 
-                        location_info += f"👥 Population: `{population_display}`"
+        ))
 
-                    
+        size = config.WeatherConfig.DIGEST_BATCH_SIZE
 
-                    embed.add_field(
+        batches = [grid_keys[i:i + size] for i in range(0, len(grid_keys), size)]
 
-                        name="🗺️ Location Details",
+        
 
-                        value=location_info,
+        results = await asyncio.gather(
 
-                        inline=False
+            *(self.forecast_breaker.call(self._fetch_daily_batch, batch) for batch in batches),
 
-                    )
+            return_exceptions=True
 
-                    
+        )
 
-                    # Footer with update time
+        
 
-                    day_icon = "☀️ Day" if is_day == 1 else "🌙 Night"
+        forecasts = {}
 
-                    embed.set_footer(
+        for batch, result in zip(batches, results):
 
-                        text=f"{day_icon} • Updated at {update_time_formatted} (Local Time) • Data: Open-Meteo",
+            if isinstance(result, BaseException):
 
-                        icon_url="https://open-meteo.com/images/favicon.ico"
+                if config.BotConfig.LOG_ERRORS:
 
-                    )
+                    log.warning("Daily forecast batch of %s failed: %s", len(batch), result)
 
-                    embed.timestamp = datetime.utcnow()
+                continue
 
-                    
+            forecasts.update(zip(batch, result))
 
-                    # Set thumbnail based on weather
+        return forecasts
 
-                    if is_day == 1:
+    
 
-                        if weathercode == 0:
+    async def _fetch_daily_batch(self, grid_keys: list) -> list:
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/01d@2x.png")
+        """Fetch today's forecast for several grid cells in a single request"""
 
-                        elif weathercode in [1, 2]:
+        weather_params = {
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/02d@2x.png")
+            "latitude": ",".join(str(grid_key[0]) for grid_key in grid_keys),
 
-                        elif weathercode == 3:
+            "longitude": ",".join(str(grid_key[1]) for grid_key in grid_keys),
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/03d@2x.png")
+            "daily": ",".join(DIGEST_VARIABLES),
 
-                        elif weathercode in [45, 48]:
+            "timezone": "auto",
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/50d@2x.png")
+            "forecast_days": 1,
 
-                        elif weathercode in [51, 53, 55, 56, 57, 61, 63, 65, 66, 67, 80, 81, 82]:
+            "temperature_unit": "celsius",
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/10d@2x.png")
+            "wind_speed_unit": "kmh",
 
-                        elif weathercode in [71, 73, 75, 77, 85, 86]:
+            "precipitation_unit": "mm"
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/13d@2x.png")
+        }
 
-                        elif weathercode in [95, 96, 99]:
+        
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/11d@2x.png")
+        async with self.bot.session.get(self.weather_api, params=weather_params) as weather_response:
 
-                    else:
+            if weather_response.status != 200:
 
-                        if weathercode == 0:
+                raise WeatherServiceError("Weather service error. Please try again.")
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/01n@2x.png")
+            
 
-                        elif weathercode in [1, 2]:
+            weather_data = await weather_response.json()
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/02n@2x.png")
+        
 
-                        else:
+        if isinstance(weather_data, dict):
 
-                            embed.set_thumbnail(url="https://openweathermap.org/img/wn/04n@2x.png")
+            weather_data = [weather_data]
 
-                    
+        return [DailyForecast.from_response(data) for data in weather_data]
 
-                    await interaction.followup.send(embed=embed)
+    
 
-                    
+    async def fetch_climate(self, latitude: float, longitude: float) -> ClimateSeries:
 
-            except aiohttp.ClientError:
+        """Returns the daily temperature record for the archive grid cell containing a point"""
 
-                await interaction.followup.send(
+        grid_key = snap_to_grid(latitude, longitude, config.WeatherConfig.CLIMATE_GRID_RESOLUTION)
 
-                    f"{config.Icons.NO} Network error. Couldn't reach the weather service.",
+        
 
-                    ephemeral=True
+        series = self.climate_cache.get(grid_key)
 
-                )
+        if series is not MISSING:
 
-            except Exception as e:
+            return series
 
-                if config.BotConfig.LOG_ERRORS:
+        
 
-                    print(f"{config.Icons.NO} Weather command error: {e}")
+        return await self.flights.do(("climate", grid_key), self._load_climate, grid_key)
 
-                await interaction.followup.send(
+    
 
-                    f"{config.Icons.NO} An error occurred while fetching weather data.",
+    def climate_path(self, grid_key: tuple) -> str:
 
-                    ephemeral=True
+        return os.path.join(config.WeatherConfig.CLIMATE_CACHE_DIR, f"{grid_key[0]:+.2f}_{grid_key[1]:+.2f}.npz")
 
-                )
+    
+
+    async def _load_climate(self, grid_key: tuple) -> ClimateSeries:
+
+        # Repeat queries are served from disk; only days missing from the file are downloaded
+
+        path = self.climate_path(grid_key)
+
+        try:
+
+            series = await asyncio.to_thread(ClimateSeries.load, path)
+
+        except FileNotFoundError:
+
+            series = None
+
+        except Exception as e:
+
+            if config.BotConfig.LOG_ERRORS:
+
+                log.warning("Discarding unreadable climate cache %s: %s", path, e)
+
+            series = None
+
+        
+
+        latest = datetime.now(timezone.utc).date() - timedelta(days=config.WeatherConfig.CLIMATE_ARCHIVE_DELAY)
+
+        complete = series.complete_through() if series is not None else None
+
+        # Days still blank when the file was written (the archive fills in late) are
+
+        # downloaded again, at most once a day: when a newer archive day exists
+
+        unfilled = series is not None and complete < series.end < latest
+
+        if series is None or unfilled or (latest - series.end).days >= config.WeatherConfig.CLIMATE_REFRESH_DAYS:
+
+            start = complete + timedelta(days=1) if series is not None else datetime.strptime(config.WeatherConfig.CLIMATE_START_DATE, "%Y-%m-%d").date()
+
+            try:
+
+                update = await self.archive_breaker.call(self._fetch_archive_upstream, grid_key, start, latest)
+
+            except Exception:
+
+                if series is None:
+
+                    raise
+
+                # Keep answering from the file we have
+
+                update = None
+
+            if update is not None:
+
+                series = series.truncate(complete).extend(update) if series is not None else update
+
+                await asyncio.to_thread(series.save, path)
+
+        
+
+        self.climate_cache.set(grid_key, series)
+
+        return series
+
+    
+
+    async def _fetch_archive_upstream(self, grid_key: tuple, start, end) -> ClimateSeries:
+
+        """Download daily highs and lows for a date range in one request"""
+
+        archive_params = {
+
+            "latitude": grid_key[0],
+
+            "longitude": grid_key[1],
+
+            "start_date": start.isoformat(),
+
+            "end_date": end.isoformat(),
+
+            "daily": ",".join(ARCHIVE_VARIABLES),
+
+            "timezone": "auto",
+
+            "temperature_unit": "celsius"
+
+        }
+
+        # Decades of data take longer than the default request timeout
+
+        timeout = aiohttp.ClientTimeout(total=config.WeatherConfig.CLIMATE_REQUEST_TIMEOUT)
+
+        
+
+        async with self.bot.session.get(self.archive_api, params=archive_params, timeout=timeout) as archive_response:
+
+            if archive_response.status != 200:
+
+                raise WeatherServiceError("Climate archive service error. Please try again.")
+
+            
+
+            archive_data = await archive_response.json()
+
+        
+
+        return ClimateSeries.from_response(archive_data)
+
+    
+
+    async def fetch_chart(self, location: dict, units: str, span: str):
+
+        """Returns a PNG forecast chart for the next 24h or 7 days, or None if the renderer is busy"""
+
+        grid_key = snap_to_grid(location["latitude"], location["longitude"], config.WeatherConfig.GRID_RESOLUTION)
+
+        # Every request within one forecast run shares the same rendered bytes
+
+        run = int(time.time() // config.WeatherConfig.CHART_RUN_INTERVAL)
+
+        key = (grid_key, run, units, span)
+
+        
+
+        png = self.chart_cache.get(key)
+
+        if png is not MISSING:
+
+            return png
+
+        
+
+        return await self.flights.do(("chart", key), self._render_chart, key, location_label(location))
+
+    
+
+    async def _render_chart(self, key: tuple, label: str):
+
+        grid_key, _, units, span = key
+
+        if self.chart_slots.locked():
+
+            # Queue is full: skip the chart rather than pile up work
+
+            self.charts_skipped += 1
+
+            return None
+
+        
+
+        async with self.chart_slots:
+
+            series = await self.forecast_breaker.call(self._fetch_chart_series, grid_key, span)
+
+            
+
+            if units == "fahrenheit":
+
+                temperatures = [celsius_to_fahrenheit(value) for value in series["temperature_2m"]]
+
+                precipitation = [mm_to_inches(value) for value in series["precipitation"]]
+
+                temp_unit, precip_unit = "°F", "in"
+
+            else:
+
+                temperatures = series["temperature_2m"]
+
+                precipitation = series["precipitation"]
+
+                temp_unit, precip_unit = "°C", "mm"
+
+            
+
+            if self.chart_executor is None:
+
+                self.chart_executor = ProcessPoolExecutor(
+
+                    max_workers=config.WeatherConfig.CHART_WORKERS,
+
+                    mp_context=multiprocessing.get_context("spawn")
+
+                )
+
+            
+
+            title = f"{label} • next {'24 hours' if span == '24h' else '7 days'}"
+
+            loop = asyncio.get_running_loop()
+
+            png = await loop.run_in_executor(
+
+                self.chart_executor, render_forecast_chart,
+
+                title, series["time"], temperatures, precipitation, temp_unit, precip_unit
+
+            )
+
+        
+
+        self.chart_cache.set(key, png, ttl=seconds_until_next_update(config.WeatherConfig.CHART_RUN_INTERVAL))
+
+        return png
+
+    
+
+    async def _fetch_chart_series(self, grid_key: tuple, span: str) -> dict:
+
+        """Fetch hourly temperature and precipitation for a chart"""
+
+        weather_params = {
+
+            "latitude": grid_key[0],
+
+            "longitude": grid_key[1],
+
+            "hourly": "temperature_2m,precipitation",
+
+            "timezone": "auto",
+
+            "temperature_unit": "celsius",
+
+            "precipitation_unit": "mm"
+
+        }
+
+        if span == "24h":
+
+            weather_params["forecast_hours"] = 24
+
+        else:
+
+            weather_params["forecast_days"] = 7
+
+        
+
+        async with self.bot.session.get(self.weather_api, params=weather_params) as weather_response:
+
+            if weather_response.status != 200:
+
+                raise WeatherServiceError("Weather service error. Please try again.")
+
+            
+
+            weather_data = await weather_response.json()
+
+        
+
+        hourly = weather_data.get("hourly", {})
+
+        return {name: hourly.get(name, []) for name in ("time", "temperature_2m", "precipitation")}
+
+    
+
+    async def within_budget(self, coro, budget: float):
+
+        """Await a supplementary source, returning None if it fails or takes longer than budget seconds"""
+
+        try:
+
+            return await asyncio.wait_for(coro, budget)
+
+        except Exception:
+
+            # Secondary data never delays or breaks the main embed.
+
+            # A timed-out request keeps running inside its single flight and fills the cache for next time.
+
+            return None
+
+    
+
+    def stats(self) -> dict:
+
+        """Cache, breaker and stale-serve counters for monitoring"""
+
+        forecast_stats = self.forecast_cache.stats()
+
+        forecast_stats["memory_bytes"] = self.forecast_cache.memory_usage()
+
+        forecast_stats["stale_serves"] = self.stale_serves
+
+        return {
+
+            "geocode": self.geo_cache.stats(),
+
+            "forecast": forecast_stats,
+
+            "single_flight": self.flights.stats(),
+
+            "air_quality": self.air_quality_cache.stats(),
+
+            "charts": dict(self.chart_cache.stats(), skipped=self.charts_skipped),
+
+            "alerts": {
+
+                "locations": len(self.watch_table),
+
+                "memory_bytes": self.watch_table.memory_usage(),
+
+                "polls": self.alert_polls,
+
+                "sent": self.alerts_sent
+
+            },
+
+            "breakers": {
+
+                "geocoding": self.geocode_breaker.stats(),
+
+                "forecast": self.forecast_breaker.stats(),
+
+                "air quality": self.air_quality_breaker.stats(),
+
+                "archive": self.archive_breaker.stats(),
+
+                "alerts": self.alert_breaker.stats()
+
+            }
+
+        }
+
+    
+
+    def build_weather_embed(self, location: dict, snapshot: WeatherSnapshot, units: str, stale: bool = False,
+
+                            air_quality: AirQualitySnapshot = None) -> discord.Embed:
+
+        """Render current conditions for a location as an embed"""
+
+        city_name = location.get("name", "Unknown")
+
+        country = location.get("country", "Unknown")
+
+        state = location.get("admin1", "")
+
+        latitude = location["latitude"]
+
+        longitude = location["longitude"]
+
+        elevation = location.get("elevation", 0)
+
+        population = location.get("population", "Unknown")
+
+        
+
+        # Format location display
+
+        location_display = city_name
+
+        if state:
+
+            location_display += f", {state}"
+
+        location_display += f", {country}"
+
+        
+
+        # Apply unit conversion
+
+        if units == "fahrenheit":
+
+            snapshot = snapshot.to_imperial()
+
+            temp_unit = "°F"
+
+            wind_unit = "mph"
+
+        else:
+
+            temp_unit = "°C"
+
+            wind_unit = "km/h"
+
+        
+
+        temperature = na(snapshot.temperature)
+
+        windspeed = na(snapshot.windspeed)
+
+        winddirection = na(snapshot.winddirection)
+
+        weathercode = snapshot.weathercode
+
+        update_time = snapshot.time or datetime.utcnow().isoformat()
+
+        humidity = na(snapshot.humidity)
+
+        feels_like = na(snapshot.feels_like)
+
+        pressure = na(snapshot.pressure)
+
+        visibility = na(snapshot.visibility)
+
+        cloudcover = na(snapshot.cloudcover)
+
+        temp_max = na(snapshot.temp_max)
+
+        temp_min = na(snapshot.temp_min)
+
+        
+
+        # Sun times and day/night are computed locally for right now,
+
+        # so they stay correct when the forecast itself is cached or stale
+
+        utc_offset = snapshot.utc_offset or 0
+
+        local_date = (datetime.now(timezone.utc) + timedelta(seconds=utc_offset)).date()
+
+        sunrise, sunset, day_length = sun_times(latitude, longitude, local_date)
+
+        is_day = bool(is_daytime(latitude, longitude, time.time()))
+
+        sunrise_time = local_time(sunrise, utc_offset)
+
+        sunset_time = local_time(sunset, utc_offset)
+
+        
+
+        # Get weather description and emoji
+
+        weather_desc, weather_emoji = self.get_weather_description(weathercode)
+
+        
+
+        # Format times
+
+        try:
+
+            update_time_formatted = datetime.fromisoformat(update_time.replace("Z", "+00:00")).strftime("%H:%M")
+
+        except:
+
+            update_time_formatted = update_time
+
+        
+
+        # Create wind direction arrow
+
+        wind_arrows = ["↓", "↙", "←", "↖", "↑", "↗", "→", "↘"]
+
+        if isinstance(winddirection, (int, float)):
+
+            wind_index = round(winddirection / 45) % 8
+
+            wind_arrow = wind_arrows[wind_index]
+
+        else:
+
+            wind_arrow = "→"
+
+        
+
+        # Convert visibility to km
+
+        if isinstance(visibility, (int, float)):
+
+            visibility_km = visibility / 1000
+
+            visibility_display = f"{visibility_km:.1f} km"
+
+        else:
+
+            visibility_display = "N/A"
+
+        
+
+        # Convert pressure to hPa (already in hPa)
+
+        pressure_display = f"{pressure} hPa" if pressure != "N/A" else "N/A"
+
+        
+
+        # Format population with commas
+
+        if population != "Unknown" and isinstance(population, int):
+
+            population_display = f"{population:,}"
+
+        else:
+
+            population_display = "Unknown"
+
+        
+
+        # --- CREATE BEAUTIFUL EMBED ---
+
+        embed = discord.Embed(
+
+            title=f"{weather_emoji} Current Weather in {location_display}",
+
+            color=config.Colors.INFO,
+
+            url=f"https://open-meteo.com/?lat={latitude}&lon={longitude}&timezone=auto"
+
+        )
+
+        
+
+        # Main temperature field
+
+        embed.add_field(
+
+            name="🌡️ Temperature",
+
+            value=f"**{temperature}{temp_unit}**\nFeels like: {feels_like}{temp_unit}",
+
+            inline=True
+
+        )
+
+        
+
+        # Weather condition
+
+        embed.add_field(
+
+            name="☁️ Condition",
+
+            value=f"**{weather_desc}**\nCloud cover: {cloudcover}%",
+
+            inline=True
+
+        )
+
+        
+
+        # Humidity
+
+        embed.add_field(
+
+            name="💧 Humidity",
+
+            value=f"**{humidity}%**",
+
+            inline=True
+
+        )
+
+        
+
+        # Wind
+
+        embed.add_field(
+
+            name="💨 Wind",
+
+            value=f"**{windspeed} {wind_unit}**\nDirection: {winddirection}° {wind_arrow}",
+
+            inline=True
+
+        )
+
+        
+
+        # Pressure & Visibility
+
+        embed.add_field(
+
+            name="📊 Pressure",
+
+            value=f"**{pressure_display}**",
+
+            inline=True
+
+        )
+
+        
+
+        embed.add_field(
+
+            name="👁️ Visibility",
+
+            value=f"**{visibility_display}**",
+
+            inline=True
+
+        )
+
+        
+
+        # Daily min/max
+
+        embed.add_field(
+
+            name="📈 Daily Range",
+
+            value=f"Max: **{temp_max}{temp_unit}**\nMin: **{temp_min}{temp_unit}**",
+
+            inline=True
+
+        )
+
+        
+
+        # Sunrise/Sunset
+
+        embed.add_field(
+
+            name="🌅 Sunrise",
+
+            value=f"**{sunrise_time}**",
+
+            inline=True
+
+        )
+
+        
+
+        embed.add_field(
+
+            name="🌇 Sunset",
+
+            value=f"**{sunset_time}**\nDay length: {format_day_length(day_length)}",
+
+            inline=True
+
+        )
+
+        
+
+        # Air quality & UV (only when the supplementary source answered in time)
+
+        if air_quality is not None and air_quality.us_aqi is not None:
+
+            air_value = f"**{air_quality.us_aqi:.0f} AQI**\n{self.get_aqi_description(air_quality.us_aqi)}"
+
+            if air_quality.pm2_5 is not None:
+
+                air_value += f"\nPM2.5: {air_quality.pm2_5} µg/m³"
+
+            embed.add_field(
+
+                name="🌫️ Air Quality",
+
+                value=air_value,
+
+                inline=True
+
+            )
+
+        
+
+        if air_quality is not None and air_quality.uv_index is not None:
+
+            embed.add_field(
+
+                name="🔆 UV Index",
+
+                value=f"**{air_quality.uv_index:.1f}**\n{self.get_uv_description(air_quality.uv_index)}",
+
+                inline=True
+
+            )
+
+        
+
+        # Location info
+
+        location_info = f"📍 Coordinates: `{latitude:.4f}, {longitude:.4f}`\n"
+
+        location_info += f"🏔️ Elevation: `{elevation}m`\n"
+
+        if population_display != "Unknown":
+
+            location_info += f"👥 Population: `{population_display}`"
+
+        
+
+        embed.add_field(
+
+            name="🗺️ Location Details",
+
+            value=location_info,
+
+            inline=False
+
+        )
+
+        
+
+        # Footer with update time
+
+        day_icon = "☀️ Day" if is_day else "🌙 Night"
+
+        footer_text = f"{day_icon} • Updated at {update_time_formatted} (Local Time) • Data: Open-Meteo"
+
+        if stale:
+
+            footer_text += f" • {config.Icons.WARNING} Cached data, refreshing"
+
+        embed.set_footer(
+
+            text=footer_text,
+
+            icon_url="https://open-meteo.com/images/favicon.ico"
+
+        )
+
+        embed.timestamp = datetime.utcnow()
+
+        
+
+        # Set thumbnail based on weather
+
+        if is_day:
+
+            if weathercode == 0:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/01d@2x.png")
+
+            elif weathercode in [1, 2]:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/02d@2x.png")
+
+            elif weathercode == 3:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/03d@2x.png")
+
+            elif weathercode in [45, 48]:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/50d@2x.png")
+
+            elif weathercode in [51, 53, 55, 56, 57, 61, 63, 65, 66, 67, 80, 81, 82]:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/10d@2x.png")
+
+            elif weathercode in [71, 73, 75, 77, 85, 86]:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/13d@2x.png")
+
+            elif weathercode in [95, 96, 99]:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/11d@2x.png")
+
+        else:
+
+            if weathercode == 0:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/01n@2x.png")
+
+            elif weathercode in [1, 2]:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/02n@2x.png")
+
+            else:
+
+                embed.set_thumbnail(url="https://openweathermap.org/img/wn/04n@2x.png")
+
+        
+
+        return embed
+
+    
+
+    def build_history_embed(self, location: dict, target, high: float, low: float, stats: dict, units: str) -> discord.Embed:
+
+        """Render a day's temperatures against the climate record for the same calendar day"""
+
+        if units == "fahrenheit":
+
+            convert = celsius_to_fahrenheit
+
+            temp_unit = "°F"
+
+        else:
+
+            convert = lambda value: round(value, 1)
+
+            temp_unit = "°C"
+
+        
+
+        day_name = f"{target:%B} {target.day}"
+
+        embed = discord.Embed(
+
+            title=f"📜 Climate History for {location_label(location)}"[:256],
+
+            description=f"**{day_name}, {target.year}** compared with {stats['years']} years of {day_name} records since {stats['first_year']}.",
+
+            color=config.Colors.INFO
+
+        )
+
+        
+
+        embed.add_field(
+
+            name="🌡️ High",
+
+            value=f"**{convert(high)}{temp_unit}**\nWarmer than {stats['high_percentile']:.0f}% of years\nNormal: {convert(stats['normal_high'])}{temp_unit}",
+
+            inline=True
+
+        )
+
+        embed.add_field(
+
+            name="🌡️ Low",
+
+            value=f"**{convert(low)}{temp_unit}**\nWarmer than {stats['low_percentile']:.0f}% of years\nNormal: {convert(stats['normal_low'])}{temp_unit}",
+
+            inline=True
+
+        )
+
+        embed.add_field(name="\u200b", value="\u200b", inline=True)
+
+        embed.add_field(
+
+            name="🔺 Record High",
+
+            value=f"**{convert(stats['record_high'])}{temp_unit}** ({stats['record_high_year']})",
+
+            inline=True
+
+        )
+
+        embed.add_field(
+
+            name="🔻 Record Low",
+
+            value=f"**{convert(stats['record_low'])}{temp_unit}** ({stats['record_low_year']})",
+
+            inline=True
+
+        )
+
+        
+
+        embed.set_footer(text="Data: Open-Meteo historical weather (ERA5)", icon_url="https://open-meteo.com/images/favicon.ico")
+
+        embed.timestamp = discord.utils.utcnow()
+
+        return embed
+
+    
+
+    def build_digest_embed(self, entries: list, date: str) -> discord.Embed:
+
+        """Render a channel's daily digest from (city, units, forecast, latitude, longitude) entries"""
+
+        embed = discord.Embed(
+
+            title=f"📅 Daily Forecast • {date}",
+
+            color=config.Colors.INFO
+
+        )
+
+        
+
+        # Sun times for every city in one vectorized call
+
+        sunrises, sunsets, _ = sun_times(
+
+            [entry[3] for entry in entries],
+
+            [entry[4] for entry in entries],
+
+            [entry[2].date or date for entry in entries]
+
+        )
+
+        
+
+        for (city, units, forecast, _, _), sunrise, sunset in zip(entries, sunrises, sunsets):
+
+            if units == "fahrenheit":
+
+                forecast = forecast.to_imperial()
+
+                temp_unit = "°F"
+
+                wind_unit = "mph"
+
+                precip_unit = "in"
+
+            else:
+
+                temp_unit = "°C"
+
+                wind_unit = "km/h"
+
+                precip_unit = "mm"
+
+            
+
+            weather_desc, weather_emoji = self.get_weather_description(forecast.weathercode)
+
+            embed.add_field(
+
+                name=f"{weather_emoji} {city}"[:256],
+
+                value=(
+
+                    f"**{weather_desc}**\n"
+
+                    f"📈 {na(forecast.temp_max)}{temp_unit} / 📉 {na(forecast.temp_min)}{temp_unit}\n"
+
+                    f"💧 {na(forecast.precipitation)} {precip_unit} ({na(forecast.precipitation_probability)}%)\n"
+
+                    f"💨 Up to {na(forecast.wind_max)} {wind_unit}\n"
+
+                    f"🌅 {local_time(sunrise, forecast.utc_offset or 0)} • 🌇 {local_time(sunset, forecast.utc_offset or 0)}"
+
+                ),
+
+                inline=True
+
+            )
+
+        
+
+        embed.set_footer(text="Data: Open-Meteo", icon_url="https://open-meteo.com/images/favicon.ico")
+
+        embed.timestamp = discord.utils.utcnow()
+
+        return embed
+
+    
+
+    @tasks.loop(seconds=config.WeatherConfig.DIGEST_TICK)
+
+    async def digest_scheduler(self):
+
+        """Post every digest that is due this tick"""
+
+        try:
+
+            await self.post_due_digests()
+
+        except Exception as e:
+
+            # Keep the loop alive; unsent digests are retried next tick
+
+            if config.BotConfig.LOG_ERRORS:
+
+                log.error("Digest scheduler error: %s", e)
+
+    
+
+    @digest_scheduler.before_loop
+
+    async def before_digest_scheduler(self):
+
+        await self.bot.wait_until_ready()
+
+    
+
+    async def post_due_digests(self, now: datetime = None) -> int:
+
+        """Send the digests due at ``now``; returns the number of channels posted to"""
+
+        if now is None:
+
+            now = datetime.now(timezone.utc)
+
+        today = now.date().isoformat()
+
+        
+
+        rows = await self.bot.db.fetchall(
+
+            "SELECT id, channel_id, city, latitude, longitude, units FROM weather_subscriptions "
+
+            "WHERE (last_posted IS NULL OR last_posted < ?) AND post_hour <= ? "
+
+            "ORDER BY channel_id, id",
+
+            (today, now.hour)
+
+        )
+
+        if not rows:
+
+            return 0
+
+        
+
+        # Every distinct grid cell across all guilds is fetched once
+
+        forecasts = await self.fetch_daily_forecasts([(row[3], row[4]) for row in rows])
+
+        
+
+        by_channel = defaultdict(list)
+
+        for row in rows:
+
+            by_channel[row[1]].append(row)
+
+        
+
+        done = []
+
+        posted = 0
+
+        for channel_id, subscriptions in by_channel.items():
+
+            grid_keys = [snap_to_grid(row[3], row[4], config.WeatherConfig.GRID_RESOLUTION) for row in subscriptions]
+
+            if not all(grid_key in forecasts for grid_key in grid_keys):
+
+                # Part of this channel's digest failed to fetch; retry it whole next tick
+
+                continue
+
+            
+
+            channel = self.bot.get_channel(channel_id)
+
+            if channel is not None:
+
+                entries = [(row[2], row[5], forecasts[grid_key], row[3], row[4]) for row, grid_key in zip(subscriptions, grid_keys)]
+
+                try:
+
+                    await channel.send(embed=self.build_digest_embed(entries, today))
+
+                    posted += 1
+
+                except discord.Forbidden:
+
+                    if config.BotConfig.LOG_ERRORS:
+
+                        log.warning("Missing permissions to post digest in channel %s", channel_id)
+
+                except discord.HTTPException as e:
+
+                    if config.BotConfig.LOG_ERRORS:
+
+                        log.warning("Failed to post digest in channel %s: %s", channel_id, e)
+
+                    continue
+
+            
+
+            # Deleted or inaccessible channels are skipped for the day rather than retried every tick
+
+            done.extend((today, row[0]) for row in subscriptions)
+
+        
+
+        if done:
+
+            await self.bot.db.executemany("UPDATE weather_subscriptions SET last_posted = ? WHERE id = ?", done)
+
+        return posted
+
+    
+
+    def add_alert_watcher(self, row_id: int, channel_id: int, city: str, latitude: float, longitude: float,
+
+                          condition: int = CALM, now: float = 0.0):
+
+        grid_key = snap_to_grid(latitude, longitude, config.WeatherConfig.GRID_RESOLUTION)
+
+        self.watch_table.add(grid_key, condition, now)
+
+        self.alert_watchers[grid_key][row_id] = (channel_id, city)
+
+    
+
+    def remove_alert_watcher(self, row_id: int, latitude: float, longitude: float):
+
+        grid_key = snap_to_grid(latitude, longitude, config.WeatherConfig.GRID_RESOLUTION)
+
+        watchers = self.alert_watchers.get(grid_key)
+
+        if watchers is None:
+
+            return
+
+        watchers.pop(row_id, None)
+
+        if not watchers:
+
+            # Nobody watches this cell any more
+
+            del self.alert_watchers[grid_key]
+
+            self.watch_table.remove(grid_key)
+
+    
+
+    def build_alert_embed(self, city: str, code: int) -> discord.Embed:
+
+        """Render a condition change for an alert subscription"""
+
+        weather_desc, weather_emoji = self.get_weather_description(code)
+
+        if condition_class(code) == CALM:
+
+            embed = discord.Embed(
+
+                title=f"{config.Icons.YES} All Clear: {city}"[:256],
+
+                description=f"Severe weather has ended. Now: {weather_emoji} **{weather_desc}**",
+
+                color=config.Colors.SUCCESS
+
+            )
+
+        else:
+
+            embed = discord.Embed(
+
+                title=f"{config.Icons.WARNING} Severe Weather: {city}"[:256],
+
+                description=f"{weather_emoji} **{weather_desc}** reported right now.",
+
+                color=config.Colors.WARNING
+
+            )
+
+        embed.set_footer(text="Data: Open-Meteo", icon_url="https://open-meteo.com/images/favicon.ico")
+
+        embed.timestamp = discord.utils.utcnow()
+
+        return embed
+
+    
+
+    @tasks.loop(seconds=config.WeatherConfig.ALERT_TICK)
+
+    async def alert_watcher(self):
+
+        """Poll the watched locations that are due and announce condition changes"""
+
+        try:
+
+            await self.poll_alerts()
+
+        except Exception as e:
+
+            if config.BotConfig.LOG_ERRORS:
+
+                log.error("Alert watcher error: %s", e)
+
+    
+
+    @alert_watcher.before_loop
+
+    async def before_alert_watcher(self):
+
+        await self.bot.wait_until_ready()
+
+    
+
+    async def poll_alerts(self, now: float = None) -> int:
+
+        """Poll due locations, up to ALERT_MAX_BATCHES requests; returns the number of condition changes"""
+
+        if now is None:
+
+            now = time.monotonic()
+
+        # Cached answers are free, so look at a few batches' worth beyond the request cap
+
+        size = config.WeatherConfig.DIGEST_BATCH_SIZE
+
+        max_batches = config.WeatherConfig.ALERT_MAX_BATCHES
+
+        due = [self.watch_table.key(slot) for slot in self.watch_table.due(now, limit=size * max_batches * 2)]
+
+        if not due:
+
+            return 0
+
+        
+
+        # A fresh cached forecast (e.g. from /weather) answers without a request
+
+        codes = {}
+
+        missing = []
+
+        for grid_key in due:
+
+            snapshot = self.forecast_cache.get(grid_key, count=False)
+
+            if snapshot is not MISSING:
+
+                codes[grid_key] = snapshot.weathercode
+
+            else:
+
+                missing.append(grid_key)
+
+        
+
+        # Whatever doesn't fit stays due and goes first on the next tick
+
+        missing = missing[:size * max_batches]
+
+        batches = [missing[i:i + size] for i in range(0, len(missing), size)]
+
+        results = await asyncio.gather(
+
+            *(self.alert_breaker.call(self._fetch_forecast_batch, batch) for batch in batches),
+
+            return_exceptions=True
+
+        )
+
+        
+
+        for batch, result in zip(batches, results):
+
+            if isinstance(result, BaseException):
+
+                if config.BotConfig.LOG_ERRORS and not isinstance(result, CircuitOpenError):
+
+                    log.warning("Alert poll batch of %s failed: %s", len(batch), result)
+
+                for grid_key in batch:
+
+                    slot = self.watch_table.index.get(grid_key)
+
+                    if slot is not None:
+
+                        self.watch_table.postpone(slot, now)
+
+                continue
+
+            codes.update((grid_key, snapshot.weathercode) for grid_key, snapshot in zip(batch, result))
+
+        
+
+        changes = []
+
+        for grid_key, code in codes.items():
+
+            # Slots move when locations are removed, so look them up again after awaiting
+
+            slot = self.watch_table.index.get(grid_key)
+
+            if slot is not None and self.watch_table.update(slot, code, now):
+
+                changes.append((grid_key, code))
+
+        self.alert_polls += len(codes)
+
+        
+
+        for grid_key, code in changes:
+
+            watchers = dict(self.alert_watchers.get(grid_key, {}))
+
+            await self.bot.db.executemany(
+
+                "UPDATE weather_alerts SET condition = ? WHERE id = ?",
+
+                [(condition_class(code), row_id) for row_id in watchers]
+
+            )
+
+            for channel_id, city in watchers.values():
+
+                channel = self.bot.get_channel(channel_id)
+
+                if channel is None:
+
+                    continue
+
+                try:
+
+                    await channel.send(embed=self.build_alert_embed(city, code))
+
+                    self.alerts_sent += 1
+
+                except discord.HTTPException as e:
+
+                    if config.BotConfig.LOG_ERRORS:
+
+                        log.warning("Failed to post weather alert in channel %s: %s", channel_id, e)
+
+        
+
+        return len(changes)
+
+    
+
+    @app_commands.command(name="weather", description="Get current weather for any city worldwide!")
+
+    @app_commands.describe(
+
+        city="City name (e.g., London, Tokyo, New York)",
+
+        units="Temperature units (Celsius or Fahrenheit)",
+
+        chart="Attach a temperature and precipitation chart"
+
+    )
+
+    @app_commands.choices(units=[
+
+        app_commands.Choice(name="Celsius (°C)", value="celsius"),
+
+        app_commands.Choice(name="Fahrenheit (°F)", value="fahrenheit"),
+
+    ], chart=[
+
+        app_commands.Choice(name="Next 24 hours", value="24h"),
+
+        app_commands.Choice(name="Next 7 days", value="7d"),
+
+    ])
+
+    @app_commands.checks.cooldown(1, 10)  # 10 second cooldown
+
+    async def weather(self, interaction: discord.Interaction, city: str, units: str = "celsius", chart: str = None):
+
+        """Fetch and display current weather for a city"""
+
+        
+
+        # Defer response while we fetch data
+
+        await interaction.response.defer()
+
+        
+
+        try:
+
+            # STEP 1: Geocode city name to coordinates (cached)
+
+            location = await self.geocode(city)
+
+            
+
+            if location is None:
+
+                await interaction.followup.send(
+
+                    f"{config.Icons.NO} City '{city}' not found. Please check the spelling and try again.",
+
+                    ephemeral=True
+
+                )
+
+                return
+
+            
+
+            # STEP 2: Fetch current conditions (cached in metric, converted locally)
+
+            # alongside air quality/UV, which gets a latency budget and is dropped if late,
+
+            # and the optional chart, rendered off the event loop in a worker process
+
+            latitude = location["latitude"]
+
+            longitude = location["longitude"]
+
+            (snapshot, stale), air_quality, png = await asyncio.gather(
+
+                self.fetch_forecast(latitude, longitude),
+
+                self.within_budget(self.fetch_air_quality(latitude, longitude), config.WeatherConfig.AIR_QUALITY_BUDGET),
+
+                self.within_budget(self.fetch_chart(location, units, chart), config.WeatherConfig.CHART_BUDGET) if chart else asyncio.sleep(0)
+
+            )
+
+            
+
+            embed = self.build_weather_embed(location, snapshot, units, stale, air_quality)
+
+            if png:
+
+                embed.set_image(url="attachment://forecast.png")
+
+                await interaction.followup.send(embed=embed, file=discord.File(io.BytesIO(png), filename="forecast.png"))
+
+            else:
+
+                await interaction.followup.send(embed=embed)
+
+            
+
+        except WeatherServiceError as e:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} {e}",
+
+                ephemeral=True
+
+            )
+
+        except CircuitOpenError:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} The weather service is temporarily unavailable. Please try again in a few minutes.",
+
+                ephemeral=True
+
+            )
+
+        except asyncio.TimeoutError:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} The weather service took too long to respond. Please try again.",
+
+                ephemeral=True
+
+            )
+
+        except aiohttp.ClientError:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} Network error. Couldn't reach the weather service.",
+
+                ephemeral=True
+
+            )
+
+        except Exception as e:
+
+            if config.BotConfig.LOG_ERRORS:
+
+                log.error("Weather command error: %s", e)
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} An error occurred while fetching weather data.",
+
+                ephemeral=True
+
+            )
+
+    @app_commands.command(name="weather-compare", description="Compare current weather across several cities")
+
+    @app_commands.describe(
+
+        cities="Cities separated by semicolons (e.g., London; Paris, Texas; Tokyo)",
+
+        units="Temperature units (Celsius or Fahrenheit)"
+
+    )
+
+    @app_commands.choices(units=[
+
+        app_commands.Choice(name="Celsius (°C)", value="celsius"),
+
+        app_commands.Choice(name="Fahrenheit (°F)", value="fahrenheit"),
+
+    ])
+
+    @app_commands.checks.cooldown(1, 15)  # 15 second cooldown
+
+    async def weather_compare(self, interaction: discord.Interaction, cities: str, units: str = "celsius"):
+
+        """Show current weather for several cities in one table"""
+
+        # Split and de-duplicate the requested cities
+
+        names = list({normalize_name(name): name.strip() for name in cities.replace("|", ";").split(";") if name.strip()}.values())
+
+        if not names:
+
+            await interaction.response.send_message(
+
+                f"{config.Icons.NO} Please provide at least one city.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        if len(names) > config.WeatherConfig.COMPARE_MAX_CITIES:
+
+            await interaction.response.send_message(
+
+                f"{config.Icons.NO} You can compare at most {config.WeatherConfig.COMPARE_MAX_CITIES} cities at once.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        await interaction.response.defer()
+
+        
+
+        try:
+
+            # STEP 1: Resolve every city concurrently
+
+            locations = await asyncio.gather(*(self.geocode(name) for name in names))
+
+            found = [(name, location) for name, location in zip(names, locations) if location is not None]
+
+            not_found = [name for name, location in zip(names, locations) if location is None]
+
+            
+
+            if not found:
+
+                await interaction.followup.send(
+
+                    f"{config.Icons.NO} None of those cities could be found. Please check the spelling and try again.",
+
+                    ephemeral=True
+
+                )
+
+                return
+
+            
+
+            # STEP 2: One forecast request for all of them
+
+            forecasts = await self.fetch_forecasts([(location["latitude"], location["longitude"]) for _, location in found])
+
+            
+
+            if units == "fahrenheit":
+
+                temp_unit = "°F"
+
+                wind_unit = "mph"
+
+            else:
+
+                temp_unit = "°C"
+
+                wind_unit = "km/h"
+
+            
+
+            # Build a fixed-width table
+
+            rows = [f"{'City':<16} {'Temp':>7} {'Feels':>7} {'Hum':>4} {'Wind':>10}  Condition"]
+
+            # Day/night for every city in one vectorized call
+
+            daytime = is_daytime(
+
+                [location["latitude"] for _, location in found],
+
+                [location["longitude"] for _, location in found],
+
+                time.time()
+
+            )
+
+            for (name, location), (snapshot, stale), is_day in zip(found, forecasts, daytime):
+
+                if units == "fahrenheit":
+
+                    snapshot = snapshot.to_imperial()
+
+                weather_desc, weather_emoji = self.get_weather_description(snapshot.weathercode)
+
+                city_name = location.get("name", name)[:15] + ("*" if stale else "")
+
+                rows.append(
+
+                    f"{city_name:<16} {f'{na(snapshot.temperature)}{temp_unit}':>7} {f'{na(snapshot.feels_like)}{temp_unit}':>7} "
+
+                    f"{f'{na(snapshot.humidity)}%':>4} {f'{na(snapshot.windspeed)} {wind_unit}':>10}  {'☀️' if is_day else '🌙'} {weather_emoji} {weather_desc}"
+
+                )
+
+            
+
+            embed = discord.Embed(
+
+                title=f"🌍 Weather Comparison ({len(found)} cities)",
+
+                description="```\n" + "\n".join(rows) + "\n```",
+
+                color=config.Colors.INFO
+
+            )
+
+            if not_found:
+
+                embed.add_field(
+
+                    name=f"{config.Icons.WARNING} Not Found",
+
+                    value=", ".join(not_found)[:1024],
+
+                    inline=False
+
+                )
+
+            footer_text = "Data: Open-Meteo"
+
+            if any(stale for _, stale in forecasts):
+
+                footer_text = f"* Cached data (weather service unavailable) • {footer_text}"
+
+            embed.set_footer(text=footer_text, icon_url="https://open-meteo.com/images/favicon.ico")
+
+            embed.timestamp = discord.utils.utcnow()
+
+            
+
+            await interaction.followup.send(embed=embed)
+
+            
+
+        except WeatherServiceError as e:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} {e}",
+
+                ephemeral=True
+
+            )
+
+        except CircuitOpenError:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} The weather service is temporarily unavailable. Please try again in a few minutes.",
+
+                ephemeral=True
+
+            )
+
+        except asyncio.TimeoutError:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} The weather service took too long to respond. Please try again.",
+
+                ephemeral=True
+
+            )
+
+        except aiohttp.ClientError:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} Network error. Couldn't reach the weather service.",
+
+                ephemeral=True
+
+            )
+
+        except Exception as e:
+
+            if config.BotConfig.LOG_ERRORS:
+
+                log.error("Weather compare error: %s", e)
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} An error occurred while fetching weather data.",
+
+                ephemeral=True
+
+            )
+
+    
+
+    @app_commands.command(name="weather-history", description="Compare a day's temperatures with decades of climate records")
+
+    @app_commands.describe(
+
+        city="City name (e.g., London, Tokyo, New York)",
+
+        date="Date as YYYY-MM-DD (default: today)",
+
+        units="Temperature units (Celsius or Fahrenheit)"
+
+    )
+
+    @app_commands.choices(units=[
+
+        app_commands.Choice(name="Celsius (°C)", value="celsius"),
+
+        app_commands.Choice(name="Fahrenheit (°F)", value="fahrenheit"),
+
+    ])
+
+    @app_commands.checks.cooldown(1, 15)  # 15 second cooldown
+
+    async def weather_history(self, interaction: discord.Interaction, city: str, date: str = None, units: str = "celsius"):
+
+        """Show percentile ranks and records for a day's high and low"""
+
+        today = datetime.now(timezone.utc).date()
+
+        first_day = datetime.strptime(config.WeatherConfig.CLIMATE_START_DATE, "%Y-%m-%d").date()
+
+        if date is None:
+
+            target = today
+
+        else:
+
+            try:
+
+                target = datetime.strptime(date.strip(), "%Y-%m-%d").date()
+
+            except ValueError:
+
+                await interaction.response.send_message(
+
+                    f"{config.Icons.NO} Please give the date as YYYY-MM-DD (e.g., 2024-07-14).",
+
+                    ephemeral=True
+
+                )
+
+                return
+
+            if not first_day <= target <= today:
+
+                await interaction.response.send_message(
+
+                    f"{config.Icons.NO} The date must be between {first_day.isoformat()} and today.",
+
+                    ephemeral=True
+
+                )
+
+                return
+
+        
+
+        await interaction.response.defer()
+
+        
+
+        try:
+
+            location = await self.geocode(city)
+
+            
+
+            if location is None:
+
+                await interaction.followup.send(
+
+                    f"{config.Icons.NO} City '{city}' not found. Please check the spelling and try again.",
+
+                    ephemeral=True
+
+                )
+
+                return
+
+            
+
+            series = await self.fetch_climate(location["latitude"], location["longitude"])
+
+            
+
+            # Past days come from the archive; today (not archived yet) from the forecast
+
+            values = series.value_on(target)
+
+            if values is not None and any(math.isnan(value) for value in values):
+
+                values = None
+
+            if values is None and target == today:
+
+                snapshot, _ = await self.fetch_forecast(location["latitude"], location["longitude"])
+
+                if snapshot.temp_max is not None and snapshot.temp_min is not None:
+
+                    values = (snapshot.temp_max, snapshot.temp_min)
+
+            if values is None:
+
+                await interaction.followup.send(
+
+                    f"{config.Icons.NO} No data for {target.isoformat()} yet. The archive runs about {config.WeatherConfig.CLIMATE_ARCHIVE_DELAY} days behind.",
+
+                    ephemeral=True
+
+                )
+
+                return
+
+            
+
+            high, low = values
+
+            stats = day_statistics(series, target, high, low)
+
+            if stats is None:
+
+                await interaction.followup.send(
+
+                    f"{config.Icons.NO} Not enough climate records for this location.",
+
+                    ephemeral=True
+
+                )
+
+                return
+
+            
+
+            embed = self.build_history_embed(location, target, high, low, stats, units)
+
+            await interaction.followup.send(embed=embed)
+
+            
+
+        except WeatherServiceError as e:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} {e}",
+
+                ephemeral=True
+
+            )
+
+        except CircuitOpenError:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} The weather service is temporarily unavailable. Please try again in a few minutes.",
+
+                ephemeral=True
+
+            )
+
+        except asyncio.TimeoutError:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} The weather service took too long to respond. Please try again.",
+
+                ephemeral=True
+
+            )
+
+        except aiohttp.ClientError:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} Network error. Couldn't reach the weather service.",
+
+                ephemeral=True
+
+            )
+
+        except Exception as e:
+
+            if config.BotConfig.LOG_ERRORS:
+
+                log.error("Weather history error: %s", e)
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} An error occurred while fetching climate data.",
+
+                ephemeral=True
+
+            )
+
+    
+
+    @app_commands.command(name="weather-status", description="Show weather cache and upstream health")
+
+    async def weather_status(self, interaction: discord.Interaction):
+
+        """Display cache hit rates, circuit breaker state and stale-serve counts"""
+
+        stats = self.stats()
+
+        embed = discord.Embed(
+
+            title=f"{config.Icons.INFO} Weather Service Status",
+
+            color=config.Colors.INFO
+
+        )
+
+        
+
+        geocode = stats["geocode"]
+
+        embed.add_field(
+
+            name="📍 Geocoding Cache",
+
+            value=f"Entries: **{geocode['size']}**\nHit rate: **{geocode['hit_rate']:.0%}** ({geocode['hits']} / {geocode['hits'] + geocode['misses']})",
+
+            inline=True
+
+        )
+
+        
+
+        forecast = stats["forecast"]
+
+        embed.add_field(
+
+            name="🌦️ Forecast Cache",
+
+            value=f"Entries: **{forecast['size']}** ({forecast['memory_bytes'] / 1024:.1f} KB)\nHit rate: **{forecast['hit_rate']:.0%}** ({forecast['hits']} / {forecast['hits'] + forecast['misses']})\nStale serves: **{forecast['stale_serves']}**",
+
+            inline=True
+
+        )
+
+        
+
+        alerts = stats["alerts"]
+
+        embed.add_field(
+
+            name="🚨 Alert Watcher",
+
+            value=f"Locations: **{alerts['locations']}** ({alerts['memory_bytes'] / 1024:.1f} KB)\nPolls: **{alerts['polls']}** • Alerts sent: **{alerts['sent']}**",
+
+            inline=True
+
+        )
+
+        
+
+        for name, breaker in stats["breakers"].items():
+
+            state_icon = config.Icons.YES if breaker["state"] == CircuitBreaker.CLOSED else config.Icons.WARNING
+
+            embed.add_field(
+
+                name=f"{state_icon} {name.title()} Circuit",
+
+                value=f"State: **{breaker['state']}**\nFailures: {breaker['failures']} • Opened: {breaker['times_opened']}x • Rejected: {breaker['rejected']}",
+
+                inline=False
+
+            )
+
+        
+
+        flights = stats["single_flight"]
+
+        embed.set_footer(text=f"Upstream calls: {flights['calls']} • Coalesced: {flights['coalesced']}")
+
+        embed.timestamp = discord.utils.utcnow()
+
+        
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    
+
+    @app_commands.command(name="weather-subscribe", description="Post a daily forecast for a city in this channel")
+
+    @app_commands.describe(
+
+        city="City name (e.g., London, Tokyo, New York)",
+
+        hour="Hour of the day to post at, in UTC (0-23)",
+
+        units="Temperature units (Celsius or Fahrenheit)"
+
+    )
+
+    @app_commands.choices(units=[
+
+        app_commands.Choice(name="Celsius (°C)", value="celsius"),
+
+        app_commands.Choice(name="Fahrenheit (°F)", value="fahrenheit"),
+
+    ])
+
+    @app_commands.guild_only()
+
+    @app_commands.default_permissions(manage_guild=True)
+
+    async def weather_subscribe(self, interaction: discord.Interaction, city: str,
+
+                                hour: app_commands.Range[int, 0, 23], units: str = "celsius"):
+
+        """Subscribe the current channel to a daily forecast digest"""
+
+        await interaction.response.defer(ephemeral=True)
+
+        
+
+        try:
+
+            location = await self.geocode(city)
+
+        except (WeatherServiceError, CircuitOpenError, asyncio.TimeoutError, aiohttp.ClientError):
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} Couldn't look up that city right now. Please try again later.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        if location is None:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} City '{city}' not found. Please check the spelling and try again.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        label = location_label(location)
+
+        
+
+        count, existing = await self.bot.db.fetchone(
+
+            "SELECT COUNT(*), COALESCE(SUM(city = ?), 0) FROM weather_subscriptions WHERE channel_id = ?",
+
+            (label, interaction.channel_id)
+
+        )
+
+        if not existing and count >= config.WeatherConfig.DIGEST_MAX_CITIES:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} This channel already has {config.WeatherConfig.DIGEST_MAX_CITIES} subscriptions. Remove one with /weather-unsubscribe first.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        # If today's post time has already passed, the first digest goes out tomorrow
+
+        now = datetime.now(timezone.utc)
+
+        last_posted = now.date().isoformat() if hour <= now.hour else None
+
+        
+
+        await self.bot.db.execute(
+
+            "INSERT INTO weather_subscriptions (guild_id, channel_id, city, latitude, longitude, post_hour, units, last_posted) "
+
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+
+            "ON CONFLICT (channel_id, city) DO UPDATE SET post_hour = excluded.post_hour, units = excluded.units, "
+
+            "last_posted = excluded.last_posted",
+
+            (interaction.guild_id, interaction.channel_id, label, location["latitude"], location["longitude"], hour, units, last_posted)
+
+        )
+
+        
+
+        embed = discord.Embed(
+
+            title=f"{config.Icons.YES} Subscribed",
+
+            description=f"A daily forecast for **{label}** will be posted in {interaction.channel.mention} at **{hour:02d}:00 UTC**.",
+
+            color=config.Colors.SUCCESS
+
+        )
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    
+
+    @app_commands.command(name="weather-unsubscribe", description="Stop a daily forecast in this channel")
+
+    @app_commands.describe(city="Subscribed city to remove")
+
+    @app_commands.guild_only()
+
+    @app_commands.default_permissions(manage_guild=True)
+
+    async def weather_unsubscribe(self, interaction: discord.Interaction, city: str):
+
+        """Remove a daily forecast subscription from the current channel"""
+
+        removed = await self.bot.db.execute(
+
+            "DELETE FROM weather_subscriptions WHERE channel_id = ? AND city = ?",
+
+            (interaction.channel_id, city)
+
+        )
+
+        
+
+        if not removed:
+
+            await interaction.response.send_message(
+
+                f"{config.Icons.NO} This channel has no daily forecast for '{city}'.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        await interaction.response.send_message(
+
+            f"{config.Icons.YES} Daily forecast for **{city}** removed from this channel.",
+
+            ephemeral=True
+
+        )
+
+    
+
+    @app_commands.command(name="weather-alert-subscribe", description="Post severe-weather alerts for a city in this channel")
+
+    @app_commands.describe(city="City name (e.g., London, Tokyo, New York)")
+
+    @app_commands.guild_only()
+
+    @app_commands.default_permissions(manage_guild=True)
+
+    async def weather_alert_subscribe(self, interaction: discord.Interaction, city: str):
+
+        """Watch a city for thunderstorms, hail, heavy snow and violent showers"""
+
+        await interaction.response.defer(ephemeral=True)
+
+        
+
+        try:
+
+            location = await self.geocode(city)
+
+        except (WeatherServiceError, CircuitOpenError, asyncio.TimeoutError, aiohttp.ClientError):
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} Couldn't look up that city right now. Please try again later.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        if location is None:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} City '{city}' not found. Please check the spelling and try again.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        label = location_label(location)
+
+        
+
+        count, existing = await self.bot.db.fetchone(
+
+            "SELECT COUNT(*), COALESCE(SUM(city = ?), 0) FROM weather_alerts WHERE channel_id = ?",
+
+            (label, interaction.channel_id)
+
+        )
+
+        if existing:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.INFO} This channel already gets severe-weather alerts for **{label}**.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        if count >= config.WeatherConfig.ALERT_MAX_CITIES:
+
+            await interaction.followup.send(
+
+                f"{config.Icons.NO} This channel already watches {config.WeatherConfig.ALERT_MAX_CITIES} cities. Remove one with /weather-alert-unsubscribe first.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        # Joining a cell that is already watched inherits its current condition
+
+        grid_key = snap_to_grid(location["latitude"], location["longitude"], config.WeatherConfig.GRID_RESOLUTION)
+
+        slot = self.watch_table.index.get(grid_key)
+
+        condition = self.watch_table.conditions[slot] if slot is not None else CALM
+
+        
+
+        row_id = await self.bot.db.insert(
+
+            "INSERT INTO weather_alerts (guild_id, channel_id, city, latitude, longitude, condition) VALUES (?, ?, ?, ?, ?, ?)",
+
+            (interaction.guild_id, interaction.channel_id, label, location["latitude"], location["longitude"], condition)
+
+        )
+
+        self.add_alert_watcher(row_id, interaction.channel_id, label, location["latitude"], location["longitude"], condition, time.monotonic())
+
+        
+
+        embed = discord.Embed(
+
+            title=f"{config.Icons.YES} Alerts Enabled",
+
+            description=f"{interaction.channel.mention} will be notified when thunderstorms, hail, heavy snow or violent showers start or end in **{label}**.",
+
+            color=config.Colors.SUCCESS
+
+        )
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    
+
+    @app_commands.command(name="weather-alert-unsubscribe", description="Stop severe-weather alerts for a city in this channel")
+
+    @app_commands.describe(city="Watched city to remove")
+
+    @app_commands.guild_only()
+
+    @app_commands.default_permissions(manage_guild=True)
+
+    async def weather_alert_unsubscribe(self, interaction: discord.Interaction, city: str):
+
+        """Remove a severe-weather alert subscription from the current channel"""
+
+        row = await self.bot.db.fetchone(
+
+            "SELECT id, latitude, longitude FROM weather_alerts WHERE channel_id = ? AND city = ?",
+
+            (interaction.channel_id, city)
+
+        )
+
+        
+
+        if row is None:
+
+            await interaction.response.send_message(
+
+                f"{config.Icons.NO} This channel has no severe-weather alerts for '{city}'.",
+
+                ephemeral=True
+
+            )
+
+            return
+
+        
+
+        await self.bot.db.execute("DELETE FROM weather_alerts WHERE id = ?", (row[0],))
+
+        self.remove_alert_watcher(*row)
+
+        
+
+        await interaction.response.send_message(
+
+            f"{config.Icons.YES} Severe-weather alerts for **{city}** removed from this channel.",
+
+            ephemeral=True
+
+        )
+
+    
+
+    @weather_alert_unsubscribe.autocomplete("city")
+
+    async def alert_autocomplete(self, interaction: discord.Interaction, current: str):
+
+        """Suggest the cities this channel watches for severe weather"""
+
+        rows = await self.bot.db.fetchall(
+
+            "SELECT city FROM weather_alerts WHERE channel_id = ? ORDER BY city",
+
+            (interaction.channel_id,)
+
+        )
+
+        current = normalize_name(current)
+
+        return [
+
+            app_commands.Choice(name=row[0][:100], value=row[0])
+
+            for row in rows if current in normalize_name(row[0])
+
+        ][:25]
+
+    
+
+    @weather_unsubscribe.autocomplete("city")
+
+    async def subscription_autocomplete(self, interaction: discord.Interaction, current: str):
+
+        """Suggest the cities this channel is subscribed to"""
+
+        rows = await self.bot.db.fetchall(
+
+            "SELECT city FROM weather_subscriptions WHERE channel_id = ? ORDER BY city",
+
+            (interaction.channel_id,)
+
+        )
+
+        current = normalize_name(current)
+
+        return [
+
+            app_commands.Choice(name=row[0][:100], value=row[0])
+
+            for row in rows if current in normalize_name(row[0])
+
+        ][:25]
+
+    
+
+    @weather.autocomplete("city")
+
+    async def city_autocomplete(self, interaction: discord.Interaction, current: str):
+
+        """Suggest cities from the bundled dataset without any network call"""
+
+        try:
+
+            cities = self.city_index.complete(current, limit=config.WeatherConfig.AUTOCOMPLETE_LIMIT)
+
+        except (OSError, ValueError):
+
+            # Dataset missing or corrupt; fall back to free text
+
+            return []
+
+        return [app_commands.Choice(name=city.label[:100], value=city.label[:100]) for city in cities]
+
+    
+
+    # Same suggestions when picking a city to subscribe to
+
+    weather_subscribe.autocomplete("city")(city_autocomplete)
+
+    weather_alert_subscribe.autocomplete("city")(city_autocomplete)
+
+    weather_history.autocomplete("city")(city_autocomplete)
 
 async def setup(bot):
 
@@ -34,6 +34,18 @@ class Roles:
 
     ALLOWED_USERS = [1295712187200835639]  # Add user IDs here
 
+    
+
+    # Per-server overrides: {guild_id: [role_id, ...]} replaces ALLOWED_ROLES in that server
+
+    GUILD_ROLES = {}
+
+    
+
+    # Seconds a member's role set is cached for permission checks (refreshed sooner when their roles change)
+
+    MEMBER_CACHE_TTL = 30
+
 # ==============================
 
 # EMOJI/ICON CONFIGURATION
@@ -172,6 +184,52 @@ class BotConfig:
 
 # ==============================
 
+# LOGGING CONFIGURATION
+
+# ==============================
+
+class LogConfig:
+
+    # Default level for all bot loggers (DEBUG, INFO, WARNING, ERROR)
+
+    LEVEL = "INFO"
+
+    
+
+    # Per-logger overrides: one per cog, plus "commands" for per-command records
+
+    LEVELS = {
+
+        "bot": "INFO",
+
+        "commands": "INFO",
+
+        "fact": "INFO",
+
+        "moderation": "INFO",
+
+        "weather": "INFO",
+
+    }
+
+    
+
+    # Human-readable output on the console
+
+    CONSOLE = True
+
+    
+
+    # JSON lines file, rotated by size (set FILE = None to disable)
+
+    FILE = "logs/endroid.jsonl"
+
+    FILE_MAX_BYTES = 10 * 1024 * 1024
+
+    FILE_BACKUPS = 5
+
+# ==============================
+
 # MESSAGE CONFIGURATION
 
 # ==============================
@@ -222,10 +280,40 @@ class CommandDefaults:
 
     CLEAR_MIN = 1
 
-    CLEAR_MAX = 100
+    CLEAR_MAX = 10000
 
     CLEAR_DEFAULT = 10
 
+    CLEAR_SCAN_MAX = 50000  # messages of history read before giving up on finding matches
+
+    CLEAR_OLD_DELETE_RATE = 2  # deletes per second for messages older than 14 days (no bulk delete)
+
+    CLEAR_PROGRESS_INTERVAL = 2.0  # seconds between progress updates
+
+    CLEAR_PATTERN_MAX_LENGTH = 100  # characters in a /clear matching pattern
+
+    CLEAR_PATTERN_TIMEOUT = 2.0  # seconds a pattern may take per 100 messages before the clear is stopped
+
+    
+
+    # Cross-channel purge (/purge-user), served from an in-memory index of recent messages
+
+    PURGE_USER_PER_USER = 200  # recent messages remembered per member per server
+
+    PURGE_USER_MAX_MESSAGES = 200000  # across everyone (16 bytes each); least recently active forgotten first
+
+    PURGE_USER_MAX_MINUTES = 1440  # how far back /purge-user can reach
+
+    PURGE_USER_WORKERS = 4  # channels purged at once
+
+    
+
+    # Moderation case journal (/case, /modlog)
+
+    CASE_FLUSH_INTERVAL = 2  # seconds between batched writes of new cases
+
+    MODLOG_LIMIT = 10  # cases listed by /modlog
+
     
 
     # Timeout command defaults
@@ -248,6 +336,20 @@ class CommandDefaults:
 
     
 
+    # Mass moderation (/massban, /masskick, /masstimeout)
+
+    MASS_MAX_TARGETS = 1000  # IDs per command
+
+    MASS_FILE_MAX_BYTES = 256 * 1024  # largest ID list attachment
+
+    MASS_BAN_CHUNK = 200  # users per bulk ban request (Discord's maximum)
+
+    MASS_WORKERS = 4  # kicks/timeouts in flight at once
+
+    MASS_PROGRESS_INTERVAL = 2.0  # seconds between progress updates
+
+    
+
     # Default reasons
 
     DEFAULT_REASON = "No reason provided"
@@ -262,4 +364,234 @@ class CommandDefaults:
 
     # Cooldown messages
 
-    COOLDOWN_MESSAGE = "Please wait {time} seconds before using this command again."
\ No newline at end of file
+    COOLDOWN_MESSAGE = "Please wait {time} seconds before using this command again."
+
+# ==============================
+
+# HTTP CLIENT CONFIGURATION
+
+# ==============================
+
+class HTTPConfig:
+
+    # Connection pool limits (shared by every cog)
+
+    POOL_LIMIT = 100
+
+    POOL_LIMIT_PER_HOST = 10
+
+    
+
+    # Seconds an idle connection is kept alive for reuse
+
+    KEEPALIVE_TIMEOUT = 30
+
+    
+
+    # Seconds resolved DNS entries are cached
+
+    DNS_CACHE_TTL = 300
+
+    
+
+    # Request timeouts (in seconds)
+
+    CONNECT_TIMEOUT = 5
+
+    READ_TIMEOUT = 10
+
+    TOTAL_TIMEOUT = 15
+
+    
+
+    # User agent sent to third-party APIs
+
+    USER_AGENT = "EndroidBot/1.0 (+https://github.com/wized2/Endroid-Bot)"
+
+# ==============================
+
+# WEATHER CONFIGURATION
+
+# ==============================
+
+class WeatherConfig:
+
+    # Geocoding cache (city name -> coordinates)
+
+    GEOCODE_CACHE_SIZE = 2048  # entries
+
+    GEOCODE_CACHE_TTL = 7 * 24 * 3600  # seconds (cities don't move)
+
+    GEOCODE_NEGATIVE_TTL = 3600  # seconds to remember "city not found"
+
+    
+
+    # Forecast cache (grid cell -> current conditions)
+
+    FORECAST_CACHE_SIZE = 1024  # entries
+
+    GRID_RESOLUTION = 0.1  # degrees, roughly the resolution of Open-Meteo's models
+
+    FORECAST_UPDATE_INTERVAL = 900  # seconds, Open-Meteo refreshes current data every 15 minutes
+
+    
+
+    # Offline city index used for autocomplete and local geocoding
+
+    # (rebuild with: python -m scripts.build_cities)
+
+    CITY_DATA_PATH = "data/cities.bin"
+
+    AUTOCOMPLETE_LIMIT = 25  # Discord allows at most 25 choices
+
+    
+
+    # Stale-while-revalidate: how long an expired forecast may still be served
+
+    STALE_TTL = 6 * 3600  # seconds
+
+    
+
+    # Circuit breaker for Open-Meteo
+
+    BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures before opening
+
+    BREAKER_RESET_TIMEOUT = 60  # seconds before probing again
+
+    BREAKER_HALF_OPEN_PROBES = 1  # probe requests allowed while half-open
+
+    
+
+    # /weather-compare
+
+    COMPARE_MAX_CITIES = 10
+
+    
+
+    # Air quality & UV (supplementary data on /weather)
+
+    AIR_QUALITY_UPDATE_INTERVAL = 3600  # seconds, the air-quality API is hourly
+
+    AIR_QUALITY_BUDGET = 1.0  # seconds (from the start of the lookup) before air quality is dropped from the embed
+
+    
+
+    # Daily forecast digests (/weather-subscribe)
+
+    DIGEST_TICK = 60  # seconds between scheduler wake-ups
+
+    DIGEST_BATCH_SIZE = 100  # locations per Open-Meteo request
+
+    DIGEST_MAX_CITIES = 25  # subscriptions per channel (one embed field each)
+
+    
+
+    # Severe-weather alerts (/weather-alert-subscribe)
+
+    # Poll times are jittered and each tick sends at most ALERT_MAX_BATCHES requests
+
+    # of DIGEST_BATCH_SIZE locations; 10,000 calm locations polled every
+
+    # ALERT_MAX_INTERVAL average under one request per tick, and locations that
+
+    # don't fit in a tick are polled on the next one
+
+    ALERT_TICK = 60  # seconds between watcher wake-ups
+
+    ALERT_MIN_INTERVAL = 900  # seconds between polls of a volatile location (Open-Meteo's update interval)
+
+    ALERT_MAX_INTERVAL = 3 * 3600  # seconds between polls of a calm location
+
+    ALERT_MAX_BATCHES = 3  # forecast requests per tick at most
+
+    ALERT_MAX_CITIES = 25  # watched cities per channel
+
+    
+
+    # Climate history (/weather-history)
+
+    CLIMATE_CACHE_DIR = "data/cache/climate"  # downloaded series, one .npz per archive grid cell
+
+    CLIMATE_START_DATE = "1950-01-01"  # first day downloaded from the archive
+
+    CLIMATE_GRID_RESOLUTION = 0.25  # degrees, the ERA5 reanalysis grid
+
+    CLIMATE_ARCHIVE_DELAY = 6  # days before a date is available in the archive
+
+    CLIMATE_REFRESH_DAYS = 30  # cached series are extended once they fall this far behind (days left blank are retried daily)
+
+    CLIMATE_MEMORY_CACHE_SIZE = 32  # series kept in memory
+
+    CLIMATE_REQUEST_TIMEOUT = 60  # seconds, the first download covers decades
+
+    
+
+    # Forecast charts (/weather chart option)
+
+    CHART_WORKERS = 2  # rendering processes
+
+    CHART_QUEUE_SIZE = 8  # renders queued or running before new charts are skipped
+
+    CHART_CACHE_SIZE = 256  # rendered PNGs kept in memory
+
+    CHART_RUN_INTERVAL = 3600  # seconds, hourly forecast data changes once per model run
+
+    CHART_BUDGET = 10.0  # seconds before the embed is sent without its chart
+
+# ==============================
+
+# FACT CONFIGURATION
+
+# ==============================
+
+class FactConfig:
+
+    # Languages offered by /fact (supported by uselessfacts.jsph.pl)
+
+    LANGUAGES = ("en", "de")
+
+    
+
+    # Prefetched facts kept per language
+
+    BUFFER_SIZE = 20
+
+    LOW_WATER_MARK = 5  # refill once this few are left
+
+    REFILL_CONCURRENCY = 2  # upstream requests in flight while refilling
+
+    
+
+    # No-repeat guarantee: a channel never sees the same fact twice within this many facts
+
+    NO_REPEAT_WINDOW = 500
+
+    SEEN_ERROR_RATE = 0.01  # chance an unseen fact is skipped as seen (per filter generation)
+
+    SEEN_FLUSH_INTERVAL = 60  # seconds between saving seen-fact filters
+
+    LIVE_ATTEMPTS = 3  # live fetches before giving up on finding an unseen fact
+
+    
+
+    # Fact of the day (/fact-daily): one upstream fetch per language per day, fanned out to every subscribed guild
+
+    DAILY_HOUR = 9  # UTC hour the broadcast starts
+
+    DAILY_TICK = 60  # seconds between scheduler wake-ups
+
+    DAILY_WORKERS = 8  # posts in flight at once
+
+    DAILY_RATE = 20  # posts per second, well under Discord's global limit of 50 requests per second
+
+# ==============================
+
+# DATABASE CONFIGURATION
+
+# ==============================
+
+class DatabaseConfig:
+
+    # SQLite file holding subscriptions and other persistent state
+
+    PATH = "data/endroid.db"
\ No newline at end of file
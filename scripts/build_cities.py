@@ -0,0 +1,55 @@
+"""Compact the city dataset into the binary index used by /weather.
+
+The source is a tab separated file with a header row and the columns
+name, admin1, country, latitude, longitude, elevation, population
+(a GeoNames cities export reduced to those columns works as-is).
+
+Run from the repository root:
+    python -m scripts.build_cities [source.tsv] [output.bin]
+"""
+import csv
+import sys
+
+from utils.cities import City, CityIndex, pack_index
+
+DEFAULT_SOURCE = "data/cities.tsv"
+DEFAULT_OUTPUT = "data/cities.bin"
+
+
+def read_source(path: str) -> list:
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE)
+        return [
+            City(
+                row["name"],
+                row["admin1"],
+                row["country"],
+                float(row["latitude"]),
+                float(row["longitude"]),
+                float(row["elevation"] or 0),
+                int(row["population"] or 0),
+            )
+            for row in reader
+        ]
+
+
+def main(source: str, output: str):
+    cities = read_source(source)
+    data = pack_index(cities)
+    with open(output, "wb") as f:
+        f.write(data)
+
+    # Sanity check: every city can be found again by name
+    index = CityIndex(output)
+    missing = [city.name for city in cities if index.lookup(f"{city.name}, {city.country}") is None]
+    if missing:
+        raise SystemExit(f"Index is missing {len(missing)} cities: {missing[:10]}")
+
+    print(f"Wrote {len(cities)} cities to {output} ({len(data):,} bytes)")
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE,
+        sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUTPUT,
+    )
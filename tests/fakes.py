@@ -0,0 +1,102 @@
+"""Minimal stand-ins for discord.py objects, shared by the cog tests"""
+import types
+
+import discord
+
+from cogs.moderation import Moderation
+from utils.permissions import PermissionEngine
+
+
+def http_error(cls=discord.HTTPException, status=400, text="error"):
+    return cls(types.SimpleNamespace(status=status, reason=text), text)
+
+
+class FakeMember(discord.Member):
+    """A discord.Member as sent with an interaction, without the gateway state"""
+
+    id = None
+    roles = None
+
+    def __init__(self, user_id, role_ids=()):
+        self.id = user_id
+        self.roles = [types.SimpleNamespace(id=role_id) for role_id in role_ids]
+
+
+class FakeMessage:
+    """A followup message; edits start failing after ``expires_after`` edits (an expired token)"""
+
+    def __init__(self, events, expires_after=None):
+        self.events = events
+        self.edits = 0
+        self.expires_after = expires_after
+
+    async def edit(self, embed=None, attachments=None):
+        self.edits += 1
+        if self.expires_after is not None and self.edits > self.expires_after:
+            raise http_error(status=401, text="Invalid Webhook Token")
+        self.events.append(("edit", embed.title))
+
+
+class FakeChannel:
+    def __init__(self, events, channel_id=10):
+        self.id = channel_id
+        self.mention = f"<#{channel_id}>"
+        self.events = events
+
+    async def send(self, embed=None, files=None):
+        self.events.append(("channel", embed.title))
+
+
+class FakeUser:
+    def __init__(self, events, user_id=99):
+        self.id = user_id
+        self.name = "mod"
+        self.mention = f"<@{user_id}>"
+        self.events = events
+
+    async def send(self, embed=None, files=None):
+        self.events.append(("dm", embed.title))
+
+
+class FakeInteraction:
+    """Records what was sent and whether it was public"""
+
+    def __init__(self, guild, command="command", expires_after=None):
+        self.guild = guild
+        self.guild_id = guild.id
+        self.command = types.SimpleNamespace(name=command)
+        self.events = []
+        self.user = FakeUser(self.events)
+        self.channel = FakeChannel(self.events)
+        self.channel_id = self.channel.id
+        self.expires_after = expires_after
+        self.deferred = False
+        self.response = types.SimpleNamespace(
+            defer=self._defer,
+            send_message=self._send_message,
+            is_done=lambda: self.deferred
+        )
+        self.followup = types.SimpleNamespace(send=self._followup)
+
+    async def _defer(self, thinking=False, ephemeral=False):
+        self.deferred = True
+        self.events.append(("defer",))
+
+    async def _send_message(self, embed=None, ephemeral=False):
+        self.deferred = True
+        self.events.append(("send", embed.title, ephemeral))
+
+    async def _followup(self, embed=None, ephemeral=False, wait=False, **kwargs):
+        self.events.append(("followup", embed.title, ephemeral))
+        return FakeMessage(self.events, self.expires_after)
+
+    async def delete_original_response(self):
+        self.events.append(("delete_original",))
+
+
+def make_moderation(user_id=1):
+    """A Moderation cog that allows everyone, with an in-memory case journal"""
+    bot = types.SimpleNamespace(db=None, permissions=PermissionEngine([], []), user=types.SimpleNamespace(id=user_id))
+    cog = Moderation(bot)
+    cog.cases.next_id = 1
+    return cog
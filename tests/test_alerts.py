@@ -0,0 +1,92 @@
+"""Tests for the severe-weather WatchTable"""
+import random
+
+from utils.alerts import CALM, HAIL, THUNDERSTORM, WatchTable
+
+MIN, MAX = 900, 8 * 900
+
+
+def make_table(jitter=0.0):
+    return WatchTable(MIN, MAX, jitter=jitter, rng=random.Random(1))
+
+
+def test_first_polls_are_spread_over_the_min_interval():
+    table = make_table()
+    for i in range(1000):
+        table.add((i, 0.0), now=100.0)
+
+    polls = list(table.next_poll)
+    assert all(100.0 <= when <= 100.0 + MIN for when in polls)
+    # Spread out, not all on one tick
+    assert len({int(when // 60) for when in polls}) >= MIN // 60
+
+
+def test_add_is_idempotent_and_remove_moves_the_last_slot():
+    table = make_table()
+    first = table.add((1.0, 1.0))
+    table.add((2.0, 2.0), condition=HAIL)
+    assert table.add((1.0, 1.0)) == first
+    assert len(table) == 2
+
+    table.remove((1.0, 1.0))
+
+    assert len(table) == 1
+    assert (1.0, 1.0) not in table
+    assert table.index[(2.0, 2.0)] == 0
+    assert table.conditions[0] == HAIL
+    table.remove((9.0, 9.0))  # unknown keys are ignored
+
+
+def test_calm_polls_back_off_and_changes_reset_the_interval():
+    table = make_table()
+    slot = table.add((1.0, 1.0))
+
+    assert not table.update(slot, 0, now=0)
+    assert table.next_poll[slot] == 2 * MIN
+    for _ in range(5):
+        table.update(slot, 0, now=0)
+    assert table.intervals[slot] == MAX
+
+    assert table.update(slot, 95, now=0)  # thunderstorm starts
+    assert table.conditions[slot] == THUNDERSTORM
+    assert table.next_poll[slot] == MIN
+
+    assert table.update(slot, 0, now=0)  # all clear
+    assert table.conditions[slot] == CALM
+
+
+def test_unsettled_weather_keeps_the_short_interval():
+    table = make_table()
+    slot = table.add((1.0, 1.0))
+    table.update(slot, 61, now=0)  # rain
+    assert table.intervals[slot] == MIN
+
+
+def test_jitter_only_brings_polls_forward():
+    table = make_table(jitter=0.25)
+    slots = [table.add((i, 0.0)) for i in range(200)]
+    for slot in slots:
+        table.update(slot, 0, now=0)
+
+    polls = [table.next_poll[slot] for slot in slots]
+    assert all(0.75 * 2 * MIN <= when <= 2 * MIN for when in polls)
+    assert len(set(polls)) == len(polls)
+
+
+def test_due_is_oldest_first_and_limited():
+    table = make_table()
+    for i in range(10):
+        slot = table.add((i, 0.0))
+        table.next_poll[slot] = 100 - i
+
+    assert table.due(50) == []
+    assert table.due(100, limit=3) == [9, 8, 7]
+    assert len(table.due(100)) == 10
+
+
+def test_postpone_keeps_the_state():
+    table = make_table()
+    slot = table.add((1.0, 1.0), condition=HAIL)
+    table.postpone(slot, now=10)
+    assert table.next_poll[slot] == 10 + MIN
+    assert table.conditions[slot] == HAIL
@@ -0,0 +1,129 @@
+"""Tests for CircuitBreaker and the stale entries TTLCache serves while refreshing"""
+import asyncio
+
+import pytest
+
+from utils.breaker import CircuitBreaker, CircuitOpenError
+from utils.cache import MISSING, TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise ConnectionError("upstream down")
+
+
+def make_breaker(clock, **kwargs):
+    return CircuitBreaker("test", failure_threshold=2, reset_timeout=30, clock=clock, **kwargs)
+
+
+def call(breaker, func):
+    return asyncio.run(breaker.call(func))
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            call(breaker, fail)
+
+
+def test_opens_after_consecutive_failures_and_fails_fast():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert call(breaker, ok) == "ok"  # a success resets the count
+    trip(breaker)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        call(breaker, ok)
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+
+    clock.now = 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)  # a failed probe opens it again straight away
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["times_opened"] == 2
+
+    clock.now = 60
+    assert call(breaker, ok) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_admits_limited_probes():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now = 30
+
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_cancelled_probe_gives_its_slot_back():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now = 30
+
+    async def cancelled_probe():
+        task = asyncio.ensure_future(breaker.call(asyncio.sleep, 10))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled_probe())
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert call(breaker, ok) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stale_entries_are_served_until_the_stale_ttl_runs_out():
+    clock = Clock()
+    cache = TTLCache(maxsize=10, ttl=60, stale_ttl=300, clock=clock)
+    cache.set("key", None)  # negative results are values too
+
+    assert cache.get("key") is None
+    clock.now = 60
+    assert cache.get("key") is MISSING
+    assert cache.get_stale("key") is None  # kept for the refresh
+
+    clock.now = 359
+    assert cache.get_stale("key", "gone") is None
+    clock.now = 360
+    assert cache.get_stale("key", "gone") == "gone"
+    assert cache.get("key") is MISSING and len(cache) == 0
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_without_stale_ttl_expired_entries_are_dropped():
+    clock = Clock()
+    cache = TTLCache(maxsize=2, ttl=60, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=120)
+    clock.now = 60
+
+    assert cache.get_stale("a") is MISSING
+    assert cache.get("a") is MISSING and len(cache) == 1
+    assert cache.get("b") == 2
@@ -0,0 +1,87 @@
+"""Tests for the write-behind moderation case journal"""
+import asyncio
+
+import pytest
+
+from utils.cases import CaseJournal
+from utils.database import Database
+
+GUILD, OTHER_GUILD = 1, 2
+MODERATOR, TARGET = 10, 20
+
+
+def with_journal(tmp_path, test):
+    async def main():
+        db = Database(str(tmp_path / "bot.db"))
+        await db.connect()
+        try:
+            journal = CaseJournal(db)
+            await journal.start()
+            return await test(journal, db)
+        finally:
+            await db.close()
+
+    return asyncio.run(main())
+
+
+def test_cases_are_readable_before_and_after_a_flush(tmp_path):
+    async def test(journal, db):
+        first = journal.record(GUILD, "kick", TARGET, MODERATOR, "spam")
+        second = journal.record(GUILD, "ban", TARGET, MODERATOR)
+        other = journal.record(OTHER_GUILD, "kick", TARGET, MODERATOR)
+        assert (first, second, other) == (1, 2, 3)
+        assert (await db.fetchone("SELECT COUNT(*) FROM mod_cases")) == (0,)
+
+        assert (await journal.get(GUILD, first))["reason"] == "spam"
+        assert await journal.get(GUILD, other) is None  # another server's case
+        total, cases = await journal.history(GUILD, TARGET)
+        assert total == 2 and [case["id"] for case in cases] == [2, 1]
+
+        assert await journal.flush() == 3
+        assert await journal.flush() == 0
+        assert (await db.fetchone("SELECT COUNT(*) FROM mod_cases")) == (3,)
+
+        journal.record(GUILD, "timeout", TARGET, MODERATOR)
+        assert (await journal.get(GUILD, first))["action"] == "kick"
+        total, cases = await journal.history(GUILD, TARGET, limit=2)
+        assert total == 3 and [case["id"] for case in cases] == [4, 2]
+        total, cases = await journal.history(GUILD, MODERATOR, by_moderator=True)
+        assert total == 3
+
+    with_journal(tmp_path, test)
+
+
+def test_numbering_continues_after_a_restart(tmp_path):
+    async def first_run(journal, db):
+        journal.record(GUILD, "kick", TARGET, MODERATOR)
+        journal.record(GUILD, "kick", TARGET, MODERATOR)
+        await journal.flush()
+
+    async def second_run(journal, db):
+        return journal.record(GUILD, "ban", TARGET, MODERATOR)
+
+    with_journal(tmp_path, first_run)
+    assert with_journal(tmp_path, second_run) == 3
+
+
+def test_failed_flush_keeps_the_batch_ahead_of_newer_cases(tmp_path):
+    async def test(journal, db):
+        journal.record(GUILD, "kick", TARGET, MODERATOR)
+        journal.record(GUILD, "ban", TARGET, MODERATOR)
+        executemany = db.executemany
+
+        async def failing(sql, rows):
+            journal.record(GUILD, "unban", TARGET, MODERATOR)  # queued while the write is in flight
+            raise OSError("disk full")
+
+        db.executemany = failing
+        with pytest.raises(OSError):
+            await journal.flush()
+        assert [case[0] for case in journal.pending] == [1, 2, 3]
+
+        db.executemany = executemany
+        assert await journal.flush() == 3
+        rows = await db.fetchall("SELECT id, action FROM mod_cases ORDER BY id")
+        assert rows == [(1, "kick"), (2, "ban"), (3, "unban")]
+
+    with_journal(tmp_path, test)
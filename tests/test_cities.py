@@ -0,0 +1,65 @@
+"""Tests for the offline city index"""
+import pytest
+
+from utils.cities import City, CityIndex, normalize_name, pack_index
+
+CITIES = [
+    City("Paris", "Île-de-France", "France", 48.8534, 2.3488, 42, 2138551),
+    City("Paris", "Texas", "United States", 33.6609, -95.5555, 182, 24171),
+    City("Parma", "Emilia-Romagna", "Italy", 44.8015, 10.3279, 55, 146299),
+    City("São Paulo", "São Paulo", "Brazil", -23.5475, -46.6361, 769, 10021295),
+    City("Paraná", "Entre Rios", "Argentina", -31.7319, -60.5238, 78, 262295),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "cities.bin"
+    path.write_bytes(pack_index(CITIES))
+    return CityIndex(str(path))
+
+
+def test_normalize_name_strips_accents_case_and_spacing():
+    assert normalize_name("  São   PAULO ") == "sao paulo"
+
+
+def test_complete_matches_prefixes_most_populous_first(index):
+    assert [city.label for city in index.complete("par")] == [
+        "Paris, Île-de-France, France",
+        "Paraná, Entre Rios, Argentina",
+        "Parma, Emilia-Romagna, Italy",
+        "Paris, Texas, United States",
+    ]
+    assert [city.name for city in index.complete("PAR", limit=2)] == ["Paris", "Paraná"]
+    assert [city.name for city in index.complete("sao p")] == ["São Paulo"]
+    assert index.complete("zurich") == []
+    assert len(index) == len(CITIES)
+
+
+def test_lookup_is_exact_and_honours_qualifiers(index):
+    assert index.lookup("paris").country == "France"
+    assert index.lookup("Paris, Texas").country == "United States"
+    assert index.lookup("paris, united states").admin1 == "Texas"
+    assert index.lookup("Paris, Italy") is None
+    assert index.lookup("Par") is None  # prefixes only autocomplete
+
+
+def test_lookup_round_trips_the_record(index):
+    location = index.lookup("sao paulo").to_location()
+    assert location == {
+        "name": "São Paulo",
+        "country": "Brazil",
+        "admin1": "São Paulo",
+        "latitude": -23.5475,
+        "longitude": -46.6361,
+        "elevation": 769,
+        "population": 10021295,
+    }
+    assert index.lookup("São Paulo").label == "São Paulo, Brazil"
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "cities.bin"
+    path.write_bytes(b"not an index at all")
+    with pytest.raises(ValueError):
+        len(CityIndex(str(path)))
@@ -0,0 +1,51 @@
+"""Tests for /clear's reporting once the interaction token has expired"""
+import asyncio
+import types
+
+import config
+from tests.fakes import FakeInteraction, make_moderation
+from tests.test_purge import FakeChannel
+
+
+class ClearChannel(FakeChannel):
+    mention = "<#10>"
+
+    def __init__(self, events, count, **kwargs):
+        super().__init__(count, **kwargs)
+        self.id = 10
+        self.events = events
+
+    async def send(self, embed=None, files=None):
+        self.events.append(("channel", embed.title))
+
+
+def clear(amount, count, expires_after, content="hello", **filters):
+    guild = types.SimpleNamespace(id=1, me=types.SimpleNamespace(
+        guild_permissions=types.SimpleNamespace(manage_messages=True)
+    ))
+    interaction = FakeInteraction(guild, command="clear", expires_after=expires_after)
+    interaction.channel = ClearChannel(interaction.events, count)
+    for message in interaction.channel.messages:
+        message.content = content
+    cog = make_moderation()
+    asyncio.run(cog.clear.callback(cog, interaction, amount, **filters))
+    return cog, interaction
+
+
+def test_expired_report_goes_to_the_moderator_not_the_channel():
+    cog, interaction = clear(50, 200, expires_after=0)
+
+    assert sum(map(len, interaction.channel.bulk_deletes)) == 50
+    kind, title = interaction.events[-1]
+    assert kind == "dm" and "Messages Cleared" in title
+    assert not any(event[0] == "channel" for event in interaction.events)
+    assert cog.cases.pending[0][2] == "clear"
+
+
+def test_slow_pattern_is_reported_privately(monkeypatch):
+    monkeypatch.setattr(config.CommandDefaults, "CLEAR_PATTERN_TIMEOUT", 0.3)
+    cog, interaction = clear(50, 20, expires_after=0, content="h" * 40 + "!", matching="(h+)+$")
+
+    kind, title = interaction.events[-1]
+    assert kind == "dm" and "Pattern Too Slow" in title
+    assert interaction.channel.bulk_deletes == []
@@ -0,0 +1,123 @@
+"""Tests for the climate series and the on-disk climate cache"""
+import asyncio
+import datetime
+import types
+
+import numpy as np
+
+import config
+from cogs.weather import Weather
+from utils.climate import ClimateSeries, day_statistics, percentile_rank
+
+DAY = datetime.timedelta(days=1)
+
+
+def series_of(start, tmax, tmin=None):
+    tmax = np.array(tmax, dtype=np.float32)
+    tmin = np.array(tmin if tmin is not None else tmax - 10, dtype=np.float32)
+    return ClimateSeries(start, tmax, tmin)
+
+
+def test_percentile_rank_counts_ties_half_and_skips_missing():
+    values = np.array([1.0, 2.0, 2.0, 3.0, np.nan], dtype=np.float32)
+    assert percentile_rank(values, 2.0) == 50.0
+    assert percentile_rank(values, 4.0) == 100.0
+    assert np.isnan(percentile_rank(np.array([np.nan]), 1.0))
+
+
+def test_day_statistics_compares_the_same_day_in_other_years():
+    start = datetime.date(2000, 1, 1)
+    days = (datetime.date(2004, 12, 31) - start).days + 1
+    tmax = np.full(days, 0.0)
+    for year, value in ((2000, 20.0), (2001, 25.0), (2002, 15.0), (2003, np.nan), (2004, 99.0)):
+        tmax[(datetime.date(year, 7, 1) - start).days] = value
+    series = series_of(start, tmax)
+
+    stats = day_statistics(series, datetime.date(2004, 7, 1), high=22.0, low=5.0)
+
+    assert stats["years"] == 3  # this year and the missing one are left out
+    assert stats["first_year"] == 2000
+    assert stats["record_high"] == 25.0 and stats["record_high_year"] == 2001
+    assert stats["record_low"] == 5.0 and stats["record_low_year"] == 2002
+    assert stats["normal_high"] == 20.0
+    assert round(stats["high_percentile"], 3) == round(200 / 3, 3)
+    # 29 February only has the other leap year to compare with
+    assert day_statistics(series, datetime.date(2004, 2, 29), 0.0, 0.0)["years"] == 1
+
+
+def test_save_and_load_round_trip_missing_days(tmp_path):
+    series = series_of(datetime.date(2020, 2, 28), [12.34, np.nan, -5.0])
+    path = str(tmp_path / "cell.npz")
+    series.save(path)
+
+    loaded = ClimateSeries.load(path)
+
+    assert loaded.start == series.start and loaded.end == datetime.date(2020, 3, 1)
+    assert loaded.value_on(datetime.date(2020, 2, 28)) == (np.float32(12.3), np.float32(2.3))
+    assert all(np.isnan(loaded.value_on(datetime.date(2020, 2, 29))))
+
+
+def test_complete_through_ignores_a_blank_tail_but_not_gaps():
+    start = datetime.date(2024, 1, 1)
+    series = series_of(start, [1.0, np.nan, 3.0, np.nan, np.nan])
+    assert series.complete_through() == start + 2 * DAY
+    assert series_of(start, [np.nan]).complete_through() == start - DAY
+
+    truncated = series.truncate(series.complete_through())
+    assert len(truncated) == 3
+    assert len(series.truncate(start - DAY)) == 0
+
+
+class FakeArchive:
+    """Serves every requested day, with the last ``blank`` days not archived yet"""
+
+    def __init__(self, blank=0):
+        self.blank = blank
+        self.requests = []
+
+    async def fetch(self, grid_key, start, end):
+        self.requests.append((start, end))
+        days = (end - start).days + 1
+        tmax = np.arange(days, dtype=np.float32)
+        if self.blank:
+            tmax[-self.blank:] = np.nan
+        return series_of(start, tmax)
+
+
+def load_climate(tmp_path, monkeypatch, archive, today):
+    monkeypatch.setattr(config.WeatherConfig, "CLIMATE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(config.WeatherConfig, "CLIMATE_START_DATE", "2024-01-01")
+
+    class Clock(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.datetime.combine(today, datetime.time(12), tz)
+
+    monkeypatch.setattr("cogs.weather.datetime", Clock)
+    cog = Weather(types.SimpleNamespace())
+    cog._fetch_archive_upstream = archive.fetch
+    return asyncio.run(cog._load_climate((1.0, 2.0)))
+
+
+def test_blank_tail_is_fetched_again_once_a_newer_day_is_archived(tmp_path, monkeypatch):
+    delay = datetime.timedelta(days=config.WeatherConfig.CLIMATE_ARCHIVE_DELAY)
+    today = datetime.date(2024, 3, 1)
+    archive = FakeArchive(blank=2)
+    first = load_climate(tmp_path, monkeypatch, archive, today)
+    assert first.end == today - delay
+    assert first.complete_through() == first.end - 2 * DAY
+
+    # Same day: the file is used as is
+    load_climate(tmp_path, monkeypatch, archive, today)
+    assert len(archive.requests) == 1
+
+    # A day later the blank days are requested again and replace the stored ones
+    archive.blank = 0
+    second = load_climate(tmp_path, monkeypatch, archive, today + DAY)
+    assert archive.requests[-1] == (first.end - DAY, today + DAY - delay)
+    assert second.complete_through() == second.end == today + DAY - delay
+    assert np.array_equal(second.tmax[:len(first) - 2], first.tmax[:-2])
+
+    # Complete files are only extended every CLIMATE_REFRESH_DAYS
+    load_climate(tmp_path, monkeypatch, archive, today + 2 * DAY)
+    assert len(archive.requests) == 2
@@ -0,0 +1,86 @@
+"""Tests for /massban, /masskick and /masstimeout: acknowledgement order, reports and cases"""
+import asyncio
+import types
+
+from tests.fakes import FakeInteraction, http_error, make_moderation
+
+BASE = 10**17
+
+
+class FakeMember:
+    def __init__(self, guild, user_id):
+        self.guild = guild
+        self.id = user_id
+        self.top_role = 1
+
+    async def kick(self, reason=None):
+        if self.id % 7 == 0:
+            raise http_error(status=403, text="Missing Permissions")
+        self.guild.kicked.append(self.id)
+
+
+class FakeGuild:
+    id = 1
+    owner_id = BASE + 999
+    owner = None
+
+    def __init__(self, count):
+        self.me = types.SimpleNamespace(guild_permissions=types.SimpleNamespace(kick_members=True), top_role=50)
+        self.members = {BASE + i: FakeMember(self, BASE + i) for i in range(count)}
+        self.kicked = []
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+
+class FakeAttachment:
+    size = 100
+
+    def __init__(self, events, ids):
+        self.events = events
+        self.ids = ids
+
+    async def read(self):
+        self.events.append(("read",))
+        return "\n".join(str(user_id) for user_id in self.ids).encode()
+
+
+def masskick(guild, ids=None, file=None, interaction=None):
+    cog = make_moderation()
+    interaction = interaction or FakeInteraction(guild, command="masskick")
+    interaction.user.top_role = 10
+    if file is not None:
+        file = FakeAttachment(interaction.events, file)
+    asyncio.run(cog.masskick.callback(cog, interaction, ids, file, None))
+    return cog, interaction
+
+
+def test_attachment_is_read_after_deferring():
+    guild = FakeGuild(20)
+    cog, interaction = masskick(guild, file=list(guild.members))
+
+    assert interaction.events[:2] == [("defer",), ("read",)]
+    assert sorted(guild.kicked) == [user_id for user_id in guild.members if user_id % 7]
+
+
+def test_invalid_input_after_deferring_stays_private():
+    guild = FakeGuild(5)
+    cog, interaction = masskick(guild, ids="no ids here")
+
+    assert interaction.events[0] == ("defer",)
+    assert interaction.events[1] == ("delete_original",)
+    kind, title, ephemeral = interaction.events[2]
+    assert kind == "followup" and "Invalid Input" in title and ephemeral
+    assert guild.kicked == []
+
+
+def test_expired_token_still_reports_and_records_cases():
+    guild = FakeGuild(60)
+    interaction = FakeInteraction(guild, command="masskick", expires_after=0)
+    cog, interaction = masskick(guild, ids=" ".join(map(str, guild.members)), interaction=interaction)
+
+    kind, title = interaction.events[-1]
+    assert kind == "channel" and "Complete" in title
+    recorded = sorted(case[3] for case in cog.cases.pending)
+    assert recorded == sorted(guild.kicked)
+    assert all(case[2] == "kick" for case in cog.cases.pending)
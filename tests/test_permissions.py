@@ -0,0 +1,84 @@
+"""Tests for PermissionEngine: where role IDs come from and what is allowed"""
+import types
+
+from tests.fakes import FakeMember
+from utils.permissions import PermissionEngine
+
+MOD, ADMIN, OTHER = 11, 12, 13
+
+
+class FakeGuild:
+    def __init__(self, guild_id=1, members=()):
+        self.id = guild_id
+        self.members = {member.id: member for member in members}
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    async def fetch_member(self, user_id):
+        raise AssertionError("permission check made a REST call")
+
+
+def interaction(user, guild=None):
+    return types.SimpleNamespace(user=user, guild=guild, guild_id=guild.id if guild else None)
+
+
+def user(user_id):
+    return types.SimpleNamespace(id=user_id)
+
+
+def test_member_roles_from_the_interaction():
+    engine = PermissionEngine([MOD], [])
+    guild = FakeGuild()
+
+    assert engine.is_allowed(interaction(FakeMember(1, [OTHER, MOD]), guild))
+    assert not engine.is_allowed(interaction(FakeMember(2, [OTHER]), guild))
+
+
+def test_removed_role_stops_counting_despite_the_cache():
+    engine = PermissionEngine([MOD], [], member_ttl=3600)
+    guild = FakeGuild()
+    engine.member_roles.set((guild.id, 1), frozenset([MOD]))  # stale: the role has since been removed
+
+    assert not engine.is_allowed(interaction(FakeMember(1, [OTHER]), guild))
+
+
+def test_plain_user_uses_the_member_cache_until_forgotten():
+    engine = PermissionEngine([MOD], [], member_ttl=3600)
+    member = FakeMember(1, [MOD])
+    guild = FakeGuild(members=[member])
+
+    assert engine.is_allowed(interaction(user(1), guild))
+    member.roles = []
+    assert engine.is_allowed(interaction(user(1), guild))  # cached
+    engine.forget(guild.id, 1)
+    assert not engine.is_allowed(interaction(user(1), guild))
+
+
+def test_unknown_plain_user_is_denied_without_a_fetch():
+    engine = PermissionEngine([MOD], [])
+    assert not engine.is_allowed(interaction(user(1), FakeGuild()))
+
+
+def test_allowed_users_pass_everywhere():
+    engine = PermissionEngine([MOD], [7])
+    assert engine.is_allowed(interaction(user(7)))
+    assert engine.is_allowed(interaction(FakeMember(7), FakeGuild()))
+
+
+def test_empty_role_list_allows_everyone_including_dms():
+    engine = PermissionEngine([], [])
+    assert engine.is_allowed(interaction(user(1)))
+    assert engine.is_allowed(interaction(FakeMember(1), FakeGuild()))
+
+    assert not PermissionEngine([MOD], []).is_allowed(interaction(user(1)))
+
+
+def test_guild_override_replaces_the_global_roles():
+    engine = PermissionEngine([MOD], [], guild_roles={2: [ADMIN]})
+    moderator = FakeMember(1, [MOD])
+    admin = FakeMember(2, [ADMIN])
+
+    assert engine.is_allowed(interaction(moderator, FakeGuild(1)))
+    assert not engine.is_allowed(interaction(moderator, FakeGuild(2)))
+    assert engine.is_allowed(interaction(admin, FakeGuild(2)))
@@ -0,0 +1,158 @@
+"""Tests for utils.purge against a fake channel with discord.py's history ordering.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import asyncio
+import types
+from datetime import timedelta
+
+import discord
+
+from utils import purge as purge_module
+from utils.pattern import PatternTimeout
+from utils.purge import Purge, PurgeFilter
+
+NOW = discord.utils.utcnow()
+
+
+def http_error(status):
+    return discord.HTTPException(types.SimpleNamespace(status=status, reason="error"), "error")
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id, age):
+        self.channel = channel
+        self.id = message_id
+        self.created_at = NOW - age
+        self.author = types.SimpleNamespace(id=1, bot=False)
+        self.content = "hello"
+        self.attachments = []
+
+    async def delete(self):
+        self.channel.single_deletes.append(self.id)
+
+
+class FakeChannel:
+    """Messages ``minutes_apart`` apart; id 0 is the newest"""
+
+    def __init__(self, count, minutes_apart=1, bulk_error=None):
+        self.messages = [FakeMessage(self, i, timedelta(minutes=i * minutes_apart)) for i in range(count)]
+        self.bulk_deletes = []
+        self.single_deletes = []
+        self.bulk_error = bulk_error
+
+    async def history(self, limit=100, before=None, after=None, oldest_first=None):
+        # discord.py: oldest_first defaults to True when ``after`` is given
+        reverse = after is not None if oldest_first is None else oldest_first
+        messages = [m for m in self.messages
+                    if (before is None or m.created_at < before) and (after is None or m.created_at > after)]
+        for message in (messages[::-1] if reverse else messages)[:limit]:
+            yield message
+
+    async def delete_messages(self, messages):
+        if self.bulk_error is not None:
+            raise self.bulk_error
+        self.bulk_deletes.append([m.id for m in messages])
+
+
+def run(purge):
+    return asyncio.run(purge.run())
+
+
+def test_after_deletes_newest_first():
+    channel = FakeChannel(300)
+    purge = Purge(channel, PurgeFilter(), limit=50, scan_limit=1000, after=NOW - timedelta(hours=4))
+
+    assert run(purge) == 50
+    assert sorted(sum(channel.bulk_deletes, [])) == list(range(50))
+
+
+def test_old_messages_are_deleted_one_by_one():
+    channel = FakeChannel(20, minutes_apart=60 * 24)
+    purge = Purge(channel, PurgeFilter(), limit=20, scan_limit=1000, old_rate=1000)
+
+    assert run(purge) == 20
+    assert sum(channel.bulk_deletes, []) == list(range(14))
+    assert channel.single_deletes == list(range(14, 20))
+
+
+def test_bulk_rejection_falls_back_to_single_deletes():
+    channel = FakeChannel(30, bulk_error=http_error(400))
+    purge = Purge(channel, PurgeFilter(), limit=30, scan_limit=1000, old_rate=1000)
+
+    assert run(purge) == 30
+    assert channel.single_deletes == list(range(30))
+
+
+def test_batch_that_aged_out_while_queued_is_not_bulk_deleted(monkeypatch):
+    channel = FakeChannel(10)
+    cutoffs = iter([NOW - timedelta(days=1)] * 10 + [NOW])
+    monkeypatch.setattr(purge_module, "bulk_cutoff", lambda: next(cutoffs))
+    purge = Purge(channel, PurgeFilter(), limit=10, scan_limit=1000, old_rate=1000)
+
+    assert run(purge) == 10
+    assert channel.bulk_deletes == []
+    assert channel.single_deletes == list(range(10))
+
+
+def test_forbidden_bulk_delete_propagates():
+    channel = FakeChannel(5, bulk_error=discord.Forbidden(types.SimpleNamespace(status=403, reason="error"), "error"))
+    purge = Purge(channel, PurgeFilter(), limit=5, scan_limit=1000)
+
+    try:
+        run(purge)
+    except discord.Forbidden:
+        pass
+    else:
+        raise AssertionError("Forbidden was swallowed")
+    assert channel.single_deletes == []
+
+
+def test_pattern_is_matched_in_the_worker():
+    channel = FakeChannel(250)
+    for message in channel.messages:
+        message.content = f"message {message.id}"
+    purge = Purge(channel, PurgeFilter(pattern=r"MESSAGE \d*7$"), limit=1000, scan_limit=1000)
+
+    assert run(purge) == 25
+    assert sorted(sum(channel.bulk_deletes, [])) == [i for i in range(250) if i % 10 == 7]
+
+
+def test_pattern_limit_stops_inside_a_page():
+    channel = FakeChannel(250)
+    purge = Purge(channel, PurgeFilter(pattern="hello"), limit=30, scan_limit=1000)
+
+    assert run(purge) == 30
+    assert sum(channel.bulk_deletes, []) == list(range(30))
+
+
+def test_slow_pattern_times_out_without_blocking_the_loop():
+    channel = FakeChannel(5)
+    for message in channel.messages:
+        message.content = "a" * 40 + "!"
+    purge = Purge(channel, PurgeFilter(pattern="(a+)+$", pattern_timeout=0.5), limit=5, scan_limit=1000)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            await purge.run()
+        except PatternTimeout:
+            pass
+        else:
+            raise AssertionError("catastrophic pattern did not time out")
+        finally:
+            task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 5  # the loop kept running while the worker was stuck
+    assert channel.bulk_deletes == [] and channel.single_deletes == []
+    assert purge.check.pattern._pool is None
@@ -0,0 +1,93 @@
+"""Tests for /purge-user and the recent-message index behind it"""
+import asyncio
+import types
+
+import discord
+
+from tests.fakes import FakeInteraction, http_error, make_moderation
+from utils.message_index import RecentMessageIndex
+
+GUILD, USER = 1, 2
+
+
+def test_peek_leaves_messages_until_discarded():
+    index = RecentMessageIndex(per_user=10, max_messages=100)
+    for message_id in range(1, 6):
+        index.add(GUILD, USER, 10 + message_id % 2, message_id)
+
+    assert index.peek(GUILD, USER, after_id=2) == {11: [3, 5], 10: [4]}
+    assert len(index) == 5
+
+    index.discard(GUILD, USER, [3, 4])
+    assert index.peek(GUILD, USER) == {11: [1, 5], 10: [2]}
+    assert len(index) == 3
+
+    index.discard(GUILD, USER, [1, 2, 5])
+    assert index.peek(GUILD, USER) == {} and len(index) == 0
+    index.discard(GUILD, USER, [1])  # unknown users are ignored
+
+
+def test_discard_keeps_the_ring_order():
+    index = RecentMessageIndex(per_user=3, max_messages=100)
+    for message_id in range(1, 6):  # wraps around: 3, 4, 5 remain
+        index.add(GUILD, USER, 10, message_id)
+
+    index.discard(GUILD, USER, [4])
+    index.add(GUILD, USER, 10, 6)
+    index.add(GUILD, USER, 10, 7)  # overwrites the oldest, 3
+
+    assert index.peek(GUILD, USER) == {10: [5, 6, 7]}
+
+
+class FakeTextChannel:
+    def __init__(self, channel_id, fail=None):
+        self.id = channel_id
+        self.fail = fail
+        self.deleted = []
+
+    async def delete_messages(self, messages):
+        if self.fail is not None:
+            raise self.fail
+        self.deleted.extend(message.id for message in messages)
+
+
+class FakeGuild:
+    id = GUILD
+
+    def __init__(self, channels):
+        self.me = types.SimpleNamespace(guild_permissions=types.SimpleNamespace(manage_messages=True))
+        self.channels = {channel.id: channel for channel in channels}
+
+    def get_channel_or_thread(self, channel_id):
+        return self.channels.get(channel_id)
+
+
+def purge_user(cog, guild):
+    interaction = FakeInteraction(guild, command="purge-user")
+    member = types.SimpleNamespace(id=USER, mention=f"<@{USER}>")
+    asyncio.run(cog.purge_user.callback(cog, interaction, member, 60))
+    return interaction
+
+
+def test_failed_deletes_stay_in_the_index_for_a_retry():
+    now = discord.utils.time_snowflake(discord.utils.utcnow())
+    working = FakeTextChannel(10)
+    failing = FakeTextChannel(11, fail=http_error(status=500, text="Internal Server Error"))
+    guild = FakeGuild([working, failing])
+    cog = make_moderation()
+    for i in range(6):
+        cog.message_index.add(GUILD, USER, 10 + i % 2, now + i)
+
+    interaction = purge_user(cog, guild)
+
+    assert working.deleted == [now, now + 2, now + 4]
+    assert cog.message_index.peek(GUILD, USER) == {11: [now + 1, now + 3, now + 5]}
+    kind, title, ephemeral = interaction.events[-1]
+    assert kind == "followup" and ephemeral
+
+    failing.fail = None
+    purge_user(cog, guild)
+
+    assert failing.deleted == [now + 1, now + 3, now + 5]
+    assert working.deleted == [now, now + 2, now + 4]
+    assert len(cog.message_index) == 0
@@ -0,0 +1,78 @@
+"""Tests for SingleFlight: coalescing, error propagation and cancellation"""
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+class Upstream:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+        self.release = None
+
+    async def fetch(self, value):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return value
+
+
+def run_concurrently(flights, upstream, callers, key="key"):
+    async def main():
+        upstream.release = asyncio.Event()
+        tasks = [asyncio.ensure_future(flights.do(key, upstream.fetch, i)) for i in range(callers)]
+        await asyncio.sleep(0)
+        assert len(flights) == 1
+        upstream.release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    upstream = Upstream()
+
+    results = run_concurrently(flights, upstream, 5)
+
+    assert results == [0] * 5
+    assert upstream.calls == 1
+    assert flights.stats() == {"in_flight": 0, "calls": 1, "coalesced": 4}
+
+
+def test_every_caller_gets_the_error_and_the_next_call_retries():
+    flights = SingleFlight()
+    error = ConnectionError("upstream down")
+    upstream = Upstream(error)
+
+    results = run_concurrently(flights, upstream, 3)
+
+    assert all(result is error for result in results)
+    assert len(flights) == 0
+
+    upstream.error = None
+    assert run_concurrently(flights, upstream, 1) == [0]
+    assert upstream.calls == 2
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    flights = SingleFlight()
+    upstream = Upstream()
+
+    async def main():
+        upstream.release = asyncio.Event()
+        first = asyncio.ensure_future(flights.do("key", upstream.fetch, "value"))
+        second = asyncio.ensure_future(flights.do("key", upstream.fetch, "other"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        upstream.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "value"
+    assert upstream.calls == 1
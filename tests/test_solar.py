@@ -0,0 +1,47 @@
+"""Tests for the local sunrise/sunset and day/night calculations"""
+import datetime
+
+import numpy as np
+
+from utils.solar import DAY_SECONDS, is_daytime, solar_elevation, sun_times
+
+LONDON = (51.5074, -0.1278)
+TROMSO = (69.6492, 18.9553)
+
+
+def timestamp(*args):
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc).timestamp()
+
+
+def test_london_midsummer_matches_published_times():
+    sunrise, sunset, day_length = sun_times(*LONDON, "2024-06-21")
+
+    # 03:43 and 20:21 UTC, to within a couple of minutes
+    assert abs(sunrise - timestamp(2024, 6, 21, 3, 43)) < 120
+    assert abs(sunset - timestamp(2024, 6, 21, 20, 21)) < 120
+    assert abs(day_length - (sunset - sunrise)) < 1
+
+
+def test_polar_day_and_night():
+    sunrise, sunset, day_length = sun_times(TROMSO[0], TROMSO[1], ["2024-06-21", "2024-12-21"])
+
+    assert np.isnan(sunrise).all() and np.isnan(sunset).all()
+    assert list(day_length) == [DAY_SECONDS, 0.0]
+
+
+def test_arguments_broadcast_over_locations():
+    latitudes = np.array([0.0, 30.0, 60.0])
+    _, _, day_length = sun_times(latitudes, 0.0, "2024-06-21")
+
+    assert day_length.shape == (3,)
+    assert abs(day_length[0] - 12.1 * 3600) < 300  # a few minutes over 12h at the equator
+    assert day_length[0] < day_length[1] < day_length[2]
+
+
+def test_daytime_follows_sunrise_and_sunset():
+    sunrise, sunset, _ = sun_times(*LONDON, "2024-03-20")
+    times = np.array([sunrise - 600, sunrise + 600, sunset - 600, sunset + 600])
+
+    assert list(is_daytime(*LONDON, times)) == [False, True, True, False]
+    noon = solar_elevation(*LONDON, timestamp(2024, 3, 20, 12, 10))
+    assert abs(noon - (90 - LONDON[0])) < 1  # equinox: 90° minus the latitude
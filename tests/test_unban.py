@@ -0,0 +1,95 @@
+"""Tests for /unban: the ban lookup and which replies stay private"""
+import asyncio
+import types
+
+import discord
+
+from tests.fakes import FakeInteraction, make_moderation
+
+
+def not_found():
+    return discord.NotFound(types.SimpleNamespace(status=404, reason="Not Found"), "Unknown Ban")
+
+
+class FakeGuild:
+    id = 1
+    me = types.SimpleNamespace(guild_permissions=types.SimpleNamespace(ban_members=True))
+
+    def __init__(self, banned):
+        self.banned = dict(banned)
+        self.calls = []
+
+    async def fetch_ban(self, user):
+        self.calls.append(("fetch_ban", user.id))
+        if user.id not in self.banned:
+            raise not_found()
+        return types.SimpleNamespace(user=types.SimpleNamespace(name=self.banned[user.id]))
+
+    async def unban(self, user, reason=None):
+        self.calls.append(("unban", user.id))
+        if self.banned.pop(user.id, None) is None:
+            raise not_found()
+
+    def bans(self):
+        raise AssertionError("/unban enumerated the ban list")
+
+
+def unban(cog, guild, user_id):
+    interaction = FakeInteraction(guild)
+    asyncio.run(cog.unban.callback(cog, interaction, user_id))
+    return interaction
+
+
+def test_indexed_ban_is_lifted_without_a_lookup():
+    cog, guild = make_moderation(), FakeGuild({7: "raider"})
+    asyncio.run(cog.on_member_ban(guild, types.SimpleNamespace(id=7, name="raider")))
+
+    interaction = unban(cog, guild, "7")
+
+    assert guild.calls == [("unban", 7)]
+    assert interaction.events[0] == ("defer",)
+    kind, title, ephemeral = interaction.events[-1]
+    assert kind == "followup" and "User Unbanned" in title and not ephemeral
+
+
+def test_unindexed_ban_is_fetched_then_lifted():
+    cog, guild = make_moderation(), FakeGuild({5: "old"})
+
+    interaction = unban(cog, guild, "5")
+
+    assert guild.calls == [("fetch_ban", 5), ("unban", 5)]
+    assert interaction.events[-1][2] is False
+    assert cog.cases.pending[0][2] == "unban"
+
+
+def test_defers_before_the_lookup_and_keeps_not_banned_private():
+    cog, guild = make_moderation(), FakeGuild({})
+
+    interaction = unban(cog, guild, "8")
+
+    assert guild.calls == [("fetch_ban", 8)]
+    assert interaction.events[0] == ("defer",)
+    assert interaction.events[1] == ("delete_original",)
+    assert interaction.events[2][0] == "followup" and interaction.events[2][2] is True
+    assert "Not Banned" in interaction.events[2][1]
+
+
+def test_stale_index_entry_is_dropped():
+    cog, guild = make_moderation(), FakeGuild({})
+    cog.ban_index[guild.id] = {9: "ghost"}
+
+    interaction = unban(cog, guild, "9")
+
+    assert cog.ban_index[guild.id] == {}
+    assert interaction.events[-1][2] is True
+
+
+def test_invalid_id_is_rejected_before_deferring():
+    cog, guild = make_moderation(), FakeGuild({})
+
+    interaction = unban(cog, guild, "abc")
+
+    assert guild.calls == []
+    assert len(interaction.events) == 1
+    kind, title, ephemeral = interaction.events[0]
+    assert kind == "send" and "Invalid Input" in title and ephemeral
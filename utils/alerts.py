@@ -0,0 +1,122 @@
+import random
+from array import array
+
+# Condition classes tracked by the severe-weather watcher
+CALM = 0
+THUNDERSTORM = 1
+HAIL = 2
+HEAVY_SNOW = 3
+VIOLENT_SHOWERS = 4
+
+# Dangerous WMO weather codes and the class each one belongs to
+SEVERE_CODES = {
+    95: THUNDERSTORM,
+    96: HAIL,
+    99: HAIL,
+    75: HEAVY_SNOW,
+    86: HEAVY_SNOW,
+    82: VIOLENT_SHOWERS,
+}
+
+# Codes from drizzle upwards: the weather is unsettled and may turn severe
+UNSETTLED_FROM = 51
+
+
+def condition_class(code: int) -> int:
+    """Map a WMO weather code to its condition class (CALM if not dangerous)"""
+    return SEVERE_CODES.get(code, CALM)
+
+
+class WatchTable:
+    """Watch state for many locations, kept in parallel typed arrays.
+
+    Each location is one slot: its grid coordinates, last condition class,
+    current polling interval and next poll time. That costs about 30 bytes
+    per location instead of a dict or object each.
+
+    Polling adapts to volatility. A location is checked every
+    ``min_interval`` while its condition changes, it is severe, or the
+    weather is unsettled. Each calm poll doubles its interval, up to
+    ``max_interval``.
+
+    Poll times are jittered so locations added together don't stay in
+    lockstep: the first poll lands anywhere in the first ``min_interval``,
+    and each later one up to ``jitter`` (a fraction of the interval) early.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, jitter: float = 0.25, rng=None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.index = {}  # grid key -> slot
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.conditions = array("B")
+        self.intervals = array("I")
+        self.next_poll = array("d")
+
+    def __len__(self):
+        return len(self.conditions)
+
+    def __contains__(self, grid_key):
+        return grid_key in self.index
+
+    def key(self, slot: int) -> tuple:
+        return round(self.latitudes[slot], 4), round(self.longitudes[slot], 4)
+
+    def add(self, grid_key: tuple, condition: int = CALM, now: float = 0.0) -> int:
+        """Start watching a grid cell; its first poll is due within ``min_interval`` of ``now``"""
+        slot = self.index.get(grid_key)
+        if slot is not None:
+            return slot
+        slot = len(self.conditions)
+        self.index[grid_key] = slot
+        self.latitudes.append(grid_key[0])
+        self.longitudes.append(grid_key[1])
+        self.conditions.append(condition)
+        self.intervals.append(int(self.min_interval))
+        self.next_poll.append(now + self.rng.uniform(0, self.min_interval))
+        return slot
+
+    def remove(self, grid_key: tuple):
+        """Stop watching a grid cell (the last slot is moved into its place)"""
+        slot = self.index.pop(grid_key, None)
+        if slot is None:
+            return
+        last = len(self.conditions) - 1
+        if slot != last:
+            for column in (self.latitudes, self.longitudes, self.conditions, self.intervals, self.next_poll):
+                column[slot] = column[last]
+            self.index[self.key(slot)] = slot
+        for column in (self.latitudes, self.longitudes, self.conditions, self.intervals, self.next_poll):
+            column.pop()
+
+    def due(self, now: float, limit: int = None) -> list:
+        """Slots whose next poll time has come, longest overdue first, at most ``limit``"""
+        slots = [slot for slot, when in enumerate(self.next_poll) if when <= now]
+        slots.sort(key=self.next_poll.__getitem__)
+        return slots[:limit]
+
+    def update(self, slot: int, code: int, now: float) -> bool:
+        """Record a fresh weather code for a slot; returns True if its condition class changed"""
+        condition = condition_class(code)
+        changed = condition != self.conditions[slot]
+        self.conditions[slot] = condition
+
+        if changed or condition != CALM or code >= UNSETTLED_FROM:
+            interval = self.min_interval
+        else:
+            interval = min(self.intervals[slot] * 2, self.max_interval)
+        self.intervals[slot] = int(interval)
+        self.next_poll[slot] = now + interval * (1 - self.jitter * self.rng.random())
+        return changed
+
+    def postpone(self, slot: int, now: float):
+        """Retry a slot after a failed poll without touching its state"""
+        self.next_poll[slot] = now + self.min_interval
+
+    def memory_usage(self) -> int:
+        """Bytes held by the state arrays (the grid key index not included)"""
+        return sum(column.itemsize * len(column) for column in
+                   (self.latitudes, self.longitudes, self.conditions, self.intervals, self.next_poll))
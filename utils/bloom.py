@@ -0,0 +1,89 @@
+import hashlib
+import math
+import struct
+
+# Serialized RotatingBloomFilter header:
+# format version, window, error rate, keys in the current and previous generation
+HEADER = struct.Struct("<BIdII")
+VERSION = 1
+
+
+class BloomFilter:
+    """Fixed-size set of strings with no false negatives and a bounded false-positive rate"""
+
+    __slots__ = ("size", "hashes", "bits", "count")
+
+    def __init__(self, capacity: int, error_rate: float, bits: bytes = None, count: int = 0):
+        # Optimal bit count and hash count for ``capacity`` keys at ``error_rate``
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.size = max(8, (size + 7) // 8 * 8)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray(self.size // 8)
+        self.count = count
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+class RotatingBloomFilter:
+    """Remembers at least the last ``window`` keys added, in constant memory.
+
+    Keys go into the current generation. Once it holds ``window`` keys it
+    becomes the previous generation and the old previous one is dropped.
+    Lookups check both, so a key is remembered for between ``window`` and
+    ``2 * window`` additions. Unseen keys may test as seen with a
+    probability of about ``2 * error_rate``.
+    """
+
+    __slots__ = ("window", "error_rate", "current", "previous")
+
+    def __init__(self, window: int, error_rate: float = 0.01):
+        self.window = window
+        self.error_rate = error_rate
+        self.current = BloomFilter(window, error_rate)
+        self.previous = BloomFilter(window, error_rate)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.current or key in self.previous
+
+    def add(self, key: str):
+        if key in self.current:
+            return
+        if self.current.count >= self.window:
+            self.previous = self.current
+            self.current = BloomFilter(self.window, self.error_rate)
+        self.current.add(key)
+
+    def to_bytes(self) -> bytes:
+        header = HEADER.pack(VERSION, self.window, self.error_rate, self.current.count, self.previous.count)
+        return header + bytes(self.current.bits) + bytes(self.previous.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RotatingBloomFilter":
+        version, window, error_rate, current_count, previous_count = HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"Unsupported filter version {version}")
+        seen = cls(window, error_rate)
+        size = len(seen.current.bits)
+        bits = data[HEADER.size:]
+        if len(bits) != 2 * size:
+            raise ValueError("Truncated filter")
+        seen.current = BloomFilter(window, error_rate, bits[:size], current_count)
+        seen.previous = BloomFilter(window, error_rate, bits[size:], previous_count)
+        return seen
+
+    def memory_usage(self) -> int:
+        """Bytes held by the filter's bit arrays"""
+        return len(self.current.bits) + len(self.previous.bits)
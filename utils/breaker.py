@@ -0,0 +1,93 @@
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a failing upstream and probes it before trusting it again.
+
+    closed    - calls go through; consecutive failures are counted
+    open      - calls fail fast with CircuitOpenError until ``reset_timeout``
+    half_open - up to ``half_open_max_calls`` probes go through; one success
+                closes the circuit, one failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float,
+                 half_open_max_calls: int = 1, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream right now"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self._state = self.CLOSED
+        self.failures = 0
+        self._probes = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+            self._probes = 0
+
+    async def call(self, func, *args):
+        """Await ``func(*args)`` through the breaker"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        probing = self._state == self.HALF_OPEN
+        opened_at = self._opened_at
+        try:
+            result = await func(*args)
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Cancelled: says nothing about the upstream, but a probe must give
+            # its slot back or the circuit could stay half-open and reject forever
+            if probing and self._state == self.HALF_OPEN and self._opened_at == opened_at:
+                self._probes = max(0, self._probes - 1)
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
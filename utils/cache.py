@@ -0,0 +1,105 @@
+import sys
+import time
+from collections import OrderedDict
+
+# Returned by TTLCache.get() when a key is absent or expired.
+# Cached values may legitimately be None (negative caching), so None
+# cannot be used to signal a miss.
+MISSING = object()
+
+
+def deep_sizeof(obj, _seen=None) -> int:
+    """Approximate memory used by an object and everything it references"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, slot), _seen) for slot in obj.__slots__ if hasattr(obj, slot))
+    return size
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a time-to-live.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is
+    reached. Each entry can override the default TTL, which is how short
+    lived negative results are cached next to long lived positive ones.
+
+    With ``stale_ttl`` set, expired entries are kept that much longer so
+    ``get_stale()`` can still serve them while a refresh is in progress.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float = 0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not MISSING
+
+    def get(self, key, default=MISSING, count=True):
+        """Return the cached value for ``key``, or ``default`` on a miss"""
+        entry = self._data.get(key)
+        if entry is not None:
+            now = self._clock()
+            if entry[0] > now:
+                self._data.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return entry[1]
+            if entry[0] + self.stale_ttl <= now:
+                del self._data[key]
+        if count:
+            self.misses += 1
+        return default
+
+    def get_stale(self, key, default=MISSING):
+        """Return the value for ``key`` even if expired, as long as it is within ``stale_ttl``"""
+        entry = self._data.get(key)
+        if entry is not None and entry[0] + self.stale_ttl > self._clock():
+            return entry[1]
+        return default
+
+    def set(self, key, value, ttl: float = None):
+        """Store ``value`` under ``key`` for ``ttl`` seconds (default: cache TTL)"""
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._data.clear()
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the cache, including keys and values"""
+        return deep_sizeof(self._data)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,91 @@
+import time
+
+# Moderation case journal. Cases are numbered globally; the indexes cover
+# /modlog by target or by moderator (newest first) and time-range scans.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mod_cases (
+    id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    target_id INTEGER,
+    moderator_id INTEGER NOT NULL,
+    reason TEXT,
+    details TEXT,
+    created_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_mod_cases_target ON mod_cases (guild_id, target_id, id);
+CREATE INDEX IF NOT EXISTS idx_mod_cases_moderator ON mod_cases (guild_id, moderator_id, id);
+CREATE INDEX IF NOT EXISTS idx_mod_cases_time ON mod_cases (created_at);
+"""
+COLUMNS = ("id", "guild_id", "action", "target_id", "moderator_id", "reason", "details", "created_at")
+
+
+class CaseJournal:
+    """Write-behind journal of moderation cases.
+
+    ``record()`` assigns the case number and queues the case in memory
+    without touching the database; ``flush()`` commits everything queued
+    in one transaction. Queries look at queued cases too, so a case can
+    be read back straight after it was recorded.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.pending = []  # tuples in COLUMNS order, oldest first
+        self.next_id = None
+
+    async def start(self):
+        await self.db.executescript(SCHEMA)
+        (last_id,) = await self.db.fetchone("SELECT COALESCE(MAX(id), 0) FROM mod_cases")
+        self.next_id = last_id + 1
+
+    def record(self, guild_id: int, action: str, target_id: int, moderator_id: int,
+               reason: str = None, details: str = None) -> int:
+        """Queue a case and return its number"""
+        case_id = self.next_id
+        self.next_id += 1
+        self.pending.append((case_id, guild_id, action, target_id, moderator_id, reason, details, int(time.time())))
+        return case_id
+
+    async def flush(self) -> int:
+        """Write queued cases; returns how many were written"""
+        if not self.pending:
+            return 0
+        batch = self.pending
+        self.pending = []
+        try:
+            await self.db.executemany(f"INSERT INTO mod_cases VALUES ({', '.join('?' * len(COLUMNS))})", batch)
+        except Exception:
+            # Keep them for the next flush, ahead of anything queued since
+            self.pending = batch + self.pending
+            raise
+        return len(batch)
+
+    async def get(self, guild_id: int, case_id: int):
+        """A case as a dict, or None if it doesn't exist in this guild"""
+        for case in self.pending:
+            if case[0] == case_id:
+                return dict(zip(COLUMNS, case)) if case[1] == guild_id else None
+        row = await self.db.fetchone(
+            f"SELECT {', '.join(COLUMNS)} FROM mod_cases WHERE id = ? AND guild_id = ?",
+            (case_id, guild_id)
+        )
+        return dict(zip(COLUMNS, row)) if row else None
+
+    async def history(self, guild_id: int, user_id: int, by_moderator: bool = False, limit: int = 10) -> tuple:
+        """(total, newest ``limit`` cases) against a user, or by them as moderator"""
+        column = "moderator_id" if by_moderator else "target_id"
+        index = COLUMNS.index(column)
+        queued = [dict(zip(COLUMNS, case)) for case in reversed(self.pending)
+                  if case[1] == guild_id and case[index] == user_id]
+
+        (total,) = await self.db.fetchone(
+            f"SELECT COUNT(*) FROM mod_cases WHERE guild_id = ? AND {column} = ?",
+            (guild_id, user_id)
+        )
+        rows = await self.db.fetchall(
+            f"SELECT {', '.join(COLUMNS)} FROM mod_cases WHERE guild_id = ? AND {column} = ? "
+            "ORDER BY id DESC LIMIT ?",
+            (guild_id, user_id, limit)
+        )
+        return total + len(queued), (queued + [dict(zip(COLUMNS, row)) for row in rows])[:limit]
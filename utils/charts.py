@@ -0,0 +1,54 @@
+import io
+from datetime import datetime
+
+# Colours matching Discord's dark theme
+BACKGROUND = "#2b2d31"
+FOREGROUND = "#dbdee1"
+GRID = "#3f4147"
+TEMPERATURE = "#ed4245"
+PRECIPITATION = "#5865f2"
+
+
+def render_forecast_chart(title: str, times: list, temperatures: list, precipitation: list,
+                          temp_unit: str, precip_unit: str) -> bytes:
+    """Plot hourly temperature (line) and precipitation (bars) and return the PNG bytes.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    Matplotlib is imported here so the bot process never loads it.
+    """
+    from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+    from matplotlib.figure import Figure
+
+    x = [datetime.fromisoformat(t) for t in times]
+    temperatures = [float("nan") if t is None else t for t in temperatures]
+    precipitation = [0 if p is None else p for p in precipitation]
+
+    fig = Figure(figsize=(8, 3.5), dpi=100, facecolor=BACKGROUND)
+    ax = fig.add_subplot()
+    bars = ax.twinx()
+    ax.set_zorder(bars.get_zorder() + 1)
+    ax.patch.set_visible(False)
+
+    bars.bar(x, precipitation, width=1 / 24 * 0.8, color=PRECIPITATION, alpha=0.6)
+    bars.set_ylim(0, max(max(precipitation, default=0) * 1.2, 1 if precip_unit == "mm" else 0.05))
+    bars.set_ylabel(f"Precipitation ({precip_unit})", color=PRECIPITATION)
+
+    ax.plot(x, temperatures, color=TEMPERATURE, linewidth=2)
+    ax.set_ylabel(f"Temperature ({temp_unit})", color=TEMPERATURE)
+    ax.set_title(title, color=FOREGROUND, fontsize=11)
+
+    locator = AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+    ax.grid(color=GRID, linewidth=0.5)
+    ax.margins(x=0.01)
+    for axis in (ax, bars):
+        axis.set_facecolor(BACKGROUND)
+        axis.tick_params(colors=FOREGROUND, labelsize=8)
+        for spine in axis.spines.values():
+            spine.set_color(GRID)
+
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", facecolor=BACKGROUND)
+    return buffer.getvalue()
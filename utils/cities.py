@@ -0,0 +1,180 @@
+import bisect
+import heapq
+import mmap
+import struct
+import unicodedata
+
+# On-disk index layout (all little-endian):
+#   header  - magic, format version, record count
+#   records - fixed-size rows sorted by (normalized name, population desc)
+#   strings - length-prefixed UTF-8 strings referenced by absolute offset
+MAGIC = b"ECTY"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxI")
+# key, name, admin1, country offsets; latitude, longitude; elevation; population
+RECORD = struct.Struct("<IIIIffiI")
+STRING_LENGTH = struct.Struct("<H")
+
+
+def normalize_name(query: str) -> str:
+    """Normalize a place name so spelling variants compare equal"""
+    # Strip diacritics ("São Paulo" -> "sao paulo")
+    decomposed = unicodedata.normalize("NFKD", query)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    # Case fold and collapse whitespace
+    return " ".join(stripped.casefold().split())
+
+
+class City:
+    """One row of the bundled city dataset"""
+
+    __slots__ = ("name", "admin1", "country", "latitude", "longitude", "elevation", "population")
+
+    def __init__(self, name, admin1, country, latitude, longitude, elevation, population):
+        self.name = name
+        self.admin1 = admin1
+        self.country = country
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation = elevation
+        self.population = population
+
+    @property
+    def label(self) -> str:
+        """Display name, e.g. "Paris, Île-de-France, France" """
+        parts = [self.name]
+        if self.admin1 and self.admin1 != self.name:
+            parts.append(self.admin1)
+        parts.append(self.country)
+        return ", ".join(parts)
+
+    def to_location(self) -> dict:
+        """Same shape as a cached geocoding API result"""
+        return {
+            "name": self.name,
+            "country": self.country,
+            "admin1": self.admin1,
+            "latitude": round(self.latitude, 4),
+            "longitude": round(self.longitude, 4),
+            "elevation": self.elevation,
+            "population": self.population,
+        }
+
+
+def pack_index(cities) -> bytes:
+    """Serialize cities into the on-disk index format read by CityIndex"""
+    rows = sorted(
+        ((normalize_name(city.name).encode("utf-8"), city) for city in cities),
+        key=lambda row: (row[0], -row[1].population)
+    )
+    strings_start = HEADER.size + RECORD.size * len(rows)
+    strings = bytearray()
+    offsets = {}
+
+    def intern(value: bytes) -> int:
+        # Shared strings (countries, regions) are stored once
+        if value not in offsets:
+            offsets[value] = strings_start + len(strings)
+            strings.extend(STRING_LENGTH.pack(len(value)))
+            strings.extend(value)
+        return offsets[value]
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, len(rows)))
+    for key, city in rows:
+        out.extend(RECORD.pack(
+            intern(key),
+            intern(city.name.encode("utf-8")),
+            intern(city.admin1.encode("utf-8")),
+            intern(city.country.encode("utf-8")),
+            city.latitude,
+            city.longitude,
+            int(round(city.elevation)),
+            city.population,
+        ))
+    out.extend(strings)
+    return bytes(out)
+
+
+class CityIndex:
+    """Offline city index over the memory-mapped binary dataset.
+
+    Records are fixed size and sorted by normalized name, so prefix and
+    exact-name searches are a binary search directly over the mapped file
+    with nothing parsed up front. The file is mapped on the first query,
+    and only the pages that are actually touched count towards RSS.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = None
+        self._count = 0
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            data.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} city index")
+        self._count = count
+        self._map = data
+
+    def _ensure_loaded(self):
+        if self._map is None:
+            self._load()
+
+    def __len__(self):
+        self._ensure_loaded()
+        return self._count
+
+    def _string(self, offset: int) -> bytes:
+        length = STRING_LENGTH.unpack_from(self._map, offset)[0]
+        start = offset + STRING_LENGTH.size
+        return self._map[start:start + length]
+
+    def _record(self, i: int) -> tuple:
+        return RECORD.unpack_from(self._map, HEADER.size + i * RECORD.size)
+
+    def _key(self, i: int) -> bytes:
+        return self._string(self._record(i)[0])
+
+    def _population(self, i: int) -> int:
+        return self._record(i)[7]
+
+    def _city(self, i: int) -> City:
+        _, name, admin1, country, lat, lon, elevation, population = self._record(i)
+        return City(
+            self._string(name).decode("utf-8"),
+            self._string(admin1).decode("utf-8"),
+            self._string(country).decode("utf-8"),
+            lat, lon, elevation, population
+        )
+
+    def _range(self, lower: bytes, upper: bytes) -> range:
+        indices = range(self._count)
+        lo = bisect.bisect_left(indices, lower, key=self._key)
+        hi = bisect.bisect_left(indices, upper, lo, key=self._key)
+        return range(lo, hi)
+
+    def complete(self, query: str, limit: int = 25) -> list:
+        """Returns up to ``limit`` cities whose name starts with ``query``, most populous first"""
+        self._ensure_loaded()
+        prefix = normalize_name(query).encode("utf-8")
+        candidates = self._range(prefix, prefix + b"\xff")
+        best = heapq.nlargest(limit, candidates, key=self._population)
+        return [self._city(i) for i in best]
+
+    def lookup(self, query: str):
+        """Resolve "Name" or "Name, Region, Country" to a bundled city, or None"""
+        self._ensure_loaded()
+        name, *qualifiers = [normalize_name(part) for part in query.split(",")]
+        qualifiers = [part for part in qualifiers if part]
+        key = name.encode("utf-8")
+
+        # Records with the same name are stored most populous first
+        for i in self._range(key, key + b"\x00"):
+            city = self._city(i)
+            regions = {normalize_name(city.admin1), normalize_name(city.country)}
+            if all(part in regions for part in qualifiers):
+                return city
+        return None
@@ -0,0 +1,156 @@
+import datetime
+import os
+
+import numpy as np
+
+# Daily variables requested from the archive API
+ARCHIVE_VARIABLES = ("temperature_2m_max", "temperature_2m_min")
+
+# On disk, temperatures are int16 tenths of a degree with this value for missing days
+MISSING_TENTHS = np.iinfo(np.int16).min
+
+
+def _to_tenths(values: np.ndarray) -> np.ndarray:
+    tenths = np.round(values * 10)
+    return np.where(np.isnan(tenths), MISSING_TENTHS, tenths).astype(np.int16)
+
+
+def _from_tenths(tenths: np.ndarray) -> np.ndarray:
+    values = tenths.astype(np.float32) / 10
+    values[tenths == MISSING_TENTHS] = np.nan
+    return values
+
+
+def percentile_rank(values: np.ndarray, value: float) -> float:
+    """Percentage of ``values`` below ``value`` (ties count half), ignoring NaN"""
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return float("nan")
+    below = np.count_nonzero(values < value)
+    equal = np.count_nonzero(values == value)
+    return float(100.0 * (below + 0.5 * equal) / values.size)
+
+
+class ClimateSeries:
+    """Daily high/low temperatures (°C) for one location from ``start`` onwards.
+
+    Values are contiguous float32 arrays with NaN for missing days, so all
+    statistics are vectorized NumPy operations over the whole record.
+    """
+
+    __slots__ = ("start", "tmax", "tmin")
+
+    def __init__(self, start: datetime.date, tmax: np.ndarray, tmin: np.ndarray):
+        self.start = start
+        self.tmax = tmax
+        self.tmin = tmin
+
+    def __len__(self):
+        return len(self.tmax)
+
+    @property
+    def end(self) -> datetime.date:
+        """Last day covered by the series"""
+        return self.start + datetime.timedelta(days=len(self) - 1)
+
+    def dates(self) -> np.ndarray:
+        first = np.datetime64(self.start, "D")
+        return np.arange(first, first + len(self))
+
+    @classmethod
+    def from_response(cls, data: dict) -> "ClimateSeries":
+        """Parse an archive API response requested with ARCHIVE_VARIABLES"""
+        daily = data.get("daily", {})
+        times = daily.get("time") or []
+        if not times:
+            raise ValueError("Archive response contains no days")
+        return cls(
+            datetime.date.fromisoformat(times[0]),
+            np.array(daily.get("temperature_2m_max", []), dtype=np.float32),
+            np.array(daily.get("temperature_2m_min", []), dtype=np.float32),
+        )
+
+    def complete_through(self) -> datetime.date:
+        """Last day with both a high and a low; the archive hasn't filled in the days after it yet"""
+        filled = np.flatnonzero(~(np.isnan(self.tmax) | np.isnan(self.tmin)))
+        return self.start + datetime.timedelta(days=int(filled[-1]) if filled.size else -1)
+
+    def truncate(self, end: datetime.date) -> "ClimateSeries":
+        """The series up to and including ``end``"""
+        days = max((end - self.start).days + 1, 0)
+        return ClimateSeries(self.start, self.tmax[:days], self.tmin[:days])
+
+    def extend(self, other: "ClimateSeries") -> "ClimateSeries":
+        """Append the days of ``other`` that come after this series"""
+        skip = (self.end - other.start).days + 1
+        if skip < 0:
+            raise ValueError("Series are not contiguous")
+        return ClimateSeries(
+            self.start,
+            np.concatenate((self.tmax, other.tmax[skip:])),
+            np.concatenate((self.tmin, other.tmin[skip:])),
+        )
+
+    def value_on(self, date: datetime.date):
+        """Returns (high, low) on ``date``, or None if it is outside the series"""
+        i = (date - self.start).days
+        if not 0 <= i < len(self):
+            return None
+        return float(self.tmax[i]), float(self.tmin[i])
+
+    def save(self, path: str):
+        """Write the series as compressed int16 tenths of a degree"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                start=np.array(self.start.toordinal(), dtype=np.int32),
+                tmax=_to_tenths(self.tmax),
+                tmin=_to_tenths(self.tmin),
+            )
+        # Readers never see a half-written file
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ClimateSeries":
+        with np.load(path) as data:
+            return cls(
+                datetime.date.fromordinal(int(data["start"])),
+                _from_tenths(data["tmax"]),
+                _from_tenths(data["tmin"]),
+            )
+
+
+def day_statistics(series: ClimateSeries, date: datetime.date, high: float, low: float) -> dict:
+    """Compare a day's high/low with the same calendar day in every other year of the series"""
+    days = series.dates()
+    months = days.astype("datetime64[M]")
+    same_day = (
+        (months.astype(np.int64) % 12 + 1 == date.month)
+        & ((days - months).astype(np.int64) + 1 == date.day)
+        & (days != np.datetime64(date, "D"))
+    )
+    tmax = series.tmax[same_day]
+    tmin = series.tmin[same_day]
+    years = days[same_day].astype("datetime64[Y]").astype(np.int64) + 1970
+
+    valid_max = ~np.isnan(tmax)
+    valid_min = ~np.isnan(tmin)
+    if not valid_max.any() or not valid_min.any():
+        return None
+
+    record_high = int(np.nanargmax(tmax))
+    record_low = int(np.nanargmin(tmin))
+    return {
+        "years": int(np.count_nonzero(valid_max)),
+        "first_year": int(years[valid_max].min()),
+        "high_percentile": percentile_rank(tmax, high),
+        "low_percentile": percentile_rank(tmin, low),
+        "normal_high": float(np.nanmean(tmax)),
+        "normal_low": float(np.nanmean(tmin)),
+        "record_high": float(tmax[record_high]),
+        "record_high_year": int(years[record_high]),
+        "record_low": float(tmin[record_low]),
+        "record_low_year": int(years[record_low]),
+    }
@@ -0,0 +1,79 @@
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Database:
+    """Async wrapper around one SQLite connection.
+
+    Every statement runs on a single dedicated worker thread, so queries
+    never block the event loop and the connection is only ever used from
+    one thread. The database runs in WAL mode so readers don't wait on the
+    writer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn = None
+
+    async def run(self, func, *args):
+        """Run ``func(connection, *args)`` on the database thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(self._conn, *args))
+
+    async def connect(self):
+        def _connect(_):
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn = conn
+        await self.run(_connect)
+
+    async def close(self):
+        if self._conn is not None:
+            await self.run(lambda conn: conn.close())
+            self._conn = None
+        self._executor.shutdown(wait=True)
+
+    async def executescript(self, script: str):
+        def _executescript(conn):
+            conn.executescript(script)
+            conn.commit()
+        await self.run(_executescript)
+
+    async def execute(self, sql: str, params=()) -> int:
+        """Run one write statement and commit; returns the number of affected rows"""
+        def _execute(conn):
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount
+        return await self.run(_execute)
+
+    async def insert(self, sql: str, params=()) -> int:
+        """Run one INSERT and commit; returns the new row id"""
+        def _insert(conn):
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.lastrowid
+        return await self.run(_insert)
+
+    async def executemany(self, sql: str, seq_of_params) -> int:
+        """Run one write statement for many parameter sets in a single transaction"""
+        seq_of_params = list(seq_of_params)
+
+        def _executemany(conn):
+            cursor = conn.executemany(sql, seq_of_params)
+            conn.commit()
+            return cursor.rowcount
+        return await self.run(_executemany)
+
+    async def fetchone(self, sql: str, params=()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params=()) -> list:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
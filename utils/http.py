@@ -0,0 +1,28 @@
+import aiohttp
+import config
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create the pooled HTTP client shared by every cog.
+
+    One session means one connection pool, so repeated calls to the same
+    API reuse warm keep-alive connections and cached DNS lookups instead of
+    paying a fresh TCP+TLS handshake per command.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=config.HTTPConfig.POOL_LIMIT,
+        limit_per_host=config.HTTPConfig.POOL_LIMIT_PER_HOST,
+        keepalive_timeout=config.HTTPConfig.KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=config.HTTPConfig.DNS_CACHE_TTL,
+        use_dns_cache=True,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=config.HTTPConfig.TOTAL_TIMEOUT,
+        connect=config.HTTPConfig.CONNECT_TIMEOUT,
+        sock_read=config.HTTPConfig.READ_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"User-Agent": config.HTTPConfig.USER_AGENT},
+    )
@@ -0,0 +1,112 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+import config
+
+# Every bot logger lives under this name: endroid.weather, endroid.commands, ...
+ROOT = "endroid"
+
+# Console prefix per level, matching the icons the bot has always printed
+LEVEL_ICONS = {
+    logging.DEBUG: config.Icons.INFO,
+    logging.INFO: config.Icons.INFO,
+    logging.WARNING: config.Icons.WARNING,
+    logging.ERROR: config.Icons.NO,
+    logging.CRITICAL: config.Icons.NO,
+}
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; structured values passed as ``extra={"fields": {...}}`` become keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        message = f"{LEVEL_ICONS.get(record.levelno, config.Icons.INFO)} {record.getMessage()}"
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return message
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge msg % args now, so later changes to mutable args can't alter
+        # the message. The stock handler also formats the whole line and
+        # drops exc_info and extras to keep records picklable; this queue
+        # stays in-process, so the structured fields and the traceback pass
+        # through and the listener thread formats them.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Route every ``endroid.*`` logger through a queue to a background writer thread.
+
+    Logging calls on the event loop only build a record and enqueue it;
+    formatting, the console and the rotating JSON-lines file are handled
+    by the listener thread. Call ``stop()`` on the returned listener at
+    shutdown to flush what's left.
+    """
+    handlers = []
+    if config.LogConfig.CONSOLE:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(ConsoleFormatter())
+        handlers.append(console)
+    if config.LogConfig.FILE:
+        directory = os.path.dirname(config.LogConfig.FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            config.LogConfig.FILE,
+            maxBytes=config.LogConfig.FILE_MAX_BYTES,
+            backupCount=config.LogConfig.FILE_BACKUPS,
+            encoding="utf-8"
+        )
+        file_handler.setFormatter(JSONFormatter())
+        handlers.append(file_handler)
+
+    # Skip the thread/process details every record would otherwise collect on
+    # the calling thread, and the caller's file/line lookup (a stack walk per
+    # call, about a third of the per-call cost; see benchmarks/bench_logging.py).
+    # None of these appear in the output. _srcfile is private, but it's the
+    # switch the logging HOWTO ("Optimization") documents for the lookup.
+    if hasattr(logging, "_srcfile"):
+        logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging.logAsyncioTasks = False
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT)
+    root.handlers = [_QueueHandler(log_queue)]
+    root.setLevel(config.LogConfig.LEVEL)
+    root.propagate = False
+    for name, level in config.LogConfig.LEVELS.items():
+        get_logger(name).setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
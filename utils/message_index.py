@@ -0,0 +1,103 @@
+from array import array
+from collections import OrderedDict, defaultdict
+
+
+class _Ring:
+    """Fixed-capacity ring of (channel id, message id) pairs in two typed arrays"""
+
+    __slots__ = ("channels", "messages", "start")
+
+    def __init__(self):
+        self.channels = array("Q")
+        self.messages = array("Q")
+        self.start = 0  # index of the oldest entry once the ring is full
+
+    def __len__(self):
+        return len(self.messages)
+
+    def append(self, channel_id: int, message_id: int, capacity: int) -> bool:
+        """Add an entry; returns True if it grew, False if it overwrote the oldest"""
+        if len(self.messages) < capacity:
+            self.channels.append(channel_id)
+            self.messages.append(message_id)
+            return True
+        self.channels[self.start] = channel_id
+        self.messages[self.start] = message_id
+        self.start = (self.start + 1) % capacity
+        return False
+
+
+class RecentMessageIndex:
+    """Recent message IDs per (guild, user), for deleting a user's messages without reading history.
+
+    Each user keeps a ring of their last ``per_user`` messages. Across all
+    users at most ``max_messages`` are kept; past that, the users who
+    posted least recently are forgotten first. Each entry costs 16 bytes.
+    """
+
+    def __init__(self, per_user: int, max_messages: int):
+        self.per_user = per_user
+        self.max_messages = max_messages
+        self.rings = OrderedDict()  # (guild id, user id) -> _Ring, least recently active first
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, guild_id: int, user_id: int, channel_id: int, message_id: int):
+        key = (guild_id, user_id)
+        ring = self.rings.get(key)
+        if ring is None:
+            ring = self.rings[key] = _Ring()
+        else:
+            self.rings.move_to_end(key)
+
+        if ring.append(channel_id, message_id, self.per_user):
+            self.size += 1
+            while self.size > self.max_messages:
+                _, evicted = self.rings.popitem(last=False)
+                self.size -= len(evicted)
+
+    @staticmethod
+    def _oldest_first(ring: _Ring):
+        for i in list(range(ring.start, len(ring))) + list(range(ring.start)):
+            yield ring.channels[i], ring.messages[i]
+
+    def peek(self, guild_id: int, user_id: int, after_id: int = 0) -> dict:
+        """A user's messages newer than ``after_id``, grouped as {channel id: [message ids]}.
+
+        The messages stay in the index; ``discard`` the ones that were deleted.
+        """
+        ring = self.rings.get((guild_id, user_id))
+        if ring is None:
+            return {}
+
+        found = defaultdict(list)
+        for channel_id, message_id in self._oldest_first(ring):
+            if message_id > after_id:
+                found[channel_id].append(message_id)
+        return dict(found)
+
+    def discard(self, guild_id: int, user_id: int, message_ids):
+        """Forget messages of a user, e.g. once they have been deleted"""
+        key = (guild_id, user_id)
+        ring = self.rings.get(key)
+        if ring is None:
+            return
+
+        message_ids = set(message_ids)
+        kept = _Ring()
+        # Oldest first, so the rebuilt ring overwrites in the right order once it fills up
+        for channel_id, message_id in self._oldest_first(ring):
+            if message_id not in message_ids:
+                kept.append(channel_id, message_id, self.per_user)
+
+        self.size -= len(ring) - len(kept)
+        if len(kept):
+            self.rings[key] = kept
+        else:
+            del self.rings[key]
+
+    def memory_usage(self) -> int:
+        """Bytes held by the message and channel ID arrays"""
+        return sum(ring.messages.itemsize * len(ring) * 2 for ring in self.rings.values())
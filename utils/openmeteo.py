@@ -0,0 +1,165 @@
+import time
+
+
+def snap_to_grid(latitude: float, longitude: float, resolution: float) -> tuple:
+    """Snap coordinates to the centre of the model grid cell containing them.
+
+    Every point inside one grid cell gets the same forecast from Open-Meteo,
+    so the snapped pair is a stable cache key for all of them.
+    """
+    lat = round(round(latitude / resolution) * resolution, 4)
+    lon = round(round(longitude / resolution) * resolution, 4)
+    return lat, lon
+
+
+def seconds_until_next_update(interval: int, now: float = None) -> float:
+    """Seconds until the next forecast refresh boundary.
+
+    Open-Meteo refreshes its data on fixed wall-clock boundaries, so a cached
+    forecast is valid until the next boundary rather than for a flat TTL.
+    """
+    if now is None:
+        now = time.time()
+    return interval - (now % interval)
+
+
+def celsius_to_fahrenheit(value):
+    if not isinstance(value, (int, float)):
+        return value
+    return round(value * 9 / 5 + 32, 1)
+
+
+def kmh_to_mph(value):
+    if not isinstance(value, (int, float)):
+        return value
+    return round(value / 1.609344, 1)
+
+
+# Variables requested with current=; only the present hour is returned.
+# Day/night and sun times are computed locally (utils.solar), not requested.
+CURRENT_VARIABLES = (
+    "temperature_2m", "relative_humidity_2m", "apparent_temperature",
+    "weather_code", "cloud_cover", "pressure_msl", "wind_speed_10m",
+    "wind_direction_10m", "visibility"
+)
+# Today's range (one value each with forecast_days=1)
+DAILY_VARIABLES = ("temperature_2m_max", "temperature_2m_min")
+
+
+def _first(values):
+    return values[0] if values else None
+
+
+class WeatherSnapshot:
+    """Current conditions for one location, in the units it was fetched or converted to.
+
+    Missing values are None.
+    """
+
+    __slots__ = (
+        "time", "utc_offset", "temperature", "feels_like", "humidity", "weathercode",
+        "cloudcover", "pressure", "windspeed", "winddirection", "visibility",
+        "temp_max", "temp_min"
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_response(cls, data: dict) -> "WeatherSnapshot":
+        """Parse a forecast response requested with CURRENT_VARIABLES and DAILY_VARIABLES"""
+        current = data.get("current", {})
+        daily = data.get("daily", {})
+        return cls(
+            time=current.get("time"),
+            utc_offset=data.get("utc_offset_seconds", 0),
+            temperature=current.get("temperature_2m"),
+            feels_like=current.get("apparent_temperature"),
+            humidity=current.get("relative_humidity_2m"),
+            weathercode=current.get("weather_code", 0),
+            cloudcover=current.get("cloud_cover"),
+            pressure=current.get("pressure_msl"),
+            windspeed=current.get("wind_speed_10m"),
+            winddirection=current.get("wind_direction_10m"),
+            visibility=current.get("visibility"),
+            temp_max=_first(daily.get("temperature_2m_max")),
+            temp_min=_first(daily.get("temperature_2m_min")),
+        )
+
+    def to_imperial(self) -> "WeatherSnapshot":
+        """Returns a copy converted from °C and km/h to °F and mph"""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        for name in ("temperature", "feels_like", "temp_max", "temp_min"):
+            fields[name] = celsius_to_fahrenheit(fields[name])
+        fields["windspeed"] = kmh_to_mph(fields["windspeed"])
+        return WeatherSnapshot(**fields)
+
+
+# Variables requested from the air-quality API
+AIR_QUALITY_VARIABLES = ("us_aqi", "pm2_5", "pm10", "uv_index")
+
+
+class AirQualitySnapshot:
+    """Current air quality and UV index for one location. Missing values are None."""
+
+    __slots__ = ("time", "us_aqi", "pm2_5", "pm10", "uv_index")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_response(cls, data: dict) -> "AirQualitySnapshot":
+        current = data.get("current", {})
+        return cls(**{name: current.get(name) for name in cls.__slots__})
+
+
+# Variables requested with daily= for digest posts (today only with forecast_days=1)
+DIGEST_VARIABLES = (
+    "weather_code", "temperature_2m_max", "temperature_2m_min", "precipitation_sum",
+    "precipitation_probability_max", "wind_speed_10m_max"
+)
+
+
+def mm_to_inches(value):
+    if not isinstance(value, (int, float)):
+        return value
+    return round(value / 25.4, 2)
+
+
+class DailyForecast:
+    """Today's forecast for one location. Missing values are None."""
+
+    __slots__ = (
+        "date", "utc_offset", "weathercode", "temp_max", "temp_min", "precipitation",
+        "precipitation_probability", "wind_max"
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_response(cls, data: dict) -> "DailyForecast":
+        """Parse a forecast response requested with DIGEST_VARIABLES"""
+        daily = data.get("daily", {})
+        return cls(
+            date=_first(daily.get("time")),
+            utc_offset=data.get("utc_offset_seconds", 0),
+            weathercode=_first(daily.get("weather_code")) or 0,
+            temp_max=_first(daily.get("temperature_2m_max")),
+            temp_min=_first(daily.get("temperature_2m_min")),
+            precipitation=_first(daily.get("precipitation_sum")),
+            precipitation_probability=_first(daily.get("precipitation_probability_max")),
+            wind_max=_first(daily.get("wind_speed_10m_max")),
+        )
+
+    def to_imperial(self) -> "DailyForecast":
+        """Returns a copy converted from °C, mm and km/h to °F, inches and mph"""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields["temp_max"] = celsius_to_fahrenheit(fields["temp_max"])
+        fields["temp_min"] = celsius_to_fahrenheit(fields["temp_min"])
+        fields["precipitation"] = mm_to_inches(fields["precipitation"])
+        fields["wind_max"] = kmh_to_mph(fields["wind_max"])
+        return DailyForecast(**fields)
@@ -0,0 +1,60 @@
+import asyncio
+import multiprocessing
+import re
+
+# Messages sent to the worker per round trip
+PAGE_SIZE = 100
+
+# Compiled once per worker process by _init_worker
+_pattern = None
+
+
+class PatternTimeout(Exception):
+    """Raised when a pattern takes too long to match; usually catastrophic backtracking"""
+
+
+def _init_worker(pattern: str, flags: int):
+    global _pattern
+    _pattern = re.compile(pattern, flags)
+
+
+def _match_all(contents: list) -> list:
+    return [_pattern.search(content) is not None for content in contents]
+
+
+class PatternMatcher:
+    """Runs a user-supplied regular expression in a worker process, with a timeout.
+
+    ``re`` holds the GIL while it matches, so a pathological pattern would
+    stall the event loop even from a thread; a separate process can be
+    killed instead. The pattern is compiled here first, so syntax errors
+    surface as ``re.error`` before any worker starts. Texts are matched a
+    page at a time to keep the round trips few.
+    """
+
+    def __init__(self, pattern: str, timeout: float, flags: int = re.IGNORECASE):
+        re.compile(pattern, flags)
+        self.pattern = pattern
+        self.flags = flags
+        self.timeout = timeout
+        self._pool = None
+
+    async def matches(self, contents: list) -> list:
+        """One bool per text; raises PatternTimeout if a page takes longer than ``timeout``"""
+        if self._pool is None:
+            self._pool = multiprocessing.get_context("spawn").Pool(
+                1, initializer=_init_worker, initargs=(self.pattern, self.flags)
+            )
+            # Wait for the worker to start, so startup doesn't count against the timeout
+            await asyncio.to_thread(self._pool.apply, _match_all, ([],))
+        result = self._pool.apply_async(_match_all, (contents,))
+        try:
+            return await asyncio.to_thread(result.get, self.timeout)
+        except multiprocessing.TimeoutError:
+            await self.close()
+            raise PatternTimeout(f"pattern took longer than {self.timeout:g}s to match")
+
+    async def close(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.terminate)
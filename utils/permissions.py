@@ -0,0 +1,95 @@
+import discord
+
+import config
+from utils.cache import MISSING, TTLCache
+
+
+class PermissionEngine:
+    """Decides who may use the restricted (moderation) commands, without any network I/O.
+
+    A member is allowed if their user ID is in ``allowed_users``, or if
+    their role IDs intersect the allowed roles for the guild (the
+    per-guild override from ``guild_roles``, else ``allowed_roles``).
+    An empty allowed-role set allows everyone, as before, including in DMs.
+
+    Role IDs come from the member object Discord sends with every guild
+    interaction, so a removed role stops granting access at once. Only
+    when the interaction carries a plain user is the gateway member cache
+    consulted; those role sets are kept as frozensets for ``member_ttl``
+    seconds, and ``forget()`` drops an entry early when roles change.
+    """
+
+    def __init__(self, allowed_roles, allowed_users, guild_roles: dict = None,
+                 member_ttl: float = 30, member_cache_size: int = 10000):
+        self.allowed_roles = frozenset(allowed_roles)
+        self.allowed_users = frozenset(allowed_users)
+        self.guild_roles = {guild_id: frozenset(roles) for guild_id, roles in (guild_roles or {}).items()}
+        self.member_roles = TTLCache(member_cache_size, member_ttl)  # (guild id, user id) -> frozenset of role IDs
+
+    @classmethod
+    def from_config(cls) -> "PermissionEngine":
+        return cls(
+            config.Roles.ALLOWED_ROLES,
+            config.Roles.ALLOWED_USERS,
+            config.Roles.GUILD_ROLES,
+            config.Roles.MEMBER_CACHE_TTL
+        )
+
+    def roles_for(self, guild_id: int) -> frozenset:
+        """Role IDs that grant access in a guild"""
+        return self.guild_roles.get(guild_id, self.allowed_roles)
+
+    def role_ids(self, guild: discord.Guild, user) -> frozenset:
+        """A member's role IDs, or None if the member isn't known locally"""
+        if isinstance(user, discord.Member):
+            # Current as of this interaction; never older than the cache
+            return frozenset(role.id for role in user.roles)
+
+        key = (guild.id, user.id)
+        roles = self.member_roles.get(key)
+        if roles is not MISSING:
+            return roles
+
+        member = guild.get_member(user.id)
+        if member is None:
+            return None
+        roles = frozenset(role.id for role in member.roles)
+        self.member_roles.set(key, roles)
+        return roles
+
+    def is_allowed(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id in self.allowed_users:
+            return True
+        if interaction.guild is None:
+            # No member roles outside a guild; only an open (empty) role list lets it through
+            return not self.allowed_roles
+
+        allowed = self.roles_for(interaction.guild.id)
+        if not allowed:
+            return True
+
+        if isinstance(interaction.user, discord.Member):
+            # Roles as of this interaction, so a removed role stops counting at once
+            return not allowed.isdisjoint([role.id for role in interaction.user.roles])
+
+        roles = self.role_ids(interaction.guild, interaction.user)
+        return roles is not None and not roles.isdisjoint(allowed)
+
+    def forget(self, guild_id: int, user_id: int):
+        self.member_roles.pop((guild_id, user_id))
+
+    def denied_embed(self, interaction: discord.Interaction) -> discord.Embed:
+        """The embed shown to members who fail the check"""
+        roles = self.roles_for(interaction.guild_id) if interaction.guild_id else self.allowed_roles
+        embed = discord.Embed(
+            title=f"{config.Icons.NO} Permission Denied",
+            description=config.Messages.NO_PERMISSION,
+            color=config.Colors.ERROR
+        )
+        embed.add_field(
+            name="Required Roles",
+            value="\n".join(f"<@&{role_id}>" for role_id in roles) or "Not configured",
+            inline=False
+        )
+        embed.set_footer(text=f"User ID: {interaction.user.id}")
+        return embed
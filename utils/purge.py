@@ -0,0 +1,163 @@
+import re
+import time
+from datetime import timedelta
+
+import discord
+
+from utils.pattern import PAGE_SIZE, PatternMatcher
+from utils.ratelimit import TokenBucket
+
+# Discord only bulk-deletes messages younger than 14 days; keep a margin
+# so a message doesn't age out between being read and being deleted
+BULK_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+BULK_SIZE = 100
+LINK = re.compile(r"https?://\S+", re.IGNORECASE)
+
+
+def bulk_cutoff():
+    """Messages created after this can still be bulk deleted"""
+    return discord.utils.utcnow() - BULK_MAX_AGE
+
+
+class PurgeFilter:
+    """Which messages a purge deletes; every option that is set must match.
+
+    Calling the filter checks the cheap options. A ``pattern`` is a
+    user-supplied regular expression, so it is compiled here (raising
+    ``re.error``) but matched by the purge in a worker process, with
+    ``pattern_timeout`` seconds per page of messages.
+    """
+
+    __slots__ = ("member_id", "bots_only", "pattern", "attachments", "links")
+
+    def __init__(self, member_id: int = None, bots_only: bool = False, pattern: str = None,
+                 attachments: bool = False, links: bool = False, pattern_timeout: float = 2.0):
+        self.member_id = member_id
+        self.bots_only = bots_only
+        self.pattern = PatternMatcher(pattern, pattern_timeout) if pattern else None
+        self.attachments = attachments
+        self.links = links
+
+    def __call__(self, message: discord.Message) -> bool:
+        if self.member_id is not None and message.author.id != self.member_id:
+            return False
+        if self.bots_only and not message.author.bot:
+            return False
+        if self.attachments and not message.attachments:
+            return False
+        if self.links and not LINK.search(message.content):
+            return False
+        return True
+
+
+class Purge:
+    """Deletes up to ``limit`` matching messages while walking channel history lazily.
+
+    Matches are deleted as the walk goes, so memory stays at one batch:
+    recent messages with ``bulk_delete`` in batches of 100, and messages
+    older than 14 days one at a time, paced by ``old_rate`` per second.
+    The walk stops after ``limit`` deletions or ``scan_limit`` messages.
+    """
+
+    def __init__(self, channel, check: PurgeFilter, limit: int, scan_limit: int,
+                 before=None, after=None, old_rate: float = 2.0):
+        self.channel = channel
+        self.check = check
+        self.limit = limit
+        self.scan_limit = scan_limit
+        self.before = before
+        self.after = after
+        self.old_limiter = TokenBucket(old_rate, burst=1)
+        self.batch = []
+        self.scanned = 0
+        self.deleted = 0
+        self.failed = 0
+
+    async def run(self, progress=None, progress_interval: float = 2.0):
+        """Run the purge; ``progress(purge)`` is awaited at most every ``progress_interval`` seconds.
+
+        Raises PatternTimeout if the filter's pattern is too slow to match.
+        """
+        page = []
+        # With a pattern, candidates are matched a page at a time in the worker
+        page_size = PAGE_SIZE if self.check.pattern is not None else 1
+        last_update = time.monotonic()
+        done = False
+
+        try:
+            # discord.py walks oldest first whenever ``after`` is given; always go newest first
+            history = self.channel.history(limit=self.scan_limit, before=self.before, after=self.after, oldest_first=False)
+            async for message in history:
+                self.scanned += 1
+                if self.check(message):
+                    page.append(message)
+                if len(page) >= page_size:
+                    done = await self._take(page)
+                    page = []
+                    if done:
+                        break
+
+                if progress is not None and time.monotonic() - last_update >= progress_interval:
+                    last_update = time.monotonic()
+                    await progress(self)
+
+            if page and not done:
+                await self._take(page)
+            if self.batch:
+                await self._bulk_delete(self.batch)
+                self.batch = []
+        finally:
+            if self.check.pattern is not None:
+                await self.check.pattern.close()
+        return self.deleted
+
+    async def _take(self, messages) -> bool:
+        """Delete the matching messages, newest first; True once ``limit`` is reached"""
+        if self.check.pattern is not None:
+            verdicts = await self.check.pattern.matches([message.content for message in messages])
+            messages = [message for message, matched in zip(messages, verdicts) if matched]
+
+        for message in messages:
+            if message.created_at > bulk_cutoff():
+                self.batch.append(message)
+                if len(self.batch) >= BULK_SIZE:
+                    await self._bulk_delete(self.batch)
+                    self.batch = []
+            else:
+                # History runs newest first, so everything from here on is too old to bulk delete
+                if self.batch:
+                    await self._bulk_delete(self.batch)
+                    self.batch = []
+                await self._delete_old(message)
+
+            if self.deleted + self.failed + len(self.batch) >= self.limit:
+                return True
+        return False
+
+    async def _bulk_delete(self, messages):
+        # A long run can take hours, so check the age again: anything that
+        # aged out while queued is deleted one by one instead
+        cutoff = bulk_cutoff()
+        recent = [message for message in messages if message.created_at > cutoff]
+        singles = [message for message in messages if message.created_at <= cutoff]
+        if recent:
+            try:
+                await self.channel.delete_messages(recent)
+                self.deleted += len(recent)
+            except discord.Forbidden:
+                raise
+            except discord.HTTPException:
+                # Some were already gone or too old; delete the batch one by one
+                singles = messages
+        for message in singles:
+            await self._delete_old(message)
+
+    async def _delete_old(self, message):
+        await self.old_limiter.acquire()
+        try:
+            await message.delete()
+            self.deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.HTTPException:
+            self.failed += 1
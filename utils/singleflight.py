@@ -0,0 +1,46 @@
+import asyncio
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one upstream call.
+
+    The first caller for a key starts the work; everyone who asks for the
+    same key while it is still running awaits the same future and receives
+    the same result or exception. Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0      # upstream calls actually started
+        self.coalesced = 0  # callers that joined an existing call
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key, func, *args):
+        """Run ``func(*args)`` once per key among concurrent callers"""
+        future = self._inflight.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(func(*args))
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+        else:
+            self.coalesced += 1
+
+        # Shield so one caller being cancelled doesn't cancel the shared call
+        return await asyncio.shield(future)
+
+    def _finish(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
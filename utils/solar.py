@@ -0,0 +1,93 @@
+import numpy as np
+
+# Sun centre this far below the horizon counts as sunrise/sunset
+# (refraction plus the radius of the solar disc)
+HORIZON = np.radians(-0.833)
+DAY_SECONDS = 86400
+
+
+def _fractional_year(day_of_year, minutes_utc=720):
+    return 2 * np.pi / 365 * (day_of_year - 1 + (minutes_utc - 720) / 1440)
+
+
+def _equation_of_time(gamma):
+    """Minutes between apparent and mean solar time"""
+    return 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                     - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+
+
+def _declination(gamma):
+    """Solar declination in radians"""
+    return (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+            - 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+            - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+
+
+def _day_numbers(dates):
+    """Epoch day number and day of year for dates (datetime.date, str or datetime64)"""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    day_of_year = (days - days.astype("datetime64[Y]")).astype(np.int64) + 1
+    return days.astype(np.int64), day_of_year
+
+
+def sun_times(latitudes, longitudes, dates) -> tuple:
+    """Sunrise, sunset and day length for each location on the given dates.
+
+    Uses NOAA's solar position approximation (accurate to about a minute
+    outside the polar regions). All arguments broadcast against each
+    other, so one call covers any number of locations.
+
+    Returns ``(sunrise, sunset, day_length)``. Sunrise and sunset are Unix
+    timestamps (UTC seconds), NaN when the sun doesn't rise or set that
+    day. Day length is in seconds: 0 for polar night, 86400 for midnight
+    sun.
+    """
+    latitude = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitude = np.asarray(longitudes, dtype=np.float64)
+    epoch_day, day_of_year = _day_numbers(dates)
+
+    gamma = _fractional_year(day_of_year)
+    eqtime = _equation_of_time(gamma)
+    declination = _declination(gamma)
+
+    cos_hour_angle = ((np.sin(HORIZON) - np.sin(latitude) * np.sin(declination))
+                      / (np.cos(latitude) * np.cos(declination)))
+    hour_angle = np.degrees(np.arccos(np.clip(cos_hour_angle, -1, 1)))
+
+    # Minutes after 00:00 UTC of the date; may fall outside 0-1440 far from Greenwich
+    noon = 720 - 4 * longitude - eqtime
+    midnight = epoch_day * DAY_SECONDS
+    sunrise = midnight + (noon - 4 * hour_angle) * 60
+    sunset = midnight + (noon + 4 * hour_angle) * 60
+
+    polar = np.abs(cos_hour_angle) > 1
+    sunrise = np.where(polar, np.nan, sunrise)
+    sunset = np.where(polar, np.nan, sunset)
+    day_length = np.where(cos_hour_angle > 1, 0.0,
+                          np.where(cos_hour_angle < -1, float(DAY_SECONDS), 8 * hour_angle * 60))
+    return sunrise, sunset, day_length
+
+
+def solar_elevation(latitudes, longitudes, timestamps):
+    """Solar elevation in degrees for each location at the given Unix timestamps"""
+    latitude = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitude = np.asarray(longitudes, dtype=np.float64)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+
+    epoch_day = np.floor(timestamps / DAY_SECONDS)
+    minutes_utc = (timestamps - epoch_day * DAY_SECONDS) / 60
+    _, day_of_year = _day_numbers(epoch_day.astype(np.int64).astype("datetime64[D]"))
+
+    gamma = _fractional_year(day_of_year, minutes_utc)
+    declination = _declination(gamma)
+    true_solar_time = minutes_utc + _equation_of_time(gamma) + 4 * longitude
+    hour_angle = np.radians(true_solar_time / 4 - 180)
+
+    cos_zenith = (np.sin(latitude) * np.sin(declination)
+                  + np.cos(latitude) * np.cos(declination) * np.cos(hour_angle))
+    return 90 - np.degrees(np.arccos(np.clip(cos_zenith, -1, 1)))
+
+
+def is_daytime(latitudes, longitudes, timestamps):
+    """True where the sun is above the horizon"""
+    return solar_elevation(latitudes, longitudes, timestamps) > np.degrees(HORIZON)
@@ -0,0 +1,43 @@
+import asyncio
+
+# Posted by a worker when it runs out of items
+_DONE = object()
+
+
+async def fan_out(items, func, concurrency: int, limiter=None):
+    """Run ``func(item)`` for every item with at most ``concurrency`` calls in flight.
+
+    Yields ``(item, result, error)`` as calls finish, in completion order;
+    ``error`` is the exception a call raised, or None. If ``limiter`` (a
+    TokenBucket) is given, each call first takes a token from it. Leaving
+    the loop early cancels the calls still running.
+    """
+    items = iter(items)
+    results = asyncio.Queue()
+
+    async def worker():
+        # Workers share one iterator, so each item is taken exactly once
+        for item in items:
+            if limiter is not None:
+                await limiter.acquire()
+            try:
+                result = await func(item)
+            except Exception as e:
+                results.put_nowait((item, None, e))
+            else:
+                results.put_nowait((item, result, None))
+        results.put_nowait(_DONE)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    try:
+        running = len(workers)
+        while running:
+            entry = await results.get()
+            if entry is _DONE:
+                running -= 1
+            else:
+                yield entry
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)